@@ -1,6 +1,25 @@
 # SportApp/analytics.py
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
 from django.db.models import Q
-from .models import Match, MatchAnalytics
+from .models import Match, MatchAnalytics, TeamForm
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Statystyki używane we wskaźnikach i odpowiadające im kolumny (bez prefiksu home_/away_)
+STAT_COLUMNS = {
+    'blocked_shots': 'blocked_shots',
+    'goalkeeper_saves': 'goalkeeper_saves',
+    'pass_percent': 'passes_accurate',
+    'offsides': 'offsides',
+    'shots_inside_box': 'shots_inside_box',
+    'corner_kicks': 'corners',
+    'shots_on_goal': 'shots_on_goal',
+    'fouls': 'fouls',
+    'yellow_cards': 'yellow_cards',
+    'red_cards': 'red_cards',
+}
+SCORE_FIELDS = ['defense_score', 'tactical_score', 'hype_score', 'aggression_score']
 
 
 class MatchAnalyzer:
@@ -27,21 +46,7 @@ class MatchAnalyzer:
         else:
             return 0
 
-        field_map = {
-            'blocked_shots': f'{prefix}blocked_shots',
-            'goalkeeper_saves': f'{prefix}goalkeeper_saves',
-            'pass_percent': f'{prefix}passes_accurate',
-            'offsides': f'{prefix}offsides',
-            'shots_inside_box': f'{prefix}shots_inside_box',
-            'corner_kicks': f'{prefix}corners',
-            'shots_on_goal': f'{prefix}shots_on_goal',
-            'fouls': f'{prefix}fouls',
-            'yellow_cards': f'{prefix}yellow_cards',
-            'red_cards': f'{prefix}red_cards',
-        }
-
-        field_name = field_map.get(stat_name)
-        val = getattr(match, field_name, 0)
+        val = getattr(match, f'{prefix}{STAT_COLUMNS[stat_name]}', 0)
 
         return val if val is not None else 0
 
@@ -64,36 +69,11 @@ class MatchAnalyzer:
         percent = (raw_value / max_limit) * 100
         return min(round(percent), 100)
 
-    def calculate_match_analytics(self, match_obj):
+    def _raw_scores(self, h_stats, a_stats):
         """
-        Główna metoda wywoływana dla konkretnego meczu (match_obj).
+        Surowe wartości czterech wskaźników. Działa zarówno na liczbach (jeden mecz),
+        jak i na tablicach NumPy (wszystkie mecze naraz) - ta sama kolejność działań daje identyczne wyniki.
         """
-        # 1. Pobierz 5 ostatnich ZAKOŃCZONYCH meczów dla Gospodarza i Gościa
-        # Wykluczamy ten mecz, który właśnie analizujemy (jeśli już się odbył)
-        home_last_5 = Match.objects.filter(
-            (Q(home_team=match_obj.home_team) | Q(away_team=match_obj.home_team)),
-            status='Finished',
-            date__lt=match_obj.date  # Tylko mecze sprzed daty tego meczu
-        ).order_by('-date')[:5]
-
-        away_last_5 = Match.objects.filter(
-            (Q(home_team=match_obj.away_team) | Q(away_team=match_obj.away_team)),
-            status='Finished',
-            date__lt=match_obj.date
-        ).order_by('-date')[:5]
-
-        if not home_last_5 or not away_last_5:
-            return None
-
-        metrics = [
-            'blocked_shots', 'pass_percent', 'offsides', 'goalkeeper_saves',
-            'shots_inside_box', 'corner_kicks', 'shots_on_goal',
-            'fouls', 'yellow_cards', 'red_cards'
-        ]
-
-        h_stats = {k: self._get_weighted_stat(home_last_5, match_obj.home_team.id, k) for k in metrics}
-        a_stats = {k: self._get_weighted_stat(away_last_5, match_obj.away_team.id, k) for k in metrics}
-
         raw_defense = (h_stats['blocked_shots'] + a_stats['blocked_shots']) + \
                       (h_stats['goalkeeper_saves'] + a_stats['goalkeeper_saves'])
 
@@ -108,13 +88,207 @@ class MatchAnalyzer:
                          ((h_stats['yellow_cards'] + a_stats['yellow_cards']) * 5) + \
                          ((h_stats['red_cards'] + a_stats['red_cards']) * 20)
 
-        analytics, created = MatchAnalytics.objects.update_or_create(
-            match=match_obj,
-            defaults={
-                'defense_score': self._normalize(raw_defense, self.LIMITS['DEFENSE']),
-                'tactical_score': self._normalize(raw_tactical, self.LIMITS['TACTICAL']),
-                'hype_score': self._normalize(raw_hype, self.LIMITS['HYPE']),
-                'aggression_score': self._normalize(raw_aggression, self.LIMITS['AGGRESSION'])
-            }
+        return {
+            'defense_score': (raw_defense, self.LIMITS['DEFENSE']),
+            'tactical_score': (raw_tactical, self.LIMITS['TACTICAL']),
+            'hype_score': (raw_hype, self.LIMITS['HYPE']),
+            'aggression_score': (raw_aggression, self.LIMITS['AGGRESSION']),
+        }
+
+    def _get_weighted_form_stat(self, window, stat_key):
+        """Jak _get_weighted_stat, ale na wpisach okna TeamForm (już z perspektywy drużyny)."""
+        weighted_sum = 0
+        current_weight_sum = 0
+
+        for i, entry in enumerate(window[:5]):
+            weight = self.WEIGHTS[i]
+            val = entry['stats'].get(stat_key)
+
+            weighted_sum += (val if val is not None else 0) * weight
+            current_weight_sum += weight
+
+        if current_weight_sum == 0: return 0
+        return weighted_sum / current_weight_sum
+
+    @staticmethod
+    def _form_window(form_matches, before):
+        """Okno TeamForm, jeśli zawiera dokładnie "ostatnie mecze sprzed `before`", w przeciwnym razie None."""
+        if form_matches is None:
+            return None
+        if any(datetime.fromisoformat(entry['date']) >= before for entry in form_matches):
+            return None  # Analizowany mecz jest starszy niż okno - trzeba sięgnąć do historii
+        return form_matches
+
+    def _team_weighted_stats(self, team, before):
+        """Ważone statystyki drużyny z 5 ostatnich meczów sprzed `before` albo None, gdy nie ma historii."""
+        window = self._form_window(
+            TeamForm.objects.filter(team=team).values_list('matches', flat=True).first(), before
+        )
+        if window is not None:
+            if not window:
+                return None
+            return {k: self._get_weighted_form_stat(window, k) for k in STAT_COLUMNS}
+
+        # Brak aktualnego okna - 5 ostatnich ZAKOŃCZONYCH meczów prosto z tabeli meczów
+        last_5 = Match.objects.filter(
+            (Q(home_team=team) | Q(away_team=team)),
+            status='Finished',
+            date__lt=before  # Tylko mecze sprzed daty tego meczu
+        ).select_related('home_team', 'away_team').order_by('-date')[:5]
+        if not last_5:
+            return None
+        return {k: self._get_weighted_stat(last_5, team.id, k) for k in STAT_COLUMNS}
+
+    def compute_match_scores(self, match_obj):
+        """Wskaźniki dla jednego meczu (bez zapisu) albo None, gdy brakuje historii którejś z drużyn."""
+        # Wykluczamy ten mecz, który właśnie analizujemy (jeśli już się odbył)
+        h_stats = self._team_weighted_stats(match_obj.home_team, match_obj.date)
+        a_stats = self._team_weighted_stats(match_obj.away_team, match_obj.date)
+        if h_stats is None or a_stats is None:
+            return None
+
+        return {
+            field: self._normalize(raw, limit)
+            for field, (raw, limit) in self._raw_scores(h_stats, a_stats).items()
+        }
+
+    def calculate_match_analytics(self, match_obj):
+        """
+        Główna metoda wywoływana dla konkretnego meczu (match_obj).
+        """
+        scores = self.compute_match_scores(match_obj)
+        if scores is None:
+            return None
+
+        analytics, created = MatchAnalytics.objects.update_or_create(match=match_obj, defaults=scores)
+        return analytics
+
+    # --- Tryb wsadowy: wszystkie mecze naraz, jedno zapytanie o historię i jeden zapis ---
+
+    def _team_history(self, earliest_targets, before):
+        """
+        Zakończone mecze drużyn z perspektywy każdej drużyny, posortowane po (drużyna, data):
+        tablice team_index, dat (mikrosekundy od epoki), statystyk (N x len(STAT_COLUMNS)) oraz lista ID drużyn.
+        `earliest_targets` = {team_id: data najwcześniejszego analizowanego meczu drużyny}, `before` - najpóźniejszego.
+        Drużyny z aktualnym oknem TeamForm biorą je z okna, pozostałe (bez okna lub z meczami starszymi
+        niż okno) - z tabeli meczów.
+        """
+        teams, dates, stats = [], [], []
+
+        from_history = set(earliest_targets)
+        for team_id, window in TeamForm.objects.filter(team_id__in=earliest_targets).values_list('team_id', 'matches'):
+            if self._form_window(window, earliest_targets[team_id]) is None:
+                continue
+            from_history.discard(team_id)
+            for entry in window:
+                teams.append(team_id)
+                dates.append((datetime.fromisoformat(entry['date']) - EPOCH) // timedelta(microseconds=1))
+                stats.append([entry['stats'].get(k) or 0 for k in STAT_COLUMNS])
+
+        if from_history:
+            columns = [f'{side}_{column}' for side in ('home', 'away') for column in STAT_COLUMNS.values()]
+            rows = Match.objects.filter(
+                Q(home_team_id__in=from_history) | Q(away_team_id__in=from_history),
+                status='Finished',
+                date__lt=before,
+            ).values_list('date', 'home_team_id', 'away_team_id', *columns)
+            n_stats = len(STAT_COLUMNS)
+            # Każdy mecz występuje dwa razy: raz jako mecz gospodarza, raz jako mecz gościa
+            for row in rows:
+                date = (row[0] - EPOCH) // timedelta(microseconds=1)
+                for team_id, values in ((row[1], row[3:3 + n_stats]), (row[2], row[3 + n_stats:])):
+                    if team_id in from_history:
+                        teams.append(team_id)
+                        dates.append(date)
+                        stats.append([v or 0 for v in values])
+
+        if not teams:
+            return np.empty(0, np.int64), np.empty(0, np.int64), np.empty((0, len(STAT_COLUMNS)), np.int64), []
+
+        team_list, team_index = np.unique(np.array(teams, dtype=np.int64), return_inverse=True)
+        dates = np.array(dates, dtype=np.int64)
+        stats = np.array(stats, dtype=np.int64)
+        order = np.lexsort((dates, team_index))
+        return team_index[order], dates[order], stats[order], team_list.tolist()
+
+    def _weighted_windows(self, stats, segment_start, window_end):
+        """
+        Ważona średnia z (maksymalnie) 5 meczów poprzedzających window_end w segmencie drużyny;
+        zwraca (średnie T x len(STAT_COLUMNS), maska "drużyna ma historię").
+        """
+        count = np.minimum(window_end - segment_start, len(self.WEIGHTS))
+
+        # offsets[k] = k-ty mecz od najnowszego; waga 0 poza oknem
+        offsets = np.arange(len(self.WEIGHTS))
+        valid = offsets[None, :] < count[:, None]
+        weights = np.where(valid, np.array(self.WEIGHTS)[None, :], 0)
+        if len(stats):
+            idx = np.where(valid, window_end[:, None] - 1 - offsets[None, :], 0)
+            weighted_sum = np.einsum('tk,tks->ts', weights, stats[idx])
+        else:
+            weighted_sum = np.zeros((len(window_end), len(STAT_COLUMNS)), np.int64)
+        weight_sum = weights.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averages = weighted_sum / weight_sum[:, None]
+        return averages, count > 0
+
+    def compute_batch(self, matches):
+        """
+        Wskaźniki dla wielu meczów naraz: {match_id: {pole: wartość}}.
+        Mecze bez historii którejś z drużyn są pomijane (jak None w compute_match_scores).
+        """
+        if hasattr(matches, 'values_list'):
+            targets = list(matches.values_list('id', 'date', 'home_team_id', 'away_team_id'))
+        else:
+            targets = [(m.id, m.date, m.home_team_id, m.away_team_id) for m in matches]
+        if not targets:
+            return {}
+
+        earliest_targets = {}
+        for _, date, home_id, away_id in targets:
+            for team_id in (home_id, away_id):
+                earliest_targets[team_id] = min(date, earliest_targets.get(team_id, date))
+        team_index, dates, stats, team_list = self._team_history(earliest_targets, max(t[1] for t in targets))
+        position = {team_id: i for i, team_id in enumerate(team_list)}
+
+        target_dates = np.array([(t[1] - EPOCH) // timedelta(microseconds=1) for t in targets], dtype=np.int64)
+        # Klucz (drużyna, ranga daty) w jednej liczbie - historia jest po nim posortowana,
+        # więc początek segmentu drużyny i koniec okna znajduje jedno searchsorted dla wszystkich meczów
+        all_dates = np.unique(np.concatenate([dates, target_dates]))
+        span = len(all_dates) + 1
+        history_keys = team_index * span + np.searchsorted(all_dates, dates)
+        target_rank = np.searchsorted(all_dates, target_dates)
+
+        windows = []
+        for column in (2, 3):
+            # Drużyna bez żadnego meczu dostaje pozycję spoza zakresu - pusty segment
+            pos = np.array([position.get(t[column], len(team_list)) for t in targets], dtype=np.int64)
+            segment_start = np.searchsorted(history_keys, pos * span, side='left')
+            window_end = np.searchsorted(history_keys, pos * span + target_rank, side='left')
+            windows.append(self._weighted_windows(stats, segment_start, window_end))
+        (home_avg, home_ok), (away_avg, away_ok) = windows
+
+        h_stats = {k: home_avg[:, i] for i, k in enumerate(STAT_COLUMNS)}
+        a_stats = {k: away_avg[:, i] for i, k in enumerate(STAT_COLUMNS)}
+        scores = {
+            field: np.minimum(np.rint((raw / limit) * 100), 100)
+            for field, (raw, limit) in self._raw_scores(h_stats, a_stats).items()
+        }
+
+        ok = home_ok & away_ok
+        return {
+            target[0]: {field: float(scores[field][i]) for field in SCORE_FIELDS}
+            for i, target in enumerate(targets) if ok[i]
+        }
+
+    def calculate_batch(self, matches):
+        """Liczy wskaźniki dla wszystkich meczów i zapisuje je jednym upsertem; zwraca liczbę zapisanych analiz."""
+        results = self.compute_batch(matches)
+        MatchAnalytics.objects.bulk_create(
+            [MatchAnalytics(match_id=match_id, **scores) for match_id, scores in results.items()],
+            update_conflicts=True,
+            unique_fields=['match'],
+            update_fields=SCORE_FIELDS + ['calculated_at'],
+            batch_size=500,
         )
-        return analytics
\ No newline at end of file
+        return len(results)
@@ -0,0 +1,101 @@
+# SportApp/analytics_backfill.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from django.db import connections
+from .models import Match, MatchAnalytics, AnalyticsBackfillSkip
+
+
+@dataclass
+class AnalyticsBackfillProgress:
+    total: int = 0
+    processed: int = 0
+    written: int = 0
+    started: float = 0.0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def matches_per_second(self):
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _init_worker(settings_module):
+    # Przy "spawn" proces potomny startuje bez Django; przy "fork" setup() jest no-opem
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _backfill_chunk(match_ids):
+    """
+    Kawałek sezonu w procesie roboczym: analizy "na dzień meczu" liczone wsadowo i zapisane jednym upsertem.
+    Mecze bez analizy dostają znacznik AnalyticsBackfillSkip.
+    """
+    from .analytics import MatchAnalyzer
+    try:
+        written = MatchAnalyzer().calculate_batch(Match.objects.filter(id__in=match_ids))
+        analyzed = set(MatchAnalytics.objects.filter(match_id__in=match_ids).values_list('match_id', flat=True))
+        AnalyticsBackfillSkip.objects.filter(match_id__in=analyzed).delete()
+        AnalyticsBackfillSkip.objects.bulk_create(
+            [AnalyticsBackfillSkip(match_id=match_id) for match_id in match_ids if match_id not in analyzed],
+            ignore_conflicts=True,
+        )
+        return len(match_ids), written
+    finally:
+        connections.close_all()
+
+
+class AnalyticsBackfill:
+    """
+    Historyczne analizy dla rozegranych meczów sezonów - każdy mecz liczony tylko z danych sprzed jego daty
+    (jak calculate_match_analytics). Sezon dzielony jest na kawałki po `chunk_size` meczów liczone w puli procesów.
+    Wznawianie: mecze, które mają już MatchAnalytics albo znacznik AnalyticsBackfillSkip (przetworzone bez analizy),
+    są pomijane (chyba że recompute=True).
+    """
+
+    def __init__(self, workers=None, chunk_size=200):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def pending_matches(self, season_ids, recompute=False):
+        matches = Match.objects.filter(season_id__in=season_ids, status='Finished')
+        if not recompute:
+            matches = matches.filter(analytics__isnull=True, analytics_skip__isnull=True)
+        return list(matches.order_by('date', 'id').values_list('id', flat=True))
+
+    def run(self, season_ids, recompute=False, on_chunk=None):
+        match_ids = self.pending_matches(season_ids, recompute)
+        chunks = [match_ids[i:i + self.chunk_size] for i in range(0, len(match_ids), self.chunk_size)]
+        progress = AnalyticsBackfillProgress(total=len(match_ids), started=time.monotonic())
+        if not chunks:
+            return progress
+
+        if self.workers == 1:
+            results = (_backfill_chunk(chunk) for chunk in chunks)
+            for processed, written in results:
+                self._record(progress, processed, written, on_chunk)
+            return progress
+
+        # Procesy potomne nie mogą dziedziczyć otwartego połączenia z bazą
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'SportProject.settings'),),
+        ) as pool:
+            futures = [pool.submit(_backfill_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                processed, written = future.result()
+                self._record(progress, processed, written, on_chunk)
+        return progress
+
+    @staticmethod
+    def _record(progress, processed, written, on_chunk):
+        progress.processed += processed
+        progress.written += written
+        if on_chunk:
+            on_chunk(progress)
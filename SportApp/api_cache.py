@@ -0,0 +1,136 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from django.conf import settings
+
+
+@dataclass
+class CacheEntry:
+    payload: list
+    etag: str
+    last_modified: str
+    stored_at: float
+    fresh: bool
+
+
+class ResponseCache:
+    """
+    Trwały cache odpowiedzi API-Football w pliku SQLite.
+    Klucz to skrót (sha256) z endpointu i posortowanych parametrów, TTL ustalany per endpoint.
+    Przy przekroczeniu limitu wpisów lub rozmiaru usuwane są najdawniej używane wpisy (LRU).
+    """
+
+    def __init__(self, path, ttls, max_entries, max_bytes):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            # WAL pozwala kilku procesom (cron + poller) czytać cache równocześnie
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    @staticmethod
+    def make_key(endpoint, params):
+        raw = json.dumps([endpoint, sorted((str(k), str(v)) for k, v in params.items())])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def is_cacheable(self, endpoint):
+        return self.ttls.get(endpoint, 0) > 0
+
+    def get(self, endpoint, params):
+        """Zwraca wpis (także przeterminowany - do rewalidacji) albo None."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+
+        body, etag, last_modified, stored_at = row
+        fresh = now - stored_at < self.ttls.get(endpoint, 0)
+        return CacheEntry(json.loads(body), etag, last_modified, stored_at, fresh)
+
+    def set(self, endpoint, params, payload, etag=None, last_modified=None):
+        key = self.make_key(endpoint, params)
+        body = json.dumps(payload)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, endpoint, params, body, etag, last_modified, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(params, sort_keys=True, default=str), body,
+                 etag, last_modified, now, now, len(body))
+            )
+            self._evict()
+
+    def touch(self, endpoint, params):
+        """Odpowiedź 304 - treść jest aktualna, więc odnawiamy TTL bez pobierania danych."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+
+    def clear(self, endpoint=None):
+        with self._lock, self._conn:
+            if endpoint is None:
+                self._conn.execute("DELETE FROM responses")
+            else:
+                self._conn.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+
+    def _evict(self):
+        count, total_size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total_size <= self.max_bytes:
+            return
+
+        to_delete = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if count <= self.max_entries and total_size <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            count -= 1
+            total_size -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Zwraca cache wspólny dla procesu albo None, jeśli cache jest wyłączony w ustawieniach."""
+    global _shared_cache
+    if not settings.API_FOOTBALL_CACHE_ENABLED:
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                path=settings.API_FOOTBALL_CACHE_PATH,
+                ttls=settings.API_FOOTBALL_CACHE_TTLS,
+                max_entries=settings.API_FOOTBALL_CACHE_MAX_ENTRIES,
+                max_bytes=settings.API_FOOTBALL_CACHE_MAX_BYTES,
+            )
+        return _shared_cache
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class SportappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'SportApp'
+
+    def ready(self):
+        from django.contrib.auth.models import Group
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from .models import User
+        from .permissions import groups_changed, group_changed, user_deleted
+
+        # Cache ról (permissions.role_cache) - unieważniany przy każdej zmianie członkostwa w grupach
+        m2m_changed.connect(groups_changed, sender=User.groups.through, dispatch_uid='role_cache_groups')
+        post_save.connect(group_changed, sender=Group, dispatch_uid='role_cache_group_save')
+        post_delete.connect(group_changed, sender=Group, dispatch_uid='role_cache_group_delete')
+        post_delete.connect(user_deleted, sender=User, dispatch_uid='role_cache_user_delete')
@@ -0,0 +1,61 @@
+# SportApp/authentication.py
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .permissions import load_roles
+
+# Claim z rolami (grupami z ROLE_GROUPS) w tokenach JWT
+ROLES_CLAIM = 'roles'
+
+
+class RoleTokenUser(TokenUser):
+    """Użytkownik z podpisanego tokenu - bez wiersza z bazy; role z claimu 'roles'."""
+
+    @cached_property
+    def roles(self):
+        # Token sprzed wprowadzenia claimu - role z cache / bazy (permissions.user_roles)
+        roles = self.token.get(ROLES_CLAIM)
+        return frozenset(roles) if roles is not None else None
+
+
+class RoleClaimsAuthentication(JWTStatelessUserAuthentication):
+    """JWT bez zapytania o użytkownika: tożsamość i role wyłącznie z podpisanego tokenu."""
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        return RoleTokenUser(user.token)
+
+
+class RoleRefreshToken(RefreshToken):
+    """Przy odświeżeniu role są czytane z bazy - zmiana grup trafia do tokenów najpóźniej po ACCESS_TOKEN_LIFETIME."""
+
+    @property
+    def access_token(self):
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            # Także w rotowanym refresh tokenie (serializer serializuje go po access tokenie)
+            roles = load_roles(user_id)
+            self[ROLES_CLAIM] = sorted(roles)
+            self['is_admin'] = 'Admin' in roles
+        return super().access_token
+
+
+class RoleClaimsViewSetMixin:
+    """
+    Odczyty (GET/HEAD/OPTIONS) uwierzytelniane samym tokenem (RoleClaimsAuthentication), gdy JWT_ROLE_CLAIMS:
+    sprawdzenie uprawnień bez zapytań do bazy. Zapisy - zwykłe JWTAuthentication (użytkownik z bazy).
+    Tylko dla widoków, które przy odczycie nie używają danych użytkownika poza id i rolami.
+    """
+
+    def get_authenticators(self):
+        # self.request to jeszcze żądanie Django (wywołanie z initialize_request). Schemat OpenAPI (swagger_fake_view)
+        # opisuje zwykłe jwtAuth - ten sam nagłówek Bearer
+        request = getattr(self, 'request', None)
+        if (settings.JWT_ROLE_CLAIMS and request is not None and request.method in SAFE_METHODS
+                and not getattr(self, 'swagger_fake_view', False)):
+            return [RoleClaimsAuthentication()]
+        return super().get_authenticators()
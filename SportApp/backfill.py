@@ -0,0 +1,152 @@
+# SportApp/backfill.py
+from dataclasses import dataclass, field
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .changes import matches_changed
+from .ingestion import STAT_FIELDS, apply_fixture_statistics
+from .metrics import metrics
+from .models import Match, StatisticsFetch, AnalyticsRecompute
+from .services import FootballAPIError, QuotaExhaustedError, statistics_settled_at
+
+
+@dataclass
+class BackfillProgress:
+    processed: int = 0
+    updated: int = 0
+    empty: int = 0
+    failed: int = 0
+    quota_exhausted: bool = False
+    updated_ids: list = field(default_factory=list)
+
+
+class StatisticsBackfill:
+    """
+    Pobiera brakujące statystyki zakończonych meczów dla całego zaległego zbioru.
+
+    - zapytania lecą równolegle (pula wątków serwisu), tempo wyznacza wspólny limiter API,
+    - każda paczka jest zapisywana od razu (bulk_update tylko kolumn statystyk), więc przerwane
+      uruchomienie wznawia się od miejsca, w którym skończyło,
+    - mecze bez statystyk w API dostają termin ponownej próby (rosnący wykładniczo), a po
+      MAX_ATTEMPTS pustych odpowiedziach przestajemy o nie pytać,
+    - statystyki pobrane tuż po meczu (mogą być niepełne) są pobierane ponownie po statistics_settled_at.
+    """
+    RETRY_BASE = timedelta(hours=6)
+    RETRY_MAX = timedelta(days=7)
+    MAX_ATTEMPTS = 5
+
+    def __init__(self, service, batch_size=50):
+        self.service = service
+        self.batch_size = batch_size
+
+    def pending_matches(self, match_ids=None):
+        """Mecze zakończone, bez statystyk (albo z tymczasowymi), których termin ponownej próby już minął."""
+        now = timezone.now()
+        queryset = Match.objects.filter(
+            Q(home_total_shots__isnull=True) | Q(statistics_fetch__last_result=StatisticsFetch.RESULT_PROVISIONAL),
+            status='Finished',
+        ).filter(
+            Q(statistics_fetch__isnull=True) | Q(statistics_fetch__retry_after__lte=now)
+        )
+        if match_ids is not None:
+            queryset = queryset.filter(id__in=match_ids)
+        # api_id drużyn dociągamy w tym samym zapytaniu (JOIN), a nie osobno dla każdego meczu
+        return queryset.order_by('-date').values_list('id', 'api_id', 'home_team__api_id', 'away_team__api_id', 'date')
+
+    def run(self, limit=None, match_ids=None, on_batch=None):
+        candidates = list(self.pending_matches(match_ids))
+        if limit is not None:
+            candidates = candidates[:limit]
+
+        progress = BackfillProgress()
+        for start in range(0, len(candidates), self.batch_size):
+            batch = candidates[start:start + self.batch_size]
+            self._process_batch(batch, progress)
+            if on_batch:
+                on_batch(progress, len(candidates))
+            if progress.quota_exhausted:
+                break
+        return progress
+
+    def _process_batch(self, batch, progress):
+        with metrics.stage('statistics'):
+            self._fetch_and_save(batch, progress)
+
+    def _fetch_and_save(self, batch, progress):
+        results = self.service.fetch_concurrently(
+            self.service.get_fixture_statistics,
+            [(api_id, date) for _, api_id, _, _, date in batch],
+            return_exceptions=True
+        )
+
+        updated = []
+        attempts = {}
+        settled_at = {}
+        now = timezone.now()
+        for (match_id, api_id, home_api_id, away_api_id, date), stats_data in zip(batch, results):
+            if isinstance(stats_data, QuotaExhaustedError):
+                # Zapytania, które nie wyszły z powodu limitu, nie liczą się jako próba
+                progress.quota_exhausted = True
+                continue
+
+            progress.processed += 1
+            if isinstance(stats_data, FootballAPIError):
+                progress.failed += 1
+                attempts[match_id] = StatisticsFetch.RESULT_ERROR
+                continue
+
+            match = Match(id=match_id, api_id=api_id)
+            if stats_data and apply_fixture_statistics(match, stats_data, home_api_id, away_api_id):
+                updated.append(match)
+                if statistics_settled_at(date) > now:
+                    attempts[match_id] = StatisticsFetch.RESULT_PROVISIONAL
+                    settled_at[match_id] = statistics_settled_at(date)
+            else:
+                progress.empty += 1
+                attempts[match_id] = StatisticsFetch.RESULT_EMPTY
+
+        with transaction.atomic():
+            # Tylko kolumny statystyk - reszta wiersza (wynik, status...) zostaje nietknięta
+            Match.objects.bulk_update(updated, STAT_FIELDS, batch_size=self.batch_size)
+            StatisticsFetch.objects.filter(match_id__in=[m.id for m in updated if m.id not in attempts]).delete()
+            self._record_attempts(attempts, settled_at)
+            matches_changed((m.id for m in updated), AnalyticsRecompute.REASON_STATISTICS)
+
+        metrics.record_rows('match_statistics', updated=len(updated), unchanged=len(attempts) - len(settled_at))
+        progress.updated += len(updated)
+        progress.updated_ids.extend(m.id for m in updated)
+
+    def _record_attempts(self, attempts, settled_at):
+        if not attempts:
+            return
+        now = timezone.now()
+        existing = {
+            fetch.match_id: fetch
+            for fetch in StatisticsFetch.objects.filter(match_id__in=attempts.keys())
+        }
+
+        rows = []
+        for match_id, result in attempts.items():
+            fetch = existing.get(match_id) or StatisticsFetch(match_id=match_id)
+            if result != StatisticsFetch.RESULT_PROVISIONAL:
+                fetch.attempts += 1
+            fetch.last_result = result
+            fetch.last_attempt_at = now
+            if result == StatisticsFetch.RESULT_PROVISIONAL:
+                # Zapisane, ale mogą być niepełne - jedno ponowne pobranie, gdy API je uzupełni
+                fetch.retry_after = settled_at[match_id]
+            elif result == StatisticsFetch.RESULT_ERROR:
+                # Błąd zapytania nie mówi nic o samym meczu - próbujemy ponownie przy następnym uruchomieniu
+                fetch.retry_after = now
+            elif fetch.attempts >= self.MAX_ATTEMPTS:
+                fetch.retry_after = None
+            else:
+                fetch.retry_after = now + min(self.RETRY_MAX, self.RETRY_BASE * 2 ** (fetch.attempts - 1))
+            rows.append(fetch)
+
+        StatisticsFetch.objects.bulk_create(
+            rows,
+            update_conflicts=True, unique_fields=['match'],
+            update_fields=['attempts', 'last_result', 'last_attempt_at', 'retry_after']
+        )
@@ -0,0 +1,150 @@
+# SportApp/benchmarking.py
+import json
+import math
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from django.db import connection
+
+
+class QueryCounter:
+    """Liczy zapytania SQL przez execute_wrapper - działa także przy DEBUG=False."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@dataclass
+class Measurement:
+    name: str
+    wall_seconds: float = 0.0
+    queries: int = 0
+    peak_memory_mb: float = 0.0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+@contextmanager
+def measure(name):
+    """
+    Mierzy czas, liczbę zapytań i szczytowe zużycie pamięci (tracemalloc) bloku kodu:
+
+        with measure('full sync') as m:
+            ...
+        print(m.wall_seconds, m.queries, m.peak_memory_mb)
+    """
+    result = Measurement(name)
+    counter = QueryCounter()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(counter):
+            yield result
+    finally:
+        result.wall_seconds = round(time.perf_counter() - started, 4)
+        result.queries = counter.count
+        result.peak_memory_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+
+
+def format_table(measurements):
+    lines = [f"{'scenariusz':<36} {'czas [s]':>10} {'zapytania':>10} {'pamięć [MB]':>12}"]
+    for m in measurements:
+        lines.append(f"{m.name:<36} {m.wall_seconds:>10.3f} {m.queries:>10} {m.peak_memory_mb:>12.2f}")
+    return "\n".join(lines)
+
+
+def save_json(path, payload):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+
+@dataclass
+class LatencyMeasurement:
+    name: str
+    calls: int = 0
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    queries_per_call: float = 0.0
+    peak_memory_mb: float = 0.0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def percentile(sorted_values, p):
+    """Percentyl metodą najbliższej rangi (wartość, która faktycznie wystąpiła)."""
+    return sorted_values[max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+def measure_calls(name, fn, repeat=20, warmup=1):
+    """
+    Wywołuje fn() `repeat` razy: percentyle czasu i średnia liczba zapytań na wywołanie. Pamięć (tracemalloc)
+    mierzona w osobnym wywołaniu - śledzenie alokacji spowalnia kod i zafałszowałoby czasy.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return LatencyMeasurement(
+        name=name,
+        calls=repeat,
+        mean_ms=round(sum(timings) / repeat, 3),
+        p50_ms=round(percentile(timings, 50), 3),
+        p95_ms=round(percentile(timings, 95), 3),
+        p99_ms=round(percentile(timings, 99), 3),
+        max_ms=round(timings[-1], 3),
+        queries_per_call=round(counter.count / repeat, 2),
+        peak_memory_mb=round(peak / (1024 * 1024), 2),
+    )
+
+
+def format_latency_table(measurements):
+    lines = [f"{'scenariusz':<40} {'p50 [ms]':>10} {'p95 [ms]':>10} {'p99 [ms]':>10} "
+             f"{'zapytania':>10} {'pamięć [MB]':>12}"]
+    for m in measurements:
+        lines.append(f"{m.name:<40} {m.p50_ms:>10.2f} {m.p95_ms:>10.2f} {m.p99_ms:>10.2f} "
+                     f"{m.queries_per_call:>10.1f} {m.peak_memory_mb:>12.2f}")
+    return "\n".join(lines)
+
+
+def compare_with_baseline(measurements, baseline, tolerance=0.25):
+    """
+    Porównanie z zapisanym wcześniej wynikiem ({"results": [as_dict(), ...]}). Regresja: p50 lub p95 wolniejsze
+    o więcej niż `tolerance` albo więcej zapytań na wywołanie (liczba zapytań jest deterministyczna).
+    Zwraca listę (nazwa, metryka, było, jest, regresja).
+    """
+    previous = {row['name']: row for row in baseline.get('results', [])}
+    rows = []
+    for m in measurements:
+        old = previous.get(m.name)
+        if old is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            rows.append((m.name, metric, old[metric], getattr(m, metric),
+                         getattr(m, metric) > old[metric] * (1 + tolerance)))
+        rows.append((m.name, 'queries_per_call', old['queries_per_call'], m.queries_per_call,
+                     m.queries_per_call > old['queries_per_call']))
+    return rows
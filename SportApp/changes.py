@@ -0,0 +1,198 @@
+# SportApp/changes.py
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .analytics import MatchAnalyzer
+from .elo import apply_results, replay_elo_from
+from .form import update_team_forms, rebuild_team_forms
+from .models import Match, AnalyticsRecompute, SeasonRecompute, EloRecompute
+from .response_cache import invalidate_responses
+from .simulation import resimulate_seasons
+from .standings import update_standings
+from .strength import refit_strength_models
+from .team_stats import refresh_team_season_stats
+
+
+def upcoming_fixture_ids(team_ids):
+    """Zaplanowane mecze drużyn (indeksy drużyna/status/data na Match)."""
+    return list(Match.objects.filter(
+        Q(home_team_id__in=team_ids) | Q(away_team_id__in=team_ids), status='Scheduled'
+    ).values_list('id', flat=True))
+
+
+def _not_before(now):
+    return now + timedelta(seconds=settings.ANALYTICS_RECOMPUTE_DEBOUNCE)
+
+
+def enqueue_recompute(match_ids, reason, now=None):
+    """
+    Dopisuje mecze do kolejki przeliczeń. Mecz już czekający w kolejce zachowuje swój termin (not_before),
+    zmienia się tylko requested_at - dzięki temu seria wyników z jednego dnia daje jedno przeliczenie.
+    """
+    match_ids = set(match_ids)
+    if not match_ids:
+        return 0
+    now = now or timezone.now()
+    AnalyticsRecompute.objects.bulk_create(
+        [AnalyticsRecompute(match_id=match_id, reason=reason, requested_at=now, not_before=_not_before(now))
+         for match_id in match_ids],
+        update_conflicts=True, unique_fields=['match'], update_fields=['requested_at'],
+        batch_size=500,
+    )
+    return len(match_ids)
+
+
+def enqueue_season_recompute(season_ids, now=None):
+    """Sezony do ponownego dopasowania modelu siły i symulacji - z tym samym debounce co enqueue_recompute."""
+    season_ids = set(season_ids)
+    if not season_ids:
+        return 0
+    now = now or timezone.now()
+    SeasonRecompute.objects.bulk_create(
+        [SeasonRecompute(season_id=season_id, requested_at=now, not_before=_not_before(now))
+         for season_id in season_ids],
+        update_conflicts=True, unique_fields=['season'], update_fields=['requested_at'],
+    )
+    return len(season_ids)
+
+
+def enqueue_elo_recompute(match_ids=(), replay_from=None, now=None):
+    """
+    Zmiany rankingu Elo (process_elo_queue) - z tym samym debounce co enqueue_recompute.
+    replay_from - data usuniętego meczu: historia zostanie przeliczona od niej.
+    """
+    now = now or timezone.now()
+    entries = [EloRecompute(match_id=match_id, requested_at=now, not_before=_not_before(now))
+               for match_id in set(match_ids)]
+    EloRecompute.objects.bulk_create(
+        entries, update_conflicts=True, unique_fields=['match'], update_fields=['requested_at'], batch_size=500,
+    )
+    if replay_from is not None:
+        EloRecompute.objects.create(replay_from=replay_from, requested_at=now, not_before=_not_before(now))
+        return len(entries) + 1
+    return len(entries)
+
+
+def teams_changed(team_ids, reason, now=None):
+    """Forma drużyn się zmieniła - w kolejce lądują wszystkie ich nadchodzące mecze."""
+    return enqueue_recompute(upcoming_fixture_ids(set(team_ids)), reason, now)
+
+
+def matches_changed(match_ids, reason=AnalyticsRecompute.REASON_RESULT, now=None):
+    """
+    Mecz zakończył się, dostał statystyki albo przestał być zakończony: od razu aktualizuje okna formy
+    i statystyki sezonu obu drużyn oraz tabelę sezonu (z cache odpowiedzi API) - tanie zmiany per mecz.
+    Ranking Elo (wspólny dla lig synchronizowanych równolegle), kosztowne przeliczenia sezonu (model siły drużyn,
+    symulacje) i analizy nadchodzących meczów trafiają do kolejki (process_recompute_queue) - poza transakcję
+    zapisu meczu.
+    """
+    match_ids = list(match_ids)
+    if not match_ids:
+        return 0
+    update_team_forms(match_ids)
+    pairs = set()
+    for season_id, home_id, away_id in Match.objects.filter(id__in=match_ids).values_list(
+        'season_id', 'home_team_id', 'away_team_id'
+    ):
+        pairs.update(((home_id, season_id), (away_id, season_id)))
+    refresh_team_season_stats(pairs)
+    season_ids = {season_id for _, season_id in pairs}
+    update_standings(season_ids)
+    invalidate_responses(season_ids)
+    if reason != AnalyticsRecompute.REASON_STATISTICS:
+        enqueue_elo_recompute(match_ids, now=now)
+        enqueue_season_recompute(season_ids, now)
+    return teams_changed({team_id for team_id, _ in pairs}, reason, now)
+
+
+def match_removed(team_ids, season_id, was_finished, played_at=None, now=None):
+    """
+    Zakończony mecz zniknął z historii drużyn (usunięty lub przepięty) - ich okna formy budujemy od nowa.
+    played_at - data usuniętego meczu: ranking Elo zostanie przeliczony od niej (przepięty mecz obsługuje
+    matches_changed).
+    """
+    team_ids = set(team_ids)
+    if not was_finished or not team_ids:
+        return 0
+    if played_at is not None:
+        enqueue_elo_recompute(replay_from=played_at, now=now)
+    rebuild_team_forms(team_ids)
+    refresh_team_season_stats((team_id, season_id) for team_id in team_ids)
+    update_standings([season_id])
+    invalidate_responses([season_id])
+    enqueue_season_recompute([season_id], now)
+    return teams_changed(team_ids, AnalyticsRecompute.REASON_ADMIN, now)
+
+
+def _dequeue(queue, entry_ids, now):
+    """Usuwa przetworzone wpisy; zgłoszenia nowsze niż przebieg (requested_at > now) czekają z nowym terminem."""
+    with transaction.atomic():
+        queue.objects.filter(id__in=entry_ids, requested_at__lte=now).delete()
+        queue.objects.filter(id__in=entry_ids).update(not_before=_not_before(timezone.now()))
+
+
+def process_elo_queue(now=None, flush=False):
+    """
+    Zmiany rankingu Elo z kolejki, jednym przebiegiem: przeliczenie od najwcześniejszego usuniętego meczu,
+    potem zmienione mecze (apply_results). Zwraca liczbę przetworzonych wpisów.
+    """
+    now = now or timezone.now()
+    due = EloRecompute.objects.order_by('not_before')
+    if not flush:
+        due = due.filter(not_before__lte=now)
+    entries = list(due.values_list('id', 'match_id', 'replay_from'))
+    if not entries:
+        return 0
+
+    starts = [replay_from for _, _, replay_from in entries if replay_from is not None]
+    if starts:
+        replay_elo_from(min(starts))
+    match_ids = [match_id for _, match_id, _ in entries if match_id is not None]
+    if match_ids:
+        apply_results(match_ids)
+    _dequeue(EloRecompute, [entry_id for entry_id, _, _ in entries], now)
+    return len(entries)
+
+
+def process_season_queue(now=None, flush=False):
+    """Ponowne dopasowanie modeli siły i nowe symulacje sezonów z kolejki; zwraca liczbę sezonów."""
+    now = now or timezone.now()
+    due = SeasonRecompute.objects.order_by('not_before')
+    if not flush:
+        due = due.filter(not_before__lte=now)
+    entries = list(due.values_list('id', 'season_id'))
+    if not entries:
+        return 0
+
+    season_ids = [season_id for _, season_id in entries]
+    refit_strength_models(season_ids)
+    resimulate_seasons(season_ids)
+    _dequeue(SeasonRecompute, [entry_id for entry_id, _ in entries], now)
+    return len(entries)
+
+
+def process_recompute_queue(now=None, limit=None, flush=False):
+    """
+    Przetwarza kolejki, których termin minął: ranking Elo (process_elo_queue), sezony (process_season_queue),
+    potem (wsadowo) wskaźniki meczów; zwraca (przeliczone mecze, zapisane analizy).
+    flush=True pomija debounce (np. na końcu synchronizacji, gdy seria zmian na pewno się skończyła).
+    Zgłoszenie, które przyszło w trakcie przeliczania, zostaje w kolejce do następnego przebiegu.
+    """
+    now = now or timezone.now()
+    process_elo_queue(now, flush)
+    process_season_queue(now, flush)
+    due = AnalyticsRecompute.objects.order_by('not_before')
+    if not flush:
+        due = due.filter(not_before__lte=now)
+    if limit is not None:
+        due = due[:limit]
+    entries = list(due.values_list('id', 'match_id'))
+    if not entries:
+        return 0, 0
+
+    match_ids = [match_id for _, match_id in entries]
+    written = MatchAnalyzer().calculate_batch(Match.objects.filter(id__in=match_ids, status='Scheduled'))
+    _dequeue(AnalyticsRecompute, [entry_id for entry_id, _ in entries], now)
+    return len(entries), written
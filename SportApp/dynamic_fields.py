@@ -0,0 +1,170 @@
+# SportApp/dynamic_fields.py
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def requested_fields(request):
+    """(pola z ?fields= albo None = wszystkie, pola z ?expand=)."""
+    def names(param):
+        value = request.query_params.get(param) if request is not None else None
+        return {name.strip() for name in value.split(',') if name.strip()} if value else None
+
+    return names(FIELDS_PARAM), names(EXPAND_PARAM) or set()
+
+
+class ExpandableField:
+    """
+    Pole dodawane tylko na żądanie (?expand=<nazwa>); pole o tej samej nazwie (np. samo ID) jest zastępowane.
+    select_related / prefetch_related / annotations - co dociągnąć do zapytania, gdy pole jest rozwinięte.
+    """
+
+    def __init__(self, serializer_class, select_related=(), prefetch_related=(), annotations=None, **kwargs):
+        self.serializer_class = serializer_class
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+        self.annotations = annotations or {}
+        self.kwargs = {'read_only': True, **kwargs}
+
+    def build(self):
+        # Ścieżka tekstowa ('SportApp.serializers.X') pozwala wskazać serializer zdefiniowany niżej w module
+        serializer_class = self.serializer_class
+        if isinstance(serializer_class, str):
+            serializer_class = import_string(serializer_class)
+        return serializer_class(**self.kwargs)
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer z ?fields=a,b (tylko wskazane pola) i ?expand=x,y (pola z Meta.expandable_fields).
+    Parametry dotyczą tylko serializera głównego - zagnieżdżone zwracają swoje pola bez zmian.
+
+    Meta.expandable_fields = {'home_team': ExpandableField(TeamSerializer, select_related=['home_team'])}
+    Meta.field_sources = {'name': ['league']} - kolumny i relacje potrzebne polom, których źródła nie widać
+    (SerializerMethodField, property); pola z relacją w `source` (np. 'team.name') są rozpoznawane same.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        # Zapis zawsze na pełnym serializerze - rozwinięcie zamienia zapisywalne ID na obiekt tylko do odczytu
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        fields, expand = requested_fields(request)
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expand & expandable.keys():
+            self.fields[name] = expandable[name].build()
+        if fields is not None:
+            for name in set(self.fields) - fields - expand:
+                self.fields.pop(name)
+
+    def query_plan(self):
+        """
+        Co zapytanie musi pobrać dla bieżących pól: (select_related, prefetch_related, adnotacje, kolumny).
+        Kolumny = None, gdy któregoś pola nie da się przypisać do kolumn modelu (wtedy bez only()).
+        """
+        select, prefetch, columns = _relations(self, self.Meta.model)
+        annotations = {}
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in self.fields.keys() & expandable.keys():
+            spec = expandable[name]
+            select.update(spec.select_related)
+            prefetch.update(spec.prefetch_related)
+            annotations.update(spec.annotations)
+        return select, prefetch, annotations, columns
+
+
+def _model_field(model, name):
+    """Pole modelu po nazwie atrybutu - także odwrotne relacje bez related_name (np. 'season_set')."""
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        for relation in model._meta.related_objects:
+            if relation.get_accessor_name() == name:
+                return relation
+    return None
+
+
+def _relations(serializer, model, prefix=''):
+    """Relacje (select/prefetch) potrzebne polom serializera i kolumny modelu, z których korzystają."""
+    select, prefetch = set(), set()
+    columns = {model._meta.pk.name}
+    meta = getattr(serializer, 'Meta', None)
+    declared = getattr(meta, 'field_sources', {})
+    expandable = getattr(meta, 'expandable_fields', {})
+
+    for name, field in serializer.fields.items():
+        if name in declared:
+            for lookup in declared[name]:
+                model_field = _model_field(model, lookup.split('__')[0])
+                if model_field is not None and model_field.is_relation:
+                    select.add(prefix + lookup)
+                if columns is not None and model_field is not None and model_field.concrete:
+                    columns.add(model_field.name)
+            continue
+        if field.source == '*':
+            # Pole liczone z całego obiektu - z adnotacji rozwinięcia albo z nieznanych kolumn
+            spec = expandable.get(name)
+            if spec is None or not spec.annotations:
+                columns = None
+            continue
+
+        parts = field.source.split('.')
+        model_field = _model_field(model, parts[0])
+        if model_field is None:
+            columns = None  # property lub metoda modelu
+            continue
+        if columns is not None and model_field.concrete:
+            columns.add(model_field.name)
+        if not model_field.is_relation:
+            continue
+
+        path = prefix + parts[0]
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.add(path)
+            if isinstance(nested, serializers.BaseSerializer):
+                nested_select, nested_prefetch, _ = _relations(nested, model_field.related_model, path + '__')
+                prefetch |= nested_select | nested_prefetch
+        elif isinstance(nested, serializers.BaseSerializer):
+            select.add(path)
+            nested_select, nested_prefetch, _ = _relations(nested, model_field.related_model, path + '__')
+            select |= nested_select
+            prefetch |= nested_prefetch
+        elif len(parts) > 1:
+            # np. 'team.name' -> JOIN drużyny zamiast zapytania na wiersz
+            select.add(prefix + '__'.join(parts[:-1]))
+    return select, prefetch, columns
+
+
+class DynamicFieldsViewSetMixin:
+    """Dla list i szczegółów dopasowuje zapytanie do pól serializera (JOIN-y, prefetch, only())."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if self.action not in ('list', 'retrieve') or not issubclass(serializer_class, DynamicFieldsMixin):
+            return queryset
+
+        select, prefetch, annotations, columns = serializer_class(
+            context=self.get_serializer_context()
+        ).query_plan()
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        fields, _ = requested_fields(self.request)
+        if fields is not None and columns is not None:
+            # Relacje z select_related (także z queryset widoku, również odwrotne 1:1) muszą być w only() -
+            # Django nie pozwala ich jednocześnie odroczyć i dołączyć
+            joined = queryset.query.select_related
+            columns |= {path.split('__')[0] for path in select} | set(joined if isinstance(joined, dict) else ())
+            queryset = queryset.only(*sorted(columns))
+        return queryset
+
@@ -0,0 +1,185 @@
+# SportApp/elo.py
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from .models import Match, TeamEloRating, EloRatingHistory
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20
+# Przewaga własnego boiska w punktach rankingu (dodawana gospodarzowi tylko przy liczeniu oczekiwanego wyniku)
+HOME_ADVANTAGE = 60
+BATCH_SIZE = 2000
+# Klucz blokady doradczej PostgreSQL - zapisy rankingu (wspólnego dla wszystkich lig) wykonywane po kolei
+LOCK_KEY = 0x456C6F
+
+# Kolumny potrzebne do przetworzenia wyniku; status "Finished" to już zmapowany kod API (FT / AET / PEN)
+_COLUMNS = ['id', 'season_id', 'date', 'home_team_id', 'away_team_id', 'home_score', 'away_score']
+
+
+def expected_score(rating_home, rating_away):
+    """Oczekiwany wynik gospodarza (1 = wygrana, 0.5 = remis)."""
+    return 1 / (1 + 10 ** ((rating_away - rating_home - HOME_ADVANTAGE) / 400))
+
+
+def rating_change(rating_home, rating_away, home_goals, away_goals):
+    """Zmiana rankingu gospodarza (gość dostaje przeciwną); wyższe zwycięstwa ważą więcej jak w World Football Elo."""
+    score = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+    margin = abs(home_goals - away_goals)
+    multiplier = 1.0 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8
+    return K_FACTOR * multiplier * (score - expected_score(rating_home, rating_away))
+
+
+class EloEngine:
+    """
+    Stan rankingu w pamięci: przetwarza wyniki w kolejności (data, id) jednym przebiegiem, koszt O(1) na mecz.
+    Zwraca wiersze historii do zapisu; `save()` zapisuje bieżące rankingi drużyn.
+    """
+
+    def __init__(self, ratings=None):
+        # team_id -> TeamEloRating (niezapisany lub z bazy)
+        self.ratings = ratings or {}
+
+    def _team(self, team_id):
+        if team_id not in self.ratings:
+            self.ratings[team_id] = TeamEloRating(team_id=team_id, rating=INITIAL_RATING, matches=0)
+        return self.ratings[team_id]
+
+    def is_next(self, team_id, date, match_id):
+        """Czy mecz jest późniejszy od wszystkich przetworzonych meczów drużyny (wtedy wystarczy dopisać)."""
+        team = self.ratings.get(team_id)
+        if team is None or team.last_match_date is None:
+            return True
+        return (date, match_id) > (team.last_match_date, team.last_match_id or 0)
+
+    def process(self, row):
+        values = dict(zip(_COLUMNS, row))
+        home, away = self._team(values['home_team_id']), self._team(values['away_team_id'])
+        change = rating_change(home.rating, away.rating, values['home_score'], values['away_score'])
+
+        history = []
+        for team, delta in ((home, change), (away, -change)):
+            history.append(EloRatingHistory(
+                team_id=team.team_id, match_id=values['id'], season_id=values['season_id'], date=values['date'],
+                rating_before=team.rating, rating_after=team.rating + delta,
+            ))
+            team.rating += delta
+            team.matches += 1
+            team.last_match_date, team.last_match_id = values['date'], values['id']
+        return history
+
+    def save(self):
+        TeamEloRating.objects.bulk_create(
+            self.ratings.values(),
+            update_conflicts=True, unique_fields=['team'],
+            update_fields=['rating', 'matches', 'last_match_date', 'last_match'],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def _finished(matches):
+    return matches.filter(
+        status='Finished', home_score__isnull=False, away_score__isnull=False
+    ).order_by('date', 'id').values_list(*_COLUMNS)
+
+
+def _stream(engine, matches):
+    """Przetwarza mecze strumieniowo (iterator, bez wczytywania całej historii) i zapisuje historię paczkami."""
+    pending = []
+    processed = 0
+    for row in _finished(matches).iterator(chunk_size=BATCH_SIZE):
+        pending.extend(engine.process(row))
+        processed += 1
+        if len(pending) >= BATCH_SIZE:
+            EloRatingHistory.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+            pending = []
+    EloRatingHistory.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+    engine.save()
+    return processed
+
+
+def _lock():
+    """Blokada do końca bieżącej transakcji (SQLite i tak blokuje całą bazę przy zapisie)."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [LOCK_KEY])
+
+
+@transaction.atomic
+def rebuild_elo_ratings():
+    """Cała historia od zera: wszystkie ligi i sezony, chronologicznie. Zwraca liczbę przetworzonych meczów."""
+    _lock()
+    EloRatingHistory.objects.all().delete()
+    TeamEloRating.objects.all().delete()
+    return _stream(EloEngine(), Match.objects.all())
+
+
+@transaction.atomic
+def replay_elo_from(start):
+    """
+    Przelicza historię od daty `start` (poprawiony lub wycofany wynik, usunięty mecz, mecz dopisany "w przeszłości").
+    Ranking drużyny na ten moment to rating_after jej ostatniego wpisu sprzed `start` - wcześniejsza historia zostaje.
+    """
+    _lock()
+    affected = set(EloRatingHistory.objects.filter(date__gte=start).values_list('team_id', flat=True))
+    affected |= set(TeamEloRating.objects.filter(last_match_date__gte=start).values_list('team_id', flat=True))
+    before = EloRatingHistory.objects.filter(team_id=OuterRef('team_id'), date__lt=start)
+    last = before.order_by('-date', '-match_id')
+    ratings = {r.team_id: r for r in TeamEloRating.objects.all()}
+    for team_id, rating, date, match_id, matches in TeamEloRating.objects.filter(team_id__in=affected).annotate(
+        previous_rating=Subquery(last.values('rating_after')[:1]),
+        previous_date=Subquery(last.values('date')[:1]),
+        previous_match=Subquery(last.values('match_id')[:1]),
+        previous_matches=Subquery(before.values('team_id').annotate(count=Count('id')).values('count')),
+    ).values_list('team_id', 'previous_rating', 'previous_date', 'previous_match', 'previous_matches'):
+        team = ratings[team_id]
+        team.rating = INITIAL_RATING if rating is None else rating
+        team.last_match_date, team.last_match_id, team.matches = date, match_id, matches or 0
+
+    EloRatingHistory.objects.filter(date__gte=start).delete()
+    return _stream(EloEngine(ratings), Match.objects.filter(date__gte=start))
+
+
+def _same_result(entries, row):
+    """Czy wynik zapisany w historii (wpisy obu drużyn) daje tę samą zmianę rankingu co bieżący wiersz meczu."""
+    if row is None:
+        return False
+    values = dict(zip(_COLUMNS, row))
+    home, away = entries.get(values['home_team_id']), entries.get(values['away_team_id'])
+    if home is None or away is None or home[0] != values['date']:
+        return False
+    change = rating_change(home[1], away[1], values['home_score'], values['away_score'])
+    return abs(home[2] - home[1] - change) < 1e-9
+
+
+@transaction.atomic
+def apply_results(match_ids):
+    """
+    Zmienione mecze (wynik, status). Nowy wynik późniejszy od dotychczasowych meczów obu drużyn to O(1):
+    dopisanie wierszy historii i aktualizacja dwóch rankingów. Poprawka już policzonego wyniku, wycofanie
+    albo mecz "w przeszłości" zmieniają też późniejsze wpisy - wtedy historia jest przeliczana od daty meczu.
+    """
+    # Odczyt stanu rankingu już pod blokadą - inaczej równoległy zapis mógłby go nadpisać
+    _lock()
+    match_ids = set(match_ids)
+    rows = {row[0]: row for row in _finished(Match.objects.filter(id__in=match_ids))}
+    recorded = {}
+    for match_id, team_id, *entry in EloRatingHistory.objects.filter(match_id__in=match_ids).values_list(
+        'match_id', 'team_id', 'date', 'rating_before', 'rating_after'
+    ):
+        recorded.setdefault(match_id, {})[team_id] = entry
+
+    # Mecze już w historii: zmiana innych pól niż wynik (np. sędzia) nie wymaga przeliczania
+    changed_dates = [
+        date for match_id, entries in recorded.items() if not _same_result(entries, rows.get(match_id))
+        for date in [next(iter(entries.values()))[0]] + ([rows[match_id][2]] if match_id in rows else [])
+    ]
+    new_rows = [row for match_id, row in rows.items() if match_id not in recorded]
+    team_ids = {team_id for row in new_rows for team_id in row[3:5]}
+    engine = EloEngine({r.team_id: r for r in TeamEloRating.objects.filter(team_id__in=team_ids)})
+
+    if changed_dates or not all(engine.is_next(t, row[2], row[0]) for row in new_rows for t in row[3:5]):
+        return replay_elo_from(min(changed_dates + [row[2] for row in new_rows]))
+    if not new_rows:
+        return 0
+    EloRatingHistory.objects.bulk_create([entry for row in new_rows for entry in engine.process(row)])
+    engine.save()
+    return len(new_rows)
@@ -0,0 +1,102 @@
+# SportApp/form.py
+from collections import defaultdict
+from django.db.models import Q
+from .analytics import STAT_COLUMNS
+from .models import Match, Team, TeamForm
+
+# Długość okna = liczba wag w MatchAnalyzer.WEIGHTS
+FORM_WINDOW = 5
+
+_COLUMNS = ['id', 'status', 'date', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'season_id'] + [
+    f'{side}_{column}' for side in ('home', 'away') for column in STAT_COLUMNS.values()
+]
+
+
+def _entries(row):
+    """Dwa wpisy okna (gospodarz, gość) z wiersza values_list(*_COLUMNS)."""
+    values = dict(zip(_COLUMNS, row))
+    for side, opponent in (('home', 'away'), ('away', 'home')):
+        goals_for, goals_against = values[f'{side}_score'], values[f'{opponent}_score']
+        if goals_for is None or goals_against is None:
+            result = '-'
+        else:
+            result = 'W' if goals_for > goals_against else 'D' if goals_for == goals_against else 'L'
+        yield values[f'{side}_team_id'], {
+            'match': values['id'],
+            'season': values['season_id'],
+            'date': values['date'].isoformat(),
+            'home': side == 'home',
+            'opponent': values[f'{opponent}_team_id'],
+            'goals_for': goals_for,
+            'goals_against': goals_against,
+            'result': result,
+            'stats': {key: values[f'{side}_{column}'] for key, column in STAT_COLUMNS.items()},
+        }
+
+
+def _merge(window, entries):
+    """Wstawia/zastępuje wpisy w oknie i przycina je do FORM_WINDOW - koszt stały, niezależny od historii."""
+    by_match = {entry['match']: entry for entry in window}
+    by_match.update((entry['match'], entry) for entry in entries)
+    merged = sorted(by_match.values(), key=lambda e: (e['date'], e['match']), reverse=True)
+    return merged[:FORM_WINDOW]
+
+
+def _save(forms):
+    TeamForm.objects.bulk_create(
+        forms, update_conflicts=True, unique_fields=['team'], update_fields=['matches', 'updated_at']
+    )
+
+
+def rebuild_team_forms(team_ids=None):
+    """Buduje okna od zera z historii meczów (wszystkie drużyny albo wskazane); zwraca liczbę drużyn."""
+    if team_ids is None:
+        team_ids = list(Team.objects.values_list('id', flat=True))
+    team_ids = set(team_ids)
+    if not team_ids:
+        return 0
+
+    windows = {team_id: [] for team_id in team_ids}
+    rows = Match.objects.filter(
+        Q(home_team_id__in=team_ids) | Q(away_team_id__in=team_ids), status='Finished'
+    ).order_by('-date', '-id').values_list(*_COLUMNS)
+    for row in rows.iterator(chunk_size=2000):
+        for team_id, entry in _entries(row):
+            window = windows.get(team_id)
+            if window is not None and len(window) < FORM_WINDOW:
+                window.append(entry)
+
+    _save([TeamForm(team_id=team_id, matches=window) for team_id, window in windows.items()])
+    return len(windows)
+
+
+def update_team_forms(match_ids):
+    """
+    Aktualizuje okna drużyn po zakończeniu meczów lub zapisie ich statystyk (O(1) na mecz).
+    Drużyny bez okna oraz takie, z których okna wypadł mecz już niezakończony, są przebudowywane z historii.
+    """
+    match_ids = list(match_ids)
+    if not match_ids:
+        return
+
+    incoming = defaultdict(list)
+    withdrawn = {}
+    for row in Match.objects.filter(id__in=match_ids).values_list(*_COLUMNS):
+        for team_id, entry in _entries(row):
+            if row[1] == 'Finished':
+                incoming[team_id].append(entry)
+            else:
+                withdrawn.setdefault(team_id, set()).add(row[0])
+
+    forms = {form.team_id: form for form in TeamForm.objects.filter(team_id__in=incoming.keys() | withdrawn.keys())}
+    to_rebuild = set(incoming.keys() - forms.keys())
+    to_save = []
+    for team_id, form in forms.items():
+        if any(entry['match'] in withdrawn.get(team_id, ()) for entry in form.matches):
+            to_rebuild.add(team_id)
+        elif team_id in incoming:
+            form.matches = _merge(form.matches, incoming[team_id])
+            to_save.append(form)
+
+    _save(to_save)
+    rebuild_team_forms(to_rebuild)
@@ -0,0 +1,541 @@
+# SportApp/ingestion.py
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import League, Season, Team, Match, Standing, TopScorer, SyncCursor, AnalyticsRecompute
+from .changes import matches_changed, enqueue_recompute
+from .response_cache import invalidate_responses
+from .metrics import metrics
+from .standings import STANDING_FIELDS
+from .services import FootballAPIError
+
+BATCH_SIZE = 500
+
+STATUS_MAP = {
+    # SCHEDULED
+    'TBD': 'Scheduled',
+    'NS': 'Scheduled',
+
+    # IN PLAY
+    '1H': 'In Play',
+    'HT': 'In Play',
+    '2H': 'In Play',
+    'ET': 'In Play',
+    'BT': 'In Play',
+    'P': 'In Play',
+    'LIVE': 'In Play',
+    'SUSP': 'In Play',
+    'INT': 'In Play',
+
+    # FINISHED
+    'FT': 'Finished',
+    'AET': 'Finished',
+    'PEN': 'Finished',  # W API-Football PEN to koniec meczu po karnych
+
+    # OTHER
+    'PST': 'Postponed',
+    'CANC': 'Cancelled',
+    'ABD': 'Abandoned',
+    'AWD': 'Not Played',
+    'WO': 'Not Played'
+}
+
+
+def get_match_type_status(short):
+    """Mapuje status API na czytelny format. Nieznany kod zwracany jest bez zmian (np. 'XYZ')."""
+    return STATUS_MAP.get(short, short)
+
+
+# Statusy, po których mecz już się nie zmieni - takich nie odpytujemy w trybie przyrostowym
+FINAL_STATUSES = ['Finished', 'Cancelled', 'Abandoned', 'Not Played']
+
+# Pola meczu, które nadpisuje synchronizacja terminarza (statystyki mają osobną ścieżkę)
+FIXTURE_FIELDS = [
+    'season', 'home_team', 'away_team', 'date', 'home_score', 'away_score',
+    'referee', 'venue_name', 'round', 'status',
+]
+
+# W trybie przyrostowym zapisujemy tylko to, co zmienia się w trakcie sezonu
+DELTA_FIELDS = ['date', 'status', 'home_score', 'away_score']
+
+# Mapowanie nazw statystyk z API (`fixtures/statistics`) na pola modelu Match (bez prefiksu home_/away_)
+STAT_FIELD_MAP = {
+    'Shots on Goal': 'shots_on_goal',
+    'Shots off Goal': 'shots_off_goal',
+    'Total Shots': 'total_shots',
+    'Blocked Shots': 'blocked_shots',
+    'Fouls': 'fouls',
+    'Corner Kicks': 'corners',
+    'Offsides': 'offsides',
+    'Ball Possession': 'possession',  # API zwraca np. "50%", zapisujemy jako string
+    'Yellow Cards': 'yellow_cards',
+    'Red Cards': 'red_cards',
+    'Total passes': 'passes_total',
+    'Passes accurate': 'passes_accurate',
+    'Goalkeeper saves': 'goalkeeper_saves',
+    'Shots inside box': 'shots_inside_box',
+    'Shots outside box': 'shots_outside_box',
+}
+STRING_STATS = {'possession'}
+
+STAT_FIELDS = [f'{prefix}{field}' for prefix in ('home_', 'away_') for field in STAT_FIELD_MAP.values()]
+
+# Pola zmieniające się w trakcie meczu (poller na żywo)
+LIVE_FIELDS = ['status', 'home_score', 'away_score']
+
+TEAM_FIELDS = ['league', 'name', 'logo', 'founded', 'venue_name', 'venue_city', 'venue_capacity']
+
+
+@dataclass
+class RowCounts:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def written(self):
+        return self.inserted + self.updated
+
+
+def parse_match_date(raw):
+    match_date = parse_datetime(raw)
+    if timezone.is_naive(match_date):
+        match_date = timezone.make_aware(match_date)
+    return match_date
+
+
+def apply_fixture_statistics(match, stats_data, home_api_id, away_api_id):
+    """
+    Przepisuje odpowiedź `fixtures/statistics` na pola statystyk meczu (bez zapisu do bazy).
+    API zwraca listę dwóch obiektów: jeden dla gospodarzy, drugi dla gości.
+    Zwraca True, jeśli udało się dopasować przynajmniej jedną drużynę.
+    """
+    applied = False
+    for item in stats_data:
+        team_id = item['team']['id']
+        if team_id == home_api_id:
+            prefix = 'home_'
+        elif team_id == away_api_id:
+            prefix = 'away_'
+        else:
+            continue  # Dziwny przypadek, pomijamy
+
+        for stat in item['statistics']:
+            field = STAT_FIELD_MAP.get(stat['type'])
+            if field is None:
+                continue
+            # Jeśli wartość to None, zamień na 0
+            value = stat['value'] if stat['value'] is not None else 0
+            setattr(match, f'{prefix}{field}', str(value) if field in STRING_STATS else value)
+        applied = True
+    return applied
+
+
+def _attnames(model, fields):
+    # Dla kluczy obcych porównujemy *_id, żeby nie dociągać obiektów z bazy
+    return [model._meta.get_field(f).attname for f in fields]
+
+
+def apply_live_updates(fixtures):
+    """
+    Zapisuje zmiany wyniku/statusu z odpowiedzi `fixtures` dla meczów już istniejących w bazie.
+    Aktualizowane są tylko wiersze, w których coś się zmieniło, i tylko kolumny LIVE_FIELDS.
+    Zwraca (id zmienionych meczów, id meczów, które właśnie się zakończyły).
+    """
+    incoming = {item['fixture']['id']: item for item in fixtures}
+    changed = []
+    finished_ids = []
+    # Mecze cofnięte z "Finished" (korekta w API) - muszą wypaść z okien formy drużyn
+    reopened_ids = []
+    for match_id, api_id, *previous in Match.objects.filter(api_id__in=incoming).values_list('id', 'api_id', *LIVE_FIELDS):
+        item = incoming[api_id]
+        values = (
+            get_match_type_status(item['fixture']['status']['short']),
+            item['goals']['home'],
+            item['goals']['away'],
+        )
+        if tuple(previous) == values:
+            continue
+        changed.append(Match(id=match_id, **dict(zip(LIVE_FIELDS, values))))
+        if values[0] == 'Finished' and previous[0] != 'Finished':
+            finished_ids.append(match_id)
+        elif previous[0] == 'Finished' and values[0] != 'Finished':
+            reopened_ids.append(match_id)
+
+    Match.objects.bulk_update(changed, LIVE_FIELDS, batch_size=BATCH_SIZE)
+    matches_changed(finished_ids + reopened_ids)
+    metrics.record_rows('matches', updated=len(changed), unchanged=len(incoming) - len(changed))
+    return [m.id for m in changed], finished_ids
+
+
+def upsert_league_season(league_data, year):
+    """Tworzy lub aktualizuje ligę i jej sezon na podstawie odpowiedzi endpointu `leagues`."""
+    l_info = league_data['league']
+    c_info = league_data['country']
+
+    league_obj, _ = League.objects.update_or_create(
+        api_id=l_info['id'],
+        defaults={
+            'name': l_info['name'],
+            'country': c_info['name'],
+            'logo': l_info['logo']
+        }
+    )
+    # Przy synchronizacji sezonów historycznych flagę "bieżący" bierzemy z listy sezonów w API
+    seasons = league_data.get('seasons')
+    is_current = any(s['year'] == year and s.get('current') for s in seasons) if seasons else True
+    season_obj, _ = Season.objects.update_or_create(
+        league=league_obj,
+        year=year,
+        defaults={'is_current': is_current}
+    )
+    return league_obj, season_obj
+
+
+class SeasonIngestion:
+    """
+    Zbiorczy zapis danych jednego sezonu ligi.
+    Odpowiedzi API zamieniane są w pamięci na instancje modeli i zapisywane przez
+    bulk_create(update_conflicts=True), więc liczba zapytań rośnie z liczbą paczek, a nie wierszy.
+    """
+
+    def __init__(self, league, season):
+        self.league = league
+        self.season = season
+        # api_id -> pk drużyny, budowane raz dla całego sezonu
+        self.team_ids = {}
+
+    def load_team_map(self, api_ids=None):
+        queryset = Team.objects.all()
+        if api_ids is not None:
+            queryset = queryset.filter(api_id__in=api_ids)
+        self.team_ids.update(queryset.values_list('api_id', 'pk'))
+        return self.team_ids
+
+    def ensure_teams(self, api_ids):
+        """Dociąga jednym zapytaniem drużyny spoza mapy (np. spoza listy `teams` tej ligi)."""
+        missing = set(api_ids) - self.team_ids.keys()
+        if missing:
+            self.load_team_map(missing)
+
+    def upsert_teams(self, teams_data):
+        teams = []
+        for item in teams_data:
+            t = item['team']
+            v = item['venue']
+            teams.append(Team(
+                api_id=t['id'],
+                league=self.league,
+                name=t['name'],
+                logo=t['logo'],
+                founded=t['founded'],
+                venue_name=v['name'],
+                venue_city=v['city'],
+                venue_capacity=v['capacity'],
+            ))
+
+        existing = set(Team.objects.filter(api_id__in=[t.api_id for t in teams]).values_list('api_id', flat=True))
+        Team.objects.bulk_create(
+            teams, batch_size=BATCH_SIZE,
+            update_conflicts=True, unique_fields=['api_id'], update_fields=TEAM_FIELDS
+        )
+        metrics.record_rows('teams', inserted=len(teams) - len(existing), updated=len(existing))
+        self.load_team_map([team.api_id for team in teams])
+        return len(teams)
+
+    def build_match(self, item):
+        """Zamienia element odpowiedzi `fixtures` na (niezapisaną) instancję Match albo None."""
+        fixture = item['fixture']
+        goals = item['goals']
+        teams = item['teams']
+
+        home_id = self.team_ids.get(teams['home']['id'])
+        away_id = self.team_ids.get(teams['away']['id'])
+        if home_id is None or away_id is None:
+            # Jeśli drużyny nie ma (rzadki przypadek), pomijamy mecz
+            return None
+
+        return Match(
+            api_id=fixture['id'],
+            season=self.season,
+            home_team_id=home_id,
+            away_team_id=away_id,
+            date=parse_match_date(fixture['date']),
+            home_score=goals['home'],
+            away_score=goals['away'],
+            referee=fixture['referee'],
+            venue_name=fixture['venue']['name'],
+            round=item['league']['round'],
+            status=get_match_type_status(fixture['status']['short']),
+        )
+
+    def upsert_matches(self, matches, fields=FIXTURE_FIELDS):
+        """
+        Zapisuje tylko nowe i zmienione mecze (porównując `fields`). Stan istniejących wierszy
+        pobierany jest jednym zapytaniem, więc niezmienione mecze nie generują żadnego zapisu.
+        """
+        counts = RowCounts()
+        attnames = _attnames(Match, fields)
+        existing = {
+            row[0]: row[1:]
+            for row in Match.objects.filter(api_id__in=[m.api_id for m in matches]).values_list('api_id', *attnames)
+        }
+
+        status_index = attnames.index('status') if 'status' in attnames else None
+        to_write = []
+        # Mecze, które są lub były zakończone - zmiana trafia do okien formy i analiz nadchodzących meczów
+        form_changes = []
+        for match in matches:
+            previous = existing.get(match.api_id)
+            if previous is None:
+                counts.inserted += 1
+            elif previous != tuple(getattr(match, name) for name in attnames):
+                counts.updated += 1
+            else:
+                counts.unchanged += 1
+                continue
+            to_write.append(match)
+            was_finished = previous is not None and status_index is not None and previous[status_index] == 'Finished'
+            if match.status == 'Finished' or was_finished:
+                form_changes.append(match.api_id)
+
+        Match.objects.bulk_create(
+            to_write, batch_size=BATCH_SIZE,
+            update_conflicts=True, unique_fields=['api_id'], update_fields=fields
+        )
+        if form_changes:
+            matches_changed(Match.objects.filter(api_id__in=form_changes).values_list('id', flat=True))
+        # Nowe i przełożone mecze potrzebują własnej analizy (okno formy zależy od daty meczu)
+        scheduled = [m.api_id for m in to_write if m.status == 'Scheduled']
+        if scheduled:
+            enqueue_recompute(
+                Match.objects.filter(api_id__in=scheduled).values_list('id', flat=True), AnalyticsRecompute.REASON_FIXTURE
+            )
+        metrics.record_rows('matches', counts.inserted, counts.updated, counts.unchanged)
+        return counts
+
+    def upsert_fixtures(self, fixtures, fields=FIXTURE_FIELDS):
+        self.ensure_teams(
+            side['id'] for item in fixtures for side in (item['teams']['home'], item['teams']['away'])
+        )
+        matches = [m for m in (self.build_match(item) for item in fixtures) if m is not None]
+        return self.upsert_matches(matches, fields)
+
+    def upsert_standings(self, standings_resp):
+        """Zwraca liczbę zapisanych wierszy albo None, gdy odpowiedź ma nieoczekiwaną strukturę."""
+        # Struktura API: response -> league -> standings -> [ [TeamA, TeamB...] ]
+        # Zazwyczaj indeks [0] to główna tabela
+        try:
+            standings_list = standings_resp[0]['league']['standings'][0]
+        except (IndexError, KeyError):
+            return None
+
+        self.ensure_teams(row['team']['id'] for row in standings_list)
+        rows = []
+        for row in standings_list:
+            team_id = self.team_ids.get(row['team']['id'])
+            if team_id is None:
+                continue
+            rows.append(Standing(
+                season=self.season,
+                team_id=team_id,
+                position=row['rank'],
+                points=row['points'],
+                form=row['form'],
+                status=row['status'],
+                last_update=parse_datetime(row['update']),
+
+                played=row['all']['played'],
+                win=row['all']['win'],
+                draw=row['all']['draw'],
+                lose=row['all']['lose'],
+                goals_for=row['all']['goals']['for'],
+                goals_against=row['all']['goals']['against'],
+                goals_diff=row['goalsDiff'],
+
+                home_played=row['home']['played'],
+                home_win=row['home']['win'],
+                home_draw=row['home']['draw'],
+                home_lose=row['home']['lose'],
+                home_goals_for=row['home']['goals']['for'],
+                home_goals_against=row['home']['goals']['against'],
+
+                away_played=row['away']['played'],
+                away_win=row['away']['win'],
+                away_draw=row['away']['draw'],
+                away_lose=row['away']['lose'],
+                away_goals_for=row['away']['goals']['for'],
+                away_goals_against=row['away']['goals']['against'],
+            ))
+
+        existing = Standing.objects.filter(season=self.season, team_id__in=[r.team_id for r in rows]).count()
+        Standing.objects.bulk_create(
+            rows, batch_size=BATCH_SIZE,
+            update_conflicts=True, unique_fields=['season', 'team'], update_fields=STANDING_FIELDS
+        )
+        metrics.record_rows('standings', inserted=len(rows) - existing, updated=existing)
+        return len(rows)
+
+    def replace_top_scorers(self, scorers):
+        self.ensure_teams(sc['statistics'][0]['team']['id'] for sc in scorers)
+        scorer_rows = []
+        for sc in scorers:
+            player = sc['player']
+            stats = sc['statistics'][0]
+            team_id = self.team_ids.get(stats['team']['id'])
+            if team_id is None:
+                continue
+            scorer_rows.append(TopScorer(
+                season=self.season,
+                team_id=team_id,
+                player_name=player['name'],
+                player_api_id=player['id'],
+                goals=stats['goals']['total'] or 0,
+                assists=stats['goals']['assists'] or 0
+            ))
+
+        # Wyczyść starych strzelców dla tego sezonu, żeby nie dublować
+        TopScorer.objects.filter(season=self.season).delete()
+        TopScorer.objects.bulk_create(scorer_rows, batch_size=BATCH_SIZE)
+        metrics.record_rows('top_scorers', inserted=len(scorer_rows))
+        return len(scorer_rows)
+
+
+def ingest_season(season_data, year):
+    """
+    Zapisuje komplet danych sezonu (wynik FootballAPIService.get_season_data) w jednej transakcji.
+    Zwraca (season, podsumowanie) albo (None, None), gdy API nie zwróciło danych ligi.
+    """
+    if not season_data['league']:
+        return None, None
+
+    labels = {'league': season_data['league'][0]['league']['id'], 'season': year}
+    with transaction.atomic():
+        with metrics.stage('league', **labels):
+            league_obj, season_obj = upsert_league_season(season_data['league'][0], year)
+        ingestion = SeasonIngestion(league_obj, season_obj)
+
+        with metrics.stage('teams', **labels):
+            summary = {'teams': ingestion.upsert_teams(season_data['teams'])}
+        with metrics.stage('fixtures', **labels):
+            summary['matches'] = ingestion.upsert_fixtures(season_data['fixtures'])
+        with metrics.stage('standings', **labels):
+            summary['standings'] = (
+                ingestion.upsert_standings(season_data['standings']) if season_data['standings'] else 0
+            )
+        if season_data['top_scorers']:
+            with metrics.stage('scorers', **labels):
+                summary['top_scorers'] = ingestion.replace_top_scorers(season_data['top_scorers'])
+
+        update_sync_cursor(season_obj, full=True)
+        # Liga, drużyny, tabela i strzelcy mogły się zmienić - cache odpowiedzi API ligi i jej sezonów
+        invalidate_responses(league_ids=[league_obj.id])
+
+    return season_obj, summary
+
+
+def update_sync_cursor(season, full):
+    """Zapamiętuje czas synchronizacji i listę meczów, które mogą się jeszcze zmienić."""
+    cursor, _ = SyncCursor.objects.get_or_create(season=season)
+    now = timezone.now()
+    if full:
+        cursor.last_full_sync = now
+    else:
+        cursor.last_delta_sync = now
+    cursor.pending_fixtures = list(
+        Match.objects.filter(season=season).exclude(status__in=FINAL_STATUSES).values_list('api_id', flat=True)
+    )
+    cursor.save()
+    return cursor
+
+
+def sync_season_delta(service, season):
+    """
+    Synchronizacja przyrostowa terminarza sezonu. Pobiera z API tylko:
+      - mecze z okna dat od ostatniej synchronizacji (minus dzień zapasu) do jutra,
+      - niezakończone mecze sprzed tego okna (np. przełożone lub przerwane).
+    Zapisywane są wyłącznie mecze, którym zmienił się status, wynik lub termin.
+    Zwraca RowCounts albo None, gdy sezon nie ma jeszcze kursora (potrzebna pełna synchronizacja).
+    """
+    cursor = SyncCursor.objects.filter(season=season).first()
+    if cursor is None or cursor.last_sync is None:
+        return None
+
+    league_id = season.league.api_id
+    today = timezone.now().date()
+    window_start = cursor.last_sync.date() - timedelta(days=1)
+    window_end = today + timedelta(days=1)
+
+    fixtures = service.get_fixtures_between(league_id, season.year, window_start, window_end)
+    seen = {item['fixture']['id'] for item in fixtures}
+
+    overdue = Match.objects.filter(
+        api_id__in=cursor.pending_fixtures, date__date__lt=window_start
+    ).values_list('api_id', flat=True)
+    overdue = [api_id for api_id in overdue if api_id not in seen]
+    if overdue:
+        fixtures += service.get_fixtures_by_ids(overdue)
+
+    with transaction.atomic(), metrics.stage('fixtures', league=league_id, season=season.year):
+        ingestion = SeasonIngestion(season.league, season)
+        counts = ingestion.upsert_fixtures(fixtures, fields=DELTA_FIELDS)
+        update_sync_cursor(season, full=False)
+    return counts
+
+
+@dataclass
+class LeagueSyncResult:
+    league_id: int
+    year: int
+    mode: str = 'full'
+    season: Season = None
+    summary: dict = field(default_factory=dict)
+    error: str = None
+    fetch_seconds: float = 0.0
+    write_seconds: float = 0.0
+
+    @property
+    def total_seconds(self):
+        return self.fetch_seconds + self.write_seconds
+
+
+def sync_league_season(service, league_id, year, incremental=False):
+    """
+    Synchronizuje jeden sezon jednej ligi (pełna lub przyrostowa) we własnej transakcji.
+    Nie współdzieli stanu z innymi ligami, więc można ją uruchamiać w osobnych wątkach.
+    """
+    result = LeagueSyncResult(league_id, year)
+    try:
+        if incremental:
+            season_obj = Season.objects.select_related('league').filter(league__api_id=league_id, year=year).first()
+            if season_obj is not None:
+                started = time.monotonic()
+                counts = sync_season_delta(service, season_obj)
+                if counts is not None:
+                    result.mode = 'incremental'
+                    result.season = season_obj
+                    result.summary = {'matches': counts}
+                    # Pobieranie i zapis przeplatają się w trybie przyrostowym - liczymy łącznie
+                    result.fetch_seconds = time.monotonic() - started
+                    return result
+
+        started = time.monotonic()
+        with metrics.stage('fetch', league=league_id, season=year):
+            season_data = service.get_season_data(league_id, year)
+        result.fetch_seconds = time.monotonic() - started
+
+        started = time.monotonic()
+        result.season, result.summary = ingest_season(season_data, year)
+        result.write_seconds = time.monotonic() - started
+        if result.season is None:
+            result.error = "Brak danych ligi w API"
+    except FootballAPIError as e:
+        # Nie nadpisujemy bazy niepełnymi danymi - liga zostanie zsynchronizowana przy następnym uruchomieniu
+        result.error = str(e)
+    except DatabaseError as e:
+        # Transakcja ligi została wycofana - pozostałe ligi synchronizują się dalej
+        result.error = f"Błąd zapisu do bazy: {e}"
+    return result
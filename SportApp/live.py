@@ -0,0 +1,95 @@
+# SportApp/live.py
+from dataclasses import dataclass, field
+from datetime import timedelta
+from django.db.models import Q
+from django.utils import timezone
+from .backfill import StatisticsBackfill
+from .ingestion import apply_live_updates
+from .models import Match
+
+# Kody statusów API, przy których gra faktycznie trwa - odpytujemy najczęściej
+PLAYING_STATUSES = {'1H', '2H', 'ET', 'P', 'LIVE'}
+# Przerwy (przerwa w połowie, przed dogrywką, zawieszenie) - wynik się nie zmieni, odpytujemy rzadziej
+BREAK_STATUSES = {'HT', 'BT', 'INT', 'SUSP'}
+
+
+@dataclass
+class PollResult:
+    tracked: int = 0
+    changed: list = field(default_factory=list)
+    finished: list = field(default_factory=list)
+    statistics_saved: int = 0
+    next_poll_in: float = 0.0
+
+
+class LiveMatchPoller:
+    """
+    Śledzi mecze w trakcie gry lub tuż przed rozpoczęciem i odpytuje API tylko o nie.
+    Interwał dopasowuje się do stanu meczów: szybko w trakcie gry, wolniej w przerwie,
+    a gdy nic się nie dzieje - czeka do najbliższego rozpoczęcia (maksymalnie `idle`).
+    """
+
+    def __init__(self, service, fast=30, slow=120, idle=600, pre_kickoff=timedelta(minutes=15),
+                 max_match_length=timedelta(hours=3)):
+        self.service = service
+        self.fast = fast
+        self.slow = slow
+        self.idle = idle
+        self.pre_kickoff = pre_kickoff
+        self.max_match_length = max_match_length
+
+    def tracked_matches(self, now):
+        """Mecze "In Play" oraz zaplanowane w oknie od (teraz - długość meczu) do (teraz + pre_kickoff)."""
+        return Match.objects.filter(
+            Q(status='In Play') |
+            Q(status='Scheduled', date__range=(now - self.max_match_length, now + self.pre_kickoff))
+        ).values_list('id', 'api_id', 'date')
+
+    def seconds_to_next_kickoff(self, now):
+        next_date = Match.objects.filter(status='Scheduled', date__gt=now).order_by('date').values_list(
+            'date', flat=True
+        ).first()
+        if next_date is None:
+            return None
+        return max(0.0, (next_date - self.pre_kickoff - now).total_seconds())
+
+    def poll_once(self):
+        now = timezone.now()
+        result = PollResult()
+        tracked = list(self.tracked_matches(now))
+        result.tracked = len(tracked)
+
+        if not tracked:
+            to_kickoff = self.seconds_to_next_kickoff(now)
+            result.next_poll_in = self.idle if to_kickoff is None else min(self.idle, max(self.fast, to_kickoff))
+            return result
+
+        fixtures = self.service.get_fixtures_by_ids(api_id for _, api_id, _ in tracked)
+        result.changed, result.finished = apply_live_updates(fixtures)
+
+        # Po końcowym gwizdku od razu próbujemy pobrać statystyki meczu
+        if result.finished:
+            progress = StatisticsBackfill(self.service).run(match_ids=result.finished)
+            result.statistics_saved = progress.updated
+
+        short_statuses = {item['fixture']['status']['short'] for item in fixtures}
+        kickoffs = [date for _, _, date in tracked]
+        result.next_poll_in = self.next_interval(short_statuses, kickoffs, now)
+        return result
+
+    def next_interval(self, short_statuses, kickoffs, now):
+        if short_statuses & PLAYING_STATUSES:
+            return self.fast
+        if short_statuses & BREAK_STATUSES:
+            return self.slow
+        if short_statuses - {'FT', 'AET', 'PEN'}:
+            # Mecze przed pierwszym gwizdkiem - czekamy do rozpoczęcia, ale nie dłużej niż `slow`
+            upcoming = [date for date in kickoffs if date > now]
+            if not upcoming:
+                return self.fast  # Godzina rozpoczęcia minęła, a API jeszcze nie ruszyło z meczem
+            return min(self.slow, max(self.fast, (min(upcoming) - now).total_seconds()))
+        # Wszystko zakończone - czekamy na okno kolejnego meczu
+        to_kickoff = self.seconds_to_next_kickoff(now)
+        if to_kickoff is None:
+            return self.idle
+        return min(self.idle, max(self.fast, to_kickoff))
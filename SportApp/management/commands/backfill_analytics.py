@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from SportApp.analytics_backfill import AnalyticsBackfill
+from SportApp.models import Season
+
+
+class Command(BaseCommand):
+    help = ('Liczy historyczne analizy (Hype, Aggression...) dla rozegranych meczów sezonów, '
+            'każdą wyłącznie z danych sprzed meczu; równolegle w puli procesów, z wznawianiem')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--league', type=int, nargs='+', dest='leagues',
+            help='ID lig w API-Football (domyślnie wszystkie w bazie)'
+        )
+        parser.add_argument(
+            '--season', type=int, nargs='+', dest='seasons',
+            help='Lata sezonów (domyślnie wszystkie w bazie)'
+        )
+        parser.add_argument('--workers', type=int, default=None, help='Liczba procesów (domyślnie liczba CPU)')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Ile meczów liczy jeden proces naraz')
+        parser.add_argument(
+            '--recompute', action='store_true',
+            help='Przelicza także mecze, które mają już analizę albo zostały przetworzone bez niej '
+                 '(domyślnie są pomijane - wznawianie)'
+        )
+
+    def handle(self, *args, **options):
+        seasons = Season.objects.select_related('league')
+        if options['leagues']:
+            seasons = seasons.filter(league__api_id__in=options['leagues'])
+        if options['seasons']:
+            seasons = seasons.filter(year__in=options['seasons'])
+        seasons = list(seasons)
+        if not seasons:
+            raise CommandError("Nie znaleziono sezonów pasujących do --league / --season.")
+
+        backfill = AnalyticsBackfill(workers=options['workers'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.WARNING(
+            f"--- Historyczne analizy: {len(seasons)} sezonów, {backfill.workers} procesów ---"
+        ))
+
+        def report(progress):
+            self.stdout.write(
+                f"[{progress.processed}/{progress.total}] zapisano: {progress.written}, "
+                f"{progress.matches_per_second:.1f} meczów/s"
+            )
+
+        progress = backfill.run([season.id for season in seasons], options['recompute'], on_chunk=report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Zakończono: {progress.processed} meczów w {progress.elapsed:.1f} s "
+            f"({progress.matches_per_second:.1f} meczów/s), zapisane analizy: {progress.written} "
+            f"(pozostałe to mecze, przed którymi któraś z drużyn nie rozegrała jeszcze żadnego meczu)."
+        ))
@@ -0,0 +1,202 @@
+import json
+from io import StringIO
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from SportApp.analytics import MatchAnalyzer
+from SportApp.benchmarking import (
+    measure_calls, format_latency_table, compare_with_baseline, save_json,
+)
+from SportApp.models import User, Season, Match, Standing, MatchRating
+from SportApp.pagination import encode_position
+from SportApp.serializers import MyTokenObtainPairSerializer
+
+# Stała liczba zapytań na listę - niezależnie od liczby wierszy (uprawnienia z ról w tokenie - bez zapytań).
+# Przekroczenie to regresja (np. N+1 po dodaniu pola), także bez pliku bazowego.
+QUERY_BUDGETS = {
+    'GET /api/matches/?season': 2,
+    # +1: django-filter sprawdza, czy drużyna z filtra istnieje
+    'GET /api/matches/?season&home_team': 3,
+    'GET /api/matches/?season&fields': 2,
+    'GET /api/matches/?season&expand': 2,
+    'GET /api/standings/?season': 2,
+    'GET /api/ratings/': 1,
+    'GET /api/matches/?cursor': 1,
+    # Trafienie w cache odpowiedzi: ani jednego zapytania
+    'GET /api/standings/?season (cache)': 0,
+    'GET /api/leagues/?expand (cache)': 0,
+}
+CACHED_SUFFIX = '(cache)'
+
+
+class Command(BaseCommand):
+    help = ('Benchmark analiz i gorących endpointów API (percentyle czasu, zapytania, pamięć) '
+            'z zapisem i porównaniem z wynikiem bazowym. Niczego nie zapisuje w bazie (transakcja wycofywana).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Liczba pomiarów na scenariusz')
+        parser.add_argument(
+            '--command-repeat', type=int, default=3,
+            help='Liczba pomiarów dla komendy calculate_analytics (wolniejsza niż pojedyncze zapytania)'
+        )
+        parser.add_argument(
+            '--full-lists', action='store_true',
+            help='Także listy bez filtra sezonu (/api/matches/ - pierwsza strona, /api/standings/ - cała tabela)'
+        )
+        parser.add_argument('--save-baseline', default=None, help='Zapisuje wyniki jako bazowe do pliku JSON')
+        parser.add_argument('--baseline', default=None, help='Porównuje wyniki z plikiem bazowym')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Dopuszczalne spowolnienie p50/p95 względem bazowego (0.25 = 25%%)'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Kończy się błędem, jeśli któryś scenariusz jest wolniejszy lub wykonuje więcej zapytań'
+        )
+
+    def handle(self, *args, **options):
+        # Bieżący sezon z meczami - część zakończona, część zaplanowana (analizy nadchodzących meczów)
+        season = Season.objects.filter(is_current=True, matches__isnull=False).order_by('id').first()
+        if season is None:
+            raise CommandError("Brak danych - najpierw np. manage.py generate_synthetic_data --leagues 5 --seasons 3")
+
+        with transaction.atomic():
+            # Scenariusze piszą do bazy (analizy, użytkownik benchmarku) - wszystko jest wycofywane
+            measurements = self.run(season, options)
+            transaction.set_rollback(True)
+
+        self.stdout.write(format_latency_table(measurements))
+        payload = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'data': {
+                'matches': Match.objects.count(),
+                'standings': Standing.objects.count(),
+                'ratings': MatchRating.objects.count(),
+            },
+            'results': [m.as_dict() for m in measurements],
+        }
+        over_budget = self.check_budgets(measurements)
+        if options['save_baseline']:
+            save_json(options['save_baseline'], payload)
+            self.stdout.write(self.style.SUCCESS(f"Zapisano wynik bazowy: {options['save_baseline']}"))
+        if options['baseline']:
+            self.compare(measurements, options)
+        if over_budget and options['fail_on_regression']:
+            raise CommandError(f"Przekroczony budżet zapytań: {over_budget}")
+
+    def check_budgets(self, measurements):
+        over_budget = 0
+        for m in measurements:
+            budget = QUERY_BUDGETS.get(m.name)
+            if budget is not None and m.queries_per_call > budget:
+                over_budget += 1
+                self.stdout.write(self.style.ERROR(
+                    f"{m.name}: {m.queries_per_call:.0f} zapytań na wywołanie, budżet {budget}"
+                ))
+        return over_budget
+
+    def run(self, season, options):
+        repeat = options['repeat']
+        user, _ = User.objects.get_or_create(username='benchmark_api_user')
+        user.groups.add(Group.objects.get_or_create(name='User')[0])
+        client = APIClient()
+        # Prawdziwy token (jak z /api/auth/login/) - odczyty sprawdzają role z tokenu, bez zapytań do bazy
+        access = MyTokenObtainPairSerializer.get_token(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        def cycle(ids):
+            ids = list(ids) or [0]
+            state = {'i': 0}
+
+            def next_id():
+                state['i'] += 1
+                return ids[state['i'] % len(ids)]
+            return next_id
+
+        upcoming = list(Match.objects.filter(season=season, status='Scheduled').order_by('date')[:repeat + 2])
+        analyzer = MatchAnalyzer()
+        next_match = cycle(range(len(upcoming)))
+        match_id = cycle(Match.objects.filter(season=season).values_list('id', flat=True)[:200])
+        standing_id = cycle(Standing.objects.filter(season=season).values_list('id', flat=True))
+        rating_id = cycle(MatchRating.objects.order_by('-id').values_list('id', flat=True)[:200])
+
+        middle = Match.objects.order_by('-date', '-id').values_list('date', 'id')[Match.objects.count() // 2]
+        deep_cursor = encode_position([middle[0].isoformat(), middle[1]])
+
+        def get(url):
+            def call():
+                response = client.get(url() if callable(url) else url)
+                assert response.status_code == 200, (response.status_code, url)
+            return call
+
+        scenarios = []
+        if upcoming:
+            scenarios.append(('MatchAnalyzer.calculate_match_analytics',
+                              lambda: analyzer.calculate_match_analytics(upcoming[next_match()]), repeat))
+        scenarios += [
+            ('calculate_analytics (wsadowo, 7 dni)',
+             lambda: call_command('calculate_analytics', stdout=StringIO()), options['command_repeat']),
+            ('calculate_analytics --per-match',
+             lambda: call_command('calculate_analytics', '--per-match', stdout=StringIO()), options['command_repeat']),
+            ('GET /api/matches/?season', get(f'/api/matches/?season={season.id}'), repeat),
+            # Ta sama lista, ~20x mniej wierszy - liczba zapytań musi być taka sama
+            ('GET /api/matches/?season&home_team', get(
+                f'/api/matches/?season={season.id}&home_team={upcoming[0].home_team_id if upcoming else 0}'
+            ), repeat),
+            # Wybrane kolumny (only()) i rozwinięcia z adnotacją - wciąż jedno zapytanie listy
+            ('GET /api/matches/?season&fields', get(
+                f'/api/matches/?season={season.id}&fields=id,date,home_team,away_team,home_score,away_score'
+            ), repeat),
+            ('GET /api/matches/?season&expand', get(
+                f'/api/matches/?season={season.id}&expand=ratings_summary'
+            ), repeat),
+            ('GET /api/matches/<id>/', get(lambda: f'/api/matches/{match_id()}/'), repeat),
+            ('GET /api/standings/?season', get(f'/api/standings/?season={season.id}'), repeat),
+            ('GET /api/standings/<id>/', get(lambda: f'/api/standings/{standing_id()}/'), repeat),
+            ('GET /api/ratings/', get('/api/ratings/'), repeat),
+            # Strona w środku historii - keyset, więc koszt jak pierwszej (bez OFFSET i COUNT)
+            ('GET /api/matches/?cursor', get(f'/api/matches/?cursor={deep_cursor}'), repeat),
+            # Pozostałe scenariusze mierzą zapytania i serializację - cache odpowiedzi tylko tutaj
+            (f'GET /api/standings/?season {CACHED_SUFFIX}', get(f'/api/standings/?season={season.id}'), repeat),
+            (f'GET /api/leagues/?expand {CACHED_SUFFIX}', get('/api/leagues/?expand=seasons,teams'), repeat),
+        ]
+        if MatchRating.objects.exists():
+            scenarios.append(('GET /api/ratings/<id>/', get(lambda: f'/api/ratings/{rating_id()}/'), repeat))
+        if options['full_lists']:
+            scenarios += [
+                ('GET /api/matches/ (wszystkie)', get('/api/matches/'), options['command_repeat']),
+                ('GET /api/standings/ (wszystkie)', get('/api/standings/'), options['command_repeat']),
+            ]
+
+        measurements = []
+        # Klient testowy wysyła Host: testserver
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for name, fn, count in scenarios:
+                with override_settings(API_RESPONSE_CACHE_ENABLED=name.endswith(CACHED_SUFFIX)):
+                    measurements.append(measure_calls(name, fn, repeat=count))
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"  {name}: p50 {measurements[-1].p50_ms:.2f} ms")
+        return measurements
+
+    def compare(self, measurements, options):
+        with open(options['baseline'], encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_with_baseline(measurements, baseline, options['tolerance'])
+        self.stdout.write(f"\nPorównanie z {options['baseline']} ({baseline.get('created_at')}):")
+        regressions = 0
+        for name, metric, old, new, regressed in rows:
+            change = f"{(new - old) / old:+.0%}" if old else "n/d"
+            line = f"  {name:<40} {metric:<17} {old:>10.2f} -> {new:>10.2f} ({change})"
+            if regressed:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line + "  REGRESJA"))
+            elif options['verbosity'] > 1:
+                self.stdout.write(line)
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"Regresje: {regressions}")
+        self.stdout.write(self.style.SUCCESS(f"Regresje: {regressions} (na {len(rows)} porównań)."))
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from SportApp.backfill import StatisticsBackfill
+from SportApp.benchmarking import measure, format_table, save_json
+from SportApp.ingestion import sync_league_season
+from SportApp.metrics import metrics
+from SportApp.replay import DirectoryStore, SyntheticStore, ReplayFootballAPIService
+
+
+class Command(BaseCommand):
+    help = ('Benchmark synchronizacji na nagranych lub syntetycznych odpowiedziach API (bez sieci): '
+            'pełny import, ponowny import bez zmian, sync przyrostowy i pobieranie statystyk')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--replay-dir', default=None,
+            help='Katalog z nagraniami (API_FOOTBALL_MODE=record); domyślnie dane syntetyczne'
+        )
+        parser.add_argument('--leagues', type=int, default=1, help='Liczba syntetycznych lig')
+        parser.add_argument('--seasons', type=int, default=1, help='Liczba syntetycznych sezonów na ligę')
+        parser.add_argument(
+            '--league', type=int, nargs='+', dest='league_ids',
+            help='ID lig z nagrań (z --replay-dir, domyślnie SYNC_LEAGUES)'
+        )
+        parser.add_argument(
+            '--season', type=int, nargs='+', dest='season_years',
+            help='Sezony z nagrań (z --replay-dir, domyślnie SYNC_SEASONS)'
+        )
+        parser.add_argument('--json', default=None, help='Zapisuje wyniki do wskazanego pliku JSON')
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Nie wycofuje zmian w bazie po benchmarku (domyślnie wszystko jest w wycofywanej transakcji)'
+        )
+
+    def handle(self, *args, **options):
+        if options['replay_dir']:
+            store = DirectoryStore(options['replay_dir'])
+            jobs = [(league_id, year)
+                    for league_id in options['league_ids'] or settings.SYNC_LEAGUES
+                    for year in options['season_years'] or settings.SYNC_SEASONS]
+        else:
+            store = SyntheticStore(leagues=options['leagues'], seasons=options['seasons'])
+            jobs = store.jobs
+        service = ReplayFootballAPIService(store)
+
+        self.stdout.write(self.style.WARNING(f"--- Benchmark synchronizacji: {len(jobs)} par liga/sezon ---"))
+        measurements = []
+        with transaction.atomic():
+            measurements.append(self.run_sync('pełny import (pusta baza)', service, jobs, incremental=False))
+            measurements.append(self.run_sync('pełny import (bez zmian)', service, jobs, incremental=False))
+            measurements.append(self.run_sync('sync przyrostowy', service, jobs, incremental=True))
+            with measure('statystyki meczów') as m:
+                StatisticsBackfill(service).run()
+            measurements.append(m)
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        self.stdout.write(format_table(measurements))
+        if options['json']:
+            save_json(options['json'], {
+                'jobs': [{'league': league_id, 'season': year} for league_id, year in jobs],
+                'source': options['replay_dir'] or 'synthetic',
+                'measurements': [m.as_dict() for m in measurements],
+                'rows': metrics.report()['rows'],
+            })
+            self.stdout.write(self.style.SUCCESS(f"Zapisano wyniki w {options['json']}"))
+
+    @staticmethod
+    def run_sync(name, service, jobs, incremental):
+        # Sekwencyjnie, w jednym połączeniu - inaczej nie dałoby się wycofać zmian jedną transakcją
+        with measure(name) as m:
+            for league_id, year in jobs:
+                result = sync_league_season(service, league_id, year, incremental)
+                if result.error:
+                    raise CommandError(f"Liga {league_id} (Sezon {year}): {result.error}")
+        return m
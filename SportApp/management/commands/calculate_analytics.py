@@ -3,12 +3,35 @@ from django.utils import timezone  # Ważny import do obsługi czasu
 from datetime import timedelta  # Do dodawania dni
 from SportApp.models import Match
 from SportApp.analytics import MatchAnalyzer
+from SportApp.changes import process_recompute_queue
 
 
 class Command(BaseCommand):
     help = 'Oblicza wskaźniki (Hype, Aggression) dla nadchodzących meczów (okno 7 dni)'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Horyzont w dniach (domyślnie 7)')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Wszystkie zaplanowane mecze, bez względu na datę'
+        )
+        parser.add_argument(
+            '--per-match', action='store_true',
+            help='Stary tryb: osobne zapytania i zapis dla każdego meczu (domyślnie tryb wsadowy)'
+        )
+        parser.add_argument(
+            '--pending', action='store_true',
+            help='Przelicza tylko mecze z kolejki zmian (drużyny z nowym wynikiem/statystykami), po czasie debounce'
+        )
+
     def handle(self, *args, **options):
+        if options['pending']:
+            queued, written = process_recompute_queue()
+            self.stdout.write(self.style.SUCCESS(
+                f"Zakończono. Przeliczono {queued} meczów z kolejki zmian (zapisane analizy: {written})."
+            ))
+            return
+
         analyzer = MatchAnalyzer()
 
         # Ustal obecny czas
@@ -17,18 +40,23 @@ class Command(BaseCommand):
         # Ustal "horyzont" czasowy - np. 7 dni do przodu
         # To zależy od Twojego biznesu: czy użytkownicy patrzą na mecze za 2 tygodnie?
         # Zazwyczaj 7 dni jest optymalne dla piłki nożnej.
-        future_limit = now + timedelta(days=7)
+        future_limit = now + timedelta(days=options['days'])
 
         # Wybieramy mecze zaplanowane TYLKO na najbliższy tydzień
-        matches = Match.objects.filter(
-            status='Scheduled',
-            date__range=(now, future_limit)  # Zakres od teraz do +7 dni
-        ).order_by('date')
+        matches = Match.objects.filter(status='Scheduled').order_by('date')
+        if not options['all']:
+            matches = matches.filter(date__range=(now, future_limit))  # Zakres od teraz do +N dni
+        window = "wszystkich zaplanowanych" if options['all'] else f"najbliższych {options['days']} dni"
+
+        self.stdout.write(f"Znaleziono {matches.count()} meczów ({window}).")
 
-        self.stdout.write(f"Znaleziono {matches.count()} meczów w nadchodzącym tygodniu.")
+        if not options['per_match']:
+            count = analyzer.calculate_batch(matches)
+            self.stdout.write(self.style.SUCCESS(f"Zakończono. Zaktualizowano analizy dla {count} meczów ({window})."))
+            return
 
         count = 0
-        for match in matches:
+        for match in matches.select_related('home_team', 'away_team'):
             # Tu jest ważny moment:
             # Ponieważ wskaźniki się zmieniają, zazwyczaj chcemy je NADPISAĆ,
             # nawet jeśli już istnieją (bo np. wczorajszy mecz innej drużyny zmienił hype).
@@ -43,5 +71,4 @@ class Command(BaseCommand):
                 if options['verbosity'] > 1:
                     self.stdout.write(self.style.WARNING(f"Za mało danych dla: {match}"))
 
-        self.stdout.write(
-            self.style.SUCCESS(f"Zakończono. Zaktualizowano analizy dla {count} meczów z najbliższych 7 dni."))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f"Zakończono. Zaktualizowano analizy dla {count} meczów ({window})."))
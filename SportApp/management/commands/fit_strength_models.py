@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from SportApp.models import Season, Team
+from SportApp.strength import fit_strength_model
+
+
+class Command(BaseCommand):
+    help = 'Dopasowuje model goli (Dixon-Coles: atak/obrona drużyn, przewaga własnego boiska) do zakończonych meczów'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--league', type=int, nargs='+', dest='leagues',
+            help='ID lig w API-Football (domyślnie wszystkie w bazie)'
+        )
+        parser.add_argument(
+            '--season', type=int, nargs='+', dest='seasons',
+            help='Lata sezonów (domyślnie wszystkie w bazie)'
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Dopasowanie od zera zamiast od zapisanych parametrów (ciepły start)'
+        )
+
+    def handle(self, *args, **options):
+        seasons = Season.objects.select_related('league')
+        if options['leagues']:
+            seasons = seasons.filter(league__api_id__in=options['leagues'])
+        if options['seasons']:
+            seasons = seasons.filter(year__in=options['seasons'])
+
+        for season in seasons:
+            model = fit_strength_model(season, warm_start=not options['cold'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{season.league.name} {season.year}: {model.matches} meczów, {model.iterations} iteracji, "
+                f"{model.seconds:.3f} s (przewaga gospodarza {model.home_advantage:+.3f}, rho {model.rho:+.3f})"
+            ))
+            if options['verbosity'] > 1:
+                names = dict(Team.objects.filter(id__in=model.teams.keys()).values_list('id', 'name'))
+                ranked = sorted(model.teams.items(), key=lambda t: t[1]['defense'] + t[1]['attack'], reverse=True)
+                for team_id, params in ranked:
+                    self.stdout.write(
+                        f"  {names.get(int(team_id), team_id):<25} atak {params['attack']:+.3f}  "
+                        f"obrona {params['defense']:+.3f}"
+                    )
@@ -0,0 +1,40 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from SportApp.synthetic_data import SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = ('Generuje w bazie syntetyczne ligi, drużyny, sezony, mecze ze statystykami, użytkowników i oceny '
+            '(np. --leagues 50 --seasons 10) - dane do benchmarków bez API')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leagues', type=int, default=1, help='Liczba lig')
+        parser.add_argument('--seasons', type=int, default=1, help='Liczba sezonów w lidze (ostatni = bieżący)')
+        parser.add_argument('--teams', type=int, default=20, help='Liczba drużyn w lidze (parzysta)')
+        parser.add_argument('--users', type=int, default=50, help='Liczba użytkowników (grupa User)')
+        parser.add_argument('--ratings', type=int, default=1000, help='Liczba ocen zakończonych meczów')
+        parser.add_argument('--seed', type=int, default=0, help='Ziarno generatora (powtarzalne dane)')
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Najpierw usuwa poprzednio wygenerowane dane syntetyczne'
+        )
+        parser.add_argument(
+            '--no-derived', action='store_true',
+            help='Bez tabel, statystyk sezonu, okien formy i rankingu Elo (same dane źródłowe)'
+        )
+
+    def handle(self, *args, **options):
+        if options['teams'] < 2 or options['teams'] % 2:
+            raise CommandError("Liczba drużyn w lidze musi być parzysta (terminarz \"każdy z każdym\").")
+
+        if options['clear']:
+            SyntheticDataGenerator.clear()
+        generator = SyntheticDataGenerator(
+            leagues=options['leagues'], seasons=options['seasons'], teams=options['teams'],
+            users=options['users'], ratings=options['ratings'], seed=options['seed'],
+        )
+        started = time.perf_counter()
+        counts = generator.generate(derived=not options['no_derived'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wygenerowano w {time.perf_counter() - started:.1f} s - {counts}."
+        ))
@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from SportApp.changes import process_recompute_queue
+from SportApp.live import LiveMatchPoller
+from SportApp.metrics import metrics
+from SportApp.services import FootballAPIError, get_football_service
+
+
+class Command(BaseCommand):
+    help = 'Odpytuje API o mecze trwające lub bliskie rozpoczęcia i zapisuje zmiany wyniku/statusu na bieżąco'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metrics-json', default=None,
+            help='Dodatkowo zapisuje raport (zapytania API, limit, czasy etapów, wiersze) do wskazanego pliku JSON'
+        )
+        parser.add_argument('--once', action='store_true', help='Wykonuje jeden cykl i kończy (np. z crona)')
+        parser.add_argument('--fast', type=int, default=30, help='Interwał w trakcie gry (s)')
+        parser.add_argument('--slow', type=int, default=120, help='Interwał w przerwie / przed meczem (s)')
+        parser.add_argument('--idle', type=int, default=600, help='Maksymalny interwał, gdy nic się nie dzieje (s)')
+        parser.add_argument(
+            '--pre-kickoff', type=int, default=15,
+            help='Ile minut przed rozpoczęciem zacząć śledzić mecz'
+        )
+
+    def handle(self, *args, **options):
+        # Poller potrzebuje świeżych danych - bez cache odpowiedzi
+        service = get_football_service(use_cache=False)
+        poller = LiveMatchPoller(
+            service,
+            fast=options['fast'],
+            slow=options['slow'],
+            idle=options['idle'],
+            pre_kickoff=timedelta(minutes=options['pre_kickoff']),
+        )
+
+        while True:
+            try:
+                result = poller.poll_once()
+            except FootballAPIError as e:
+                self.stdout.write(self.style.ERROR(f"Błąd API podczas odpytywania: {e}"))
+                result = None
+
+            if result is not None and options['verbosity'] > 0:
+                self.stdout.write(
+                    f"Śledzone: {result.tracked}, zmienione: {len(result.changed)}, "
+                    f"zakończone: {len(result.finished)} (statystyki: {result.statistics_saved}), "
+                    f"kolejne odpytanie za {result.next_poll_in:.0f} s"
+                )
+
+            # Analizy meczów drużyn, które właśnie skończyły grać (po czasie debounce, wsadowo)
+            queued, _ = process_recompute_queue()
+            if queued and options['verbosity'] > 0:
+                self.stdout.write(f"Przeliczono analizy {queued} nadchodzących meczów.")
+
+            # Raport nadpisywany po każdym cyklu - endpoint metryk widzi stan "na żywo"
+            metrics.save(options['metrics_json'])
+
+            if options['once']:
+                break
+            time.sleep(result.next_poll_in if result is not None else options['slow'])
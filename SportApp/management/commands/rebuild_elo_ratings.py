@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from SportApp.benchmarking import measure
+from SportApp.elo import rebuild_elo_ratings
+from SportApp.models import TeamEloRating
+
+
+class Command(BaseCommand):
+    help = 'Przelicza od zera ranking Elo i jego historię ze wszystkich zakończonych meczów (wszystkie ligi i sezony)'
+
+    def handle(self, *args, **options):
+        with measure('elo') as m:
+            processed = rebuild_elo_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f"Zakończono. Przetworzono {processed} meczów w {m.wall_seconds:.2f} s ({m.queries} zapytań)."
+        ))
+        if options['verbosity'] > 1:
+            for rating in TeamEloRating.objects.select_related('team').order_by('-rating')[:20]:
+                self.stdout.write(f"  {rating.team.name:<25} {rating.rating:7.1f} ({rating.matches} meczów)")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from SportApp.form import rebuild_team_forms, FORM_WINDOW
+
+
+class Command(BaseCommand):
+    help = f'Przebudowuje z historii meczów okna formy drużyn ({FORM_WINDOW} ostatnich zakończonych meczów)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--team', type=int, nargs='+', dest='teams',
+            help='ID drużyn (domyślnie wszystkie)'
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_team_forms(options['teams'])
+        self.stdout.write(self.style.SUCCESS(f"Przebudowano okna formy dla {count} drużyn."))
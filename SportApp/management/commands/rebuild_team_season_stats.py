@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from SportApp.models import Season
+from SportApp.team_stats import rebuild_team_season_stats
+
+
+class Command(BaseCommand):
+    help = 'Przelicza od zera zagregowane statystyki drużyn w sezonach (TeamSeasonStats)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season', type=int, nargs='+', dest='seasons',
+            help='Lata sezonów (domyślnie wszystkie)'
+        )
+
+    def handle(self, *args, **options):
+        season_ids = None
+        if options['seasons']:
+            season_ids = list(Season.objects.filter(year__in=options['seasons']).values_list('id', flat=True))
+        count = rebuild_team_season_stats(season_ids)
+        self.stdout.write(self.style.SUCCESS(f"Przeliczono statystyki {count} par drużyna/sezon."))
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from SportApp.benchmarking import measure, format_table, save_json
+from SportApp.models import Season
+from SportApp.montecarlo import simulate, synthetic_state
+from SportApp.simulation import simulate_season
+
+
+class Command(BaseCommand):
+    help = 'Symuluje (Monte Carlo) resztę sezonu i zapisuje rozkład miejsc w tabeli końcowej'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--league', type=int, nargs='+', dest='leagues',
+            help='ID lig w API-Football (domyślnie wszystkie w bazie)'
+        )
+        parser.add_argument(
+            '--season', type=int, nargs='+', dest='seasons',
+            help='Lata sezonów (domyślnie bieżące)'
+        )
+        parser.add_argument('--simulations', type=int, default=None, help='Liczba symulacji (domyślnie z ustawień)')
+        parser.add_argument('--workers', type=int, default=None, help='Liczba procesów (domyślnie wszystkie rdzenie)')
+        parser.add_argument('--seed', type=int, default=None, help='Ziarno generatora (powtarzalne wyniki)')
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Nic nie zapisuje - mierzy czas na syntetycznym sezonie 20 drużyn (380 meczów do rozegrania), '
+                 'w jednym procesie i w puli procesów'
+        )
+        parser.add_argument('--json', default=None, help='Zapisuje wyniki benchmarku do pliku JSON')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self.benchmark(options)
+            return
+
+        seasons = Season.objects.select_related('league')
+        if options['leagues']:
+            seasons = seasons.filter(league__api_id__in=options['leagues'])
+        if options['seasons']:
+            seasons = seasons.filter(year__in=options['seasons'])
+        else:
+            seasons = seasons.filter(is_current=True)
+
+        for season in seasons:
+            simulation = simulate_season(season, options['simulations'], options['workers'], options['seed'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{season.league.name} {season.year}: {simulation.simulations} symulacji, "
+                f"{simulation.remaining_matches} meczów do rozegrania, {simulation.seconds:.2f} s"
+            ))
+            if options['verbosity'] > 1:
+                for row in simulation.results:
+                    self.stdout.write(
+                        f"  {row['team_name']:<25} pkt {row['points']:>3} -> {row['expected_points']:6.1f}, "
+                        f"miejsce ~{row['expected_position']:5.2f}, mistrz {row['positions'][0]:.1%}"
+                    )
+
+    def benchmark(self, options):
+        simulations = options['simulations'] or settings.SEASON_SIMULATION_MAX_RUNS
+        state = synthetic_state(seed=options['seed'] or 0)
+        measurements = []
+        for label, workers in [('1 proces', 1), ('pula procesów', options['workers'])]:
+            with measure(f"{simulations} symulacji, {label}") as m:
+                result = simulate(state, simulations, workers=workers, seed=options['seed'])
+            measurements.append(m)
+
+        self.stdout.write(f"Sezon syntetyczny: {state.teams} drużyn, {len(state.home_idx)} meczów.")
+        self.stdout.write(format_table(measurements))
+        self.stdout.write(
+            f"Mistrz najczęściej: drużyna {result.position_counts[:, 0].argmax()} "
+            f"({result.position_probabilities[:, 0].max():.1%})"
+        )
+        if options['json']:
+            save_json(options['json'], {
+                'simulations': simulations,
+                'matches': len(state.home_idx),
+                'measurements': [m.as_dict() for m in measurements],
+            })
@@ -1,249 +1,112 @@
-from django.core.management.base import BaseCommand
-from django.utils.dateparse import parse_datetime
-from django.utils import timezone
-from SportApp.models import League, Season, Team, Match, Standing, TopScorer
-from SportApp.services import FootballAPIService
 import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from SportApp.ingestion import sync_league_season
+from SportApp.changes import process_recompute_queue
+from SportApp.metrics import metrics
+from SportApp.services import get_football_service
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **options):
-        service = FootballAPIService()
-
-
-        LEAGUES_TO_SYNC = [39]
-        TARGET_SEASON = 2025
-
-        for league_id in LEAGUES_TO_SYNC:
-            self.stdout.write(self.style.WARNING(f"--- Rozpoczynam ligę {league_id} (Sezon {TARGET_SEASON}) ---"))
-
-            league_data_list = service.get_league_info(league_id)
-            if not league_data_list:
-                self.stdout.write(self.style.ERROR(f"Brak danych dla ligi {league_id}"))
-                continue
-
-            l_info = league_data_list[0]['league']
-            c_info = league_data_list[0]['country']
-
-            league_obj, _ = League.objects.update_or_create(
-                api_id=l_info['id'],
-                defaults={
-                    'name': l_info['name'],
-                    'country': c_info['name'],
-                    'logo': l_info['logo']
-                }
-            )
-            self.stdout.write(f"Zaktualizowano ligę: {league_obj.name}")
-
-            # ==========================================
-            # KROK 2: UTWORZENIE SEZONU
-            # ==========================================
-            season_obj, created = Season.objects.update_or_create(
-                league=league_obj,
-                year=TARGET_SEASON,
-                defaults={'is_current': True}
-            )
-
-            # ==========================================
-            # KROK 3: POBIERANIE DRUŻYN
-            # ==========================================
-            self.stdout.write("Pobieranie drużyn...")
-            teams_data = service.get_teams(league_id, TARGET_SEASON)
-
-            for item in teams_data:
-                t = item['team']
-                v = item['venue']
-
-                Team.objects.update_or_create(
-                    api_id=t['id'],
-                    defaults={
-                        'league': league_obj,  # <--- TUTAJ PRZYPISUJEMY LIGĘ NA SZTYWNO
-                        'name': t['name'],
-                        'logo': t['logo'],
-                        'founded': t['founded'],
-                        'venue_name': v['name'],
-                        'venue_city': v['city'],
-                        'venue_capacity': v['capacity']
-                    }
-                )
-
-            # Pauza dla API (bezpieczeństwo Rate Limit)
-            time.sleep(2)
-
-            # ==========================================
-            # KROK 4: POBIERANIE MECZÓW (FIXTURES)
-            # ==========================================
-            self.stdout.write("Pobieranie meczów...")
-            fixtures = service.get_fixtures(league_id, TARGET_SEASON)
-
-            match_counter = 0
-            for item in fixtures:
-                fixture = item['fixture']
-                goals = item['goals']
-                teams = item['teams']
-                league_resp = item['league']
-
-                # Parsowanie daty i strefy czasowej
-                match_date = parse_datetime(fixture['date'])
-                if timezone.is_naive(match_date):
-                    match_date = timezone.make_aware(match_date)
-
-                # Próba pobrania drużyn z bazy
-                try:
-                    home_team = Team.objects.get(api_id=teams['home']['id'])
-                    away_team = Team.objects.get(api_id=teams['away']['id'])
-                except Team.DoesNotExist:
-                    # Jeśli drużyny nie ma (rzadki przypadek), pomijamy mecz
-                    continue
-
-                current_status_short = fixture['status']['short']
-                readable_status = self.get_match_type_status(current_status_short)
+    help = 'Synchronizuje ligi i sezony z API-Football (równolegle, we wspólnym limicie zapytań)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metrics-json', default=None,
+            help='Dodatkowo zapisuje raport (zapytania API, limit, czasy etapów, wiersze) do wskazanego pliku JSON'
+        )
+        parser.add_argument(
+            '--league', type=int, nargs='+', dest='leagues',
+            help='ID lig w API-Football (domyślnie SYNC_LEAGUES z ustawień), np. --league 39 140 135 78 61'
+        )
+        parser.add_argument(
+            '--season', type=int, nargs='+', dest='seasons',
+            help='Lata sezonów (domyślnie SYNC_SEASONS z ustawień), np. --season 2023 2024 2025'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.SYNC_LEAGUE_WORKERS,
+            help='Ile lig synchronizować równocześnie'
+        )
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Pomija lokalny cache odpowiedzi API i pobiera wszystko od nowa'
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Tryb przyrostowy: pobiera tylko mecze, które mogły się zmienić od ostatniej synchronizacji'
+        )
 
-                Match.objects.update_or_create(
-                    api_id=fixture['id'],
-                    defaults={
-                        'season': season_obj,
-                        'home_team': home_team,
-                        'away_team': away_team,
-                        'date': match_date,
-                        'home_score': goals['home'],
-                        'away_score': goals['away'],
-                        'referee': fixture['referee'],
-                        'venue_name': fixture['venue']['name'],
-                        'round': league_resp['round'],
-                        'status': readable_status,
-                    }
-                )
-                match_counter += 1
-
-            self.stdout.write(f"Przetworzono {match_counter} meczów.")
-            time.sleep(2)
-
-            # ==========================================
-            # KROK 5: TABELA (STANDINGS)
-            # ==========================================
-            self.stdout.write("Pobieranie tabeli...")
-            standings_resp = service.get_standings(league_id, TARGET_SEASON)
-
-            if standings_resp:
-                # Struktura API: response -> league -> standings -> [ [TeamA, TeamB...] ]
-                # Zazwyczaj indeks [0] to główna tabela
-                try:
-                    standings_list = standings_resp[0]['league']['standings'][0]
-
-                    for row in standings_list:
-                        team_api_id = row['team']['id']
-                        try:
-                            team_obj = Team.objects.get(api_id=team_api_id)
-
-                            Standing.objects.update_or_create(
-                                season=season_obj,
-                                team=team_obj,
-                                defaults={
-                                    'position': row['rank'],
-                                    'points': row['points'],
-                                    'form': row['form'],
-
-                                    # Nowe nazwy pól:
-                                    'status': row['status'],
-                                    'last_update': parse_datetime(row['update']),  # Zmiana na last_update
-
-                                    # Ogólne
-                                    'played': row['all']['played'],
-                                    'win': row['all']['win'],
-                                    'draw': row['all']['draw'],
-                                    'lose': row['all']['lose'],
-                                    'goals_for': row['all']['goals']['for'],  # Zmiana na goals_for
-                                    'goals_against': row['all']['goals']['against'],  # Zmiana na goals_against
-                                    'goals_diff': row['goalsDiff'],
-
-                                    # DOM
-                                    'home_played': row['home']['played'],
-                                    'home_win': row['home']['win'],
-                                    'home_draw': row['home']['draw'],
-                                    'home_lose': row['home']['lose'],
-                                    'home_goals_for': row['home']['goals']['for'],  # Zmiana
-                                    'home_goals_against': row['home']['goals']['against'],  # Zmiana
-
-                                    # WYJAZD
-                                    'away_played': row['away']['played'],
-                                    'away_win': row['away']['win'],
-                                    'away_draw': row['away']['draw'],
-                                    'away_lose': row['away']['lose'],
-                                    'away_goals_for': row['away']['goals']['for'],  # Zmiana
-                                    'away_goals_against': row['away']['goals']['against'],  # Zmiana
-                                }
-                            )
-                        except Team.DoesNotExist:
-                            continue
-                except (IndexError, KeyError):
-                    self.stdout.write(self.style.ERROR("Problem ze strukturą tabeli w API"))
-
-            time.sleep(2)
-
-            # ==========================================
-            # KROK 6: KRÓLOWIE STRZELCÓW
-            # ==========================================
-            self.stdout.write("Pobieranie strzelców...")
-            scorers = service.get_top_scorers(league_id, TARGET_SEASON)
-
-            if scorers:
-                # Wyczyść starych strzelców dla tego sezonu, żeby nie dublować
-                TopScorer.objects.filter(season=season_obj).delete()
-
-                for sc in scorers:
-                    player = sc['player']
-                    stats = sc['statistics'][0]
-                    team_id = stats['team']['id']
-
-                    try:
-                        team_obj = Team.objects.get(api_id=team_id)
-                        TopScorer.objects.create(
-                            season=season_obj,
-                            team=team_obj,
-                            player_name=player['name'],
-                            # Opcjonalnie: player_api_id=player['id'],
-                            goals=stats['goals']['total'] or 0,
-                            assists=stats['goals']['assists'] or 0
-                        )
-                    except Team.DoesNotExist:
-                        continue
-
-            self.stdout.write(self.style.SUCCESS(f"Zakończono ligę {league_id}"))
+    def handle(self, *args, **options):
+        # Jeden serwis = jedna pula połączeń i jeden, wspólny dla wszystkich lig limiter zapytań
+        service = get_football_service(use_cache=not options['no_cache'])
+
+        leagues = options['leagues'] or settings.SYNC_LEAGUES
+        seasons = options['seasons'] or settings.SYNC_SEASONS
+        jobs = [(league_id, year) for league_id in leagues for year in seasons]
+
+        self.stdout.write(self.style.WARNING(
+            f"--- Synchronizacja: {len(leagues)} lig x {len(seasons)} sezonów, "
+            f"{options['workers']} równolegle ---"
+        ))
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [
+                pool.submit(self.sync_in_thread, service, league_id, year, options['incremental'])
+                for league_id, year in jobs
+            ]
+            results = []
+            for future in futures:
+                result = future.result()
+                self.report_result(result)
+                results.append(result)
+
+        self.report_timings(results, time.monotonic() - started)
+        # Seria zmian zakończona - od razu przeliczamy analizy meczów drużyn, których forma się zmieniła
+        queued, _ = process_recompute_queue(flush=True)
+        self.stdout.write(f"Przeliczono analizy {queued} nadchodzących meczów.")
+        metrics.save(options['metrics_json'])
 
     @staticmethod
-    def get_match_type_status(short):
-        """
-        Mapuje status API na czytelny format.
-        Zawiera wszystkie przypadki z Twojego kodu Flask.
-        """
-        STATUS_MAP = {
-            # SCHEDULED
-            'TBD': 'Scheduled',
-            'NS': 'Scheduled',
-
-            # IN PLAY
-            '1H': 'In Play',
-            'HT': 'In Play',
-            '2H': 'In Play',
-            'ET': 'In Play',
-            'BT': 'In Play',
-            'P': 'In Play',
-            'LIVE': 'In Play',
-            'SUSP': 'In Play',  # Dodane z Twojej listy
-            'INT': 'In Play',  # Dodane z Twojej listy
-
-            # FINISHED
-            'FT': 'Finished',
-            'AET': 'Finished',
-            'PEN': 'Finished',  # W API-Football PEN to koniec meczu po karnych
-
-            # OTHER
-            'PST': 'Postponed',
-            'CANC': 'Cancelled',
-            'ABD': 'Abandoned',
-            'AWD': 'Not Played',
-            'WO': 'Not Played'
-        }
-        # get(klucz, wartość_domyślna) - jak nie znajdzie, zwróci sam kod (np. 'XYZ')
-        return STATUS_MAP.get(short, short)
\ No newline at end of file
+    def sync_in_thread(service, league_id, year, incremental):
+        try:
+            return sync_league_season(service, league_id, year, incremental)
+        finally:
+            # Każdy wątek ma własne połączenie z bazą - zamykamy je, żeby nie wisiało po zakończeniu puli
+            connections.close_all()
+
+    def report_result(self, result):
+        label = f"Liga {result.league_id} (Sezon {result.year})"
+        if result.error:
+            self.stdout.write(self.style.ERROR(f"{label}: nie udało się zsynchronizować - {result.error}"))
+            return
+
+        summary = result.summary
+        matches = summary['matches']
+        self.stdout.write(self.style.SUCCESS(f"Zakończono: {result.season} [{result.mode}]"))
+        if 'teams' in summary:
+            self.stdout.write(f"  Drużyny: {summary['teams']}")
+        self.stdout.write(
+            f"  Mecze: {matches.inserted} nowych, {matches.updated} zmienionych, {matches.unchanged} bez zmian"
+        )
+        if 'standings' in summary:
+            if summary['standings'] is None:
+                self.stdout.write(self.style.ERROR("  Problem ze strukturą tabeli w API"))
+            else:
+                self.stdout.write(f"  Tabela: {summary['standings']} wierszy")
+        if 'top_scorers' in summary:
+            self.stdout.write(f"  Strzelcy: {summary['top_scorers']}")
+
+    def report_timings(self, results, wall_seconds):
+        self.stdout.write("\nCzasy synchronizacji (s):")
+        self.stdout.write(f"  {'liga':>6} {'sezon':>6} {'tryb':>12} {'API':>8} {'zapis':>8} {'razem':>8}")
+        for r in results:
+            status = 'BŁĄD' if r.error else r.mode
+            self.stdout.write(
+                f"  {r.league_id:>6} {r.year:>6} {status:>12} "
+                f"{r.fetch_seconds:>8.2f} {r.write_seconds:>8.2f} {r.total_seconds:>8.2f}"
+            )
+        failed = sum(1 for r in results if r.error)
+        self.stdout.write(f"Łącznie: {wall_seconds:.2f} s, {len(results) - failed} OK, {failed} błędów.")
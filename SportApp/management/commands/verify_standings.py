@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from SportApp.models import Season
+from SportApp.services import FootballAPIError, get_football_service
+from SportApp.standings import StandingsEngine, TABLE_FIELDS, api_table, update_standings
+
+
+class Command(BaseCommand):
+    help = 'Porównuje tabelę liczoną lokalnie z meczów z tabelą z API (endpoint standings)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--league', type=int, nargs='+', dest='leagues',
+            help='ID lig w API-Football (domyślnie wszystkie w bazie)'
+        )
+        parser.add_argument(
+            '--season', type=int, nargs='+', dest='seasons',
+            help='Lata sezonów (domyślnie wszystkie w bazie)'
+        )
+        parser.add_argument(
+            '--save', action='store_true',
+            help='Po porównaniu zapisuje lokalną tabelę do Standing'
+        )
+
+    def handle(self, *args, **options):
+        seasons = Season.objects.select_related('league')
+        if options['leagues']:
+            seasons = seasons.filter(league__api_id__in=options['leagues'])
+        if options['seasons']:
+            seasons = seasons.filter(year__in=options['seasons'])
+
+        service = get_football_service()
+        differences = 0
+        for season in seasons:
+            label = f"{season.league.name} {season.year}"
+            try:
+                expected = api_table(service.get_standings(season.league.api_id, season.year))
+            except FootballAPIError as e:
+                self.stdout.write(self.style.ERROR(f"{label}: nie udało się pobrać tabeli z API - {e}"))
+                continue
+            if not expected:
+                self.stdout.write(f"{label}: API nie ma tabeli dla tego sezonu - pomijam.")
+                continue
+
+            local = {s.team.api_id: s for s in StandingsEngine(season).compute()}
+            season_differences = []
+            for team_api_id in expected.keys() | local.keys():
+                if team_api_id not in local or team_api_id not in expected:
+                    season_differences.append(f"drużyna {team_api_id}: brak w tabeli {'lokalnej' if team_api_id not in local else 'z API'}")
+                    continue
+                for field in TABLE_FIELDS:
+                    ours, theirs = getattr(local[team_api_id], field), expected[team_api_id][field]
+                    if ours != theirs:
+                        season_differences.append(
+                            f"{local[team_api_id].team.name}: {field} lokalnie {ours!r}, w API {theirs!r}"
+                        )
+
+            if season_differences:
+                differences += len(season_differences)
+                self.stdout.write(self.style.WARNING(f"{label}: {len(season_differences)} różnic"))
+                for line in sorted(season_differences):
+                    self.stdout.write(f"  {line}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{label}: tabela zgodna z API ({len(local)} drużyn)."))
+
+            if options['save']:
+                update_standings([season.id])
+
+        if differences:
+            raise CommandError(f"Znaleziono {differences} różnic między tabelą lokalną a tabelą z API.")
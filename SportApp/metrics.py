@@ -0,0 +1,151 @@
+# SportApp/metrics.py
+import json
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.utils import timezone
+
+
+class IngestionMetrics:
+    """
+    Liczniki i czasy pobierania danych z API (thread-safe, jedna instancja na proces):
+      - per endpoint: liczba zapytań, błędy, trafienia w cache, histogram opóźnień, bajty,
+      - pozostały limit zapytań (z nagłówków odpowiedzi),
+      - czasy etapów synchronizacji (teams, fixtures, standings...),
+      - wiersze wstawione / zaktualizowane / bez zmian per tabela.
+    """
+    LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = timezone.now()
+            self._endpoints = {}
+            self._stages = {}
+            self._rows = {}
+            self._quota = {}
+
+    def _endpoint(self, endpoint):
+        if endpoint not in self._endpoints:
+            self._endpoints[endpoint] = {
+                'requests': 0,
+                'errors': 0,
+                'cache_hits': 0,
+                'bytes': 0,
+                'latency_total': 0.0,
+                'latency_max': 0.0,
+                # Ostatni kubełek (+Inf) łapie wszystko powyżej ostatniej granicy
+                'latency_buckets': [0] * (len(self.LATENCY_BUCKETS) + 1),
+                'status_codes': {},
+            }
+        return self._endpoints[endpoint]
+
+    def record_request(self, endpoint, seconds, size=0, status_code=None, error=False):
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats['requests'] += 1
+            stats['bytes'] += size
+            stats['latency_total'] += seconds
+            stats['latency_max'] = max(stats['latency_max'], seconds)
+            bucket = next((i for i, limit in enumerate(self.LATENCY_BUCKETS) if seconds <= limit),
+                          len(self.LATENCY_BUCKETS))
+            stats['latency_buckets'][bucket] += 1
+            if status_code is not None:
+                key = str(status_code)
+                stats['status_codes'][key] = stats['status_codes'].get(key, 0) + 1
+            if error:
+                stats['errors'] += 1
+
+    def record_cache_hit(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint)['cache_hits'] += 1
+
+    def record_quota(self, **values):
+        """np. record_quota(day_remaining=87, day_limit=100, minute_remaining=9)."""
+        with self._lock:
+            self._quota.update({k: v for k, v in values.items() if v is not None})
+            self._quota['updated_at'] = timezone.now().isoformat()
+
+    def record_rows(self, table, inserted=0, updated=0, unchanged=0):
+        with self._lock:
+            rows = self._rows.setdefault(table, {'inserted': 0, 'updated': 0, 'unchanged': 0})
+            rows['inserted'] += inserted
+            rows['updated'] += updated
+            rows['unchanged'] += unchanged
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """Mierzy czas etapu, np. `with metrics.stage('fixtures', league=39, season=2025):`."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            key = (name, tuple(sorted(labels.items())))
+            with self._lock:
+                stage = self._stages.setdefault(key, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+                stage['count'] += 1
+                stage['total_seconds'] += elapsed
+                stage['max_seconds'] = max(stage['max_seconds'], elapsed)
+
+    def report(self):
+        with self._lock:
+            endpoints = {}
+            for endpoint, stats in self._endpoints.items():
+                requests_count = stats['requests']
+                endpoints[endpoint] = {
+                    'requests': requests_count,
+                    'errors': stats['errors'],
+                    'cache_hits': stats['cache_hits'],
+                    'bytes': stats['bytes'],
+                    'latency_avg': round(stats['latency_total'] / requests_count, 4) if requests_count else None,
+                    'latency_max': round(stats['latency_max'], 4),
+                    'latency_histogram': {
+                        **{f"le_{limit}": count for limit, count in zip(self.LATENCY_BUCKETS, stats['latency_buckets'])},
+                        'le_inf': stats['latency_buckets'][-1],
+                    },
+                    'status_codes': dict(stats['status_codes']),
+                }
+            stages = [
+                {
+                    'stage': name,
+                    **dict(labels),
+                    'count': stage['count'],
+                    'total_seconds': round(stage['total_seconds'], 4),
+                    'max_seconds': round(stage['max_seconds'], 4),
+                }
+                for (name, labels), stage in self._stages.items()
+            ]
+            return {
+                'started_at': self.started_at.isoformat(),
+                'generated_at': timezone.now().isoformat(),
+                'endpoints': endpoints,
+                'quota': dict(self._quota),
+                'stages': stages,
+                'rows': {table: dict(rows) for table, rows in self._rows.items()},
+            }
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+
+    def save(self, extra_path=None):
+        """Zapisuje raport w INGESTION_METRICS_PATH (czyta go endpoint /api/metrics/ingestion/) i opcjonalnie w extra_path."""
+        for path in filter(None, [settings.INGESTION_METRICS_PATH, extra_path]):
+            self.write(path)
+
+
+def load_last_report():
+    """Ostatni raport zapisany przez komendy synchronizacji albo None."""
+    try:
+        with open(settings.INGESTION_METRICS_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+metrics = IngestionMetrics()
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_full_sync', models.DateTimeField(blank=True, null=True)),
+                ('last_delta_sync', models.DateTimeField(blank=True, null=True)),
+                ('pending_fixtures', models.JSONField(blank=True, default=list)),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sync_cursor', to='SportApp.season')),
+            ],
+        ),
+    ]
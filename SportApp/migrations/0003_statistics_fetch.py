@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0002_sync_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticsFetch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_result', models.CharField(choices=[('empty', 'Brak statystyk w API'), ('error', 'Błąd zapytania')], max_length=10)),
+                ('last_attempt_at', models.DateTimeField()),
+                ('retry_after', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics_fetch', to='SportApp.match')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0003_statistics_fetch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamForm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='form', to='SportApp.team')),
+            ],
+        ),
+    ]
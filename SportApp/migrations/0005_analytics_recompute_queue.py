@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0004_team_form'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsRecompute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('result', 'Wynik meczu drużyny'), ('statistics', 'Statystyki meczu drużyny'), ('fixture', 'Nowy lub zmieniony mecz'), ('admin', 'Edycja przez API')], max_length=20)),
+                ('requested_at', models.DateTimeField()),
+                ('not_before', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['home_team', 'status', 'date'], name='match_home_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['away_team', 'status', 'date'], name='match_away_status_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='analyticsrecompute',
+            name='match',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_recompute', to='SportApp.match'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0005_analytics_recompute_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamSeasonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('home_played', models.IntegerField(default=0)),
+                ('home_win', models.IntegerField(default=0)),
+                ('home_draw', models.IntegerField(default=0)),
+                ('home_lose', models.IntegerField(default=0)),
+                ('home_goals_for', models.IntegerField(default=0)),
+                ('home_goals_against', models.IntegerField(default=0)),
+                ('home_stats', models.JSONField(blank=True, default=dict)),
+                ('away_played', models.IntegerField(default=0)),
+                ('away_win', models.IntegerField(default=0)),
+                ('away_draw', models.IntegerField(default=0)),
+                ('away_lose', models.IntegerField(default=0)),
+                ('away_goals_for', models.IntegerField(default=0)),
+                ('away_goals_against', models.IntegerField(default=0)),
+                ('away_stats', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_stats', to='SportApp.season')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_stats', to='SportApp.team')),
+            ],
+            options={
+                'verbose_name_plural': 'Team season stats',
+                'unique_together': {('season', 'team')},
+            },
+        ),
+    ]
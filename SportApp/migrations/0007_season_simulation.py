@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0006_team_season_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonSimulation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('simulations', models.IntegerField()),
+                ('remaining_matches', models.IntegerField()),
+                ('seconds', models.FloatField()),
+                ('results', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='simulation', to='SportApp.season')),
+            ],
+        ),
+    ]
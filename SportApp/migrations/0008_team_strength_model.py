@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0007_season_simulation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStrengthModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('home_advantage', models.FloatField()),
+                ('rho', models.FloatField()),
+                ('teams', models.JSONField(default=dict)),
+                ('matches', models.IntegerField(default=0)),
+                ('fitted_through', models.DateTimeField(blank=True, null=True)),
+                ('iterations', models.IntegerField(default=0)),
+                ('seconds', models.FloatField(default=0)),
+                ('log_likelihood', models.FloatField(default=0)),
+                ('fitted_at', models.DateTimeField(auto_now=True)),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='strength_model', to='SportApp.season')),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0008_team_strength_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamEloRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField()),
+                ('matches', models.IntegerField(default=0)),
+                ('last_match_date', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='SportApp.match')),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='elo', to='SportApp.team')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EloRatingHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField()),
+                ('rating_before', models.FloatField()),
+                ('rating_after', models.FloatField()),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='elo_history', to='SportApp.match')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='SportApp.season')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='elo_history', to='SportApp.team')),
+            ],
+            options={
+                'verbose_name_plural': 'Elo rating history',
+                'indexes': [models.Index(fields=['team', 'date'], name='elo_history_team_date_idx'), models.Index(fields=['date'], name='elo_history_date_idx')],
+                'unique_together': {('team', 'match')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0009_elo_ratings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['date', 'id'], name='match_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['season', 'date', 'id'], name='match_season_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchrating',
+            index=models.Index(fields=['created_at', 'id'], name='rating_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topscorer',
+            index=models.Index(fields=['season', 'goals', 'id'], name='topscorer_season_goals_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topscorer',
+            index=models.Index(fields=['goals', 'id'], name='topscorer_goals_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonRecompute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested_at', models.DateTimeField()),
+                ('not_before', models.DateTimeField(db_index=True)),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recompute', to='SportApp.season')),
+            ],
+        ),
+    ]
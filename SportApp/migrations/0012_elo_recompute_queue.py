@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0011_season_recompute_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EloRecompute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('replay_from', models.DateTimeField(blank=True, null=True)),
+                ('requested_at', models.DateTimeField()),
+                ('not_before', models.DateTimeField(db_index=True)),
+                ('match', models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='elo_recompute', to='SportApp.match')),
+            ],
+        ),
+    ]
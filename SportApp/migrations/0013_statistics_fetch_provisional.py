@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0012_elo_recompute_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='statisticsfetch',
+            name='last_result',
+            field=models.CharField(choices=[('empty', 'Brak statystyk w API'), ('error', 'Błąd zapytania'), ('provisional', 'Statystyki tuż po meczu')], max_length=11),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SportApp', '0013_statistics_fetch_provisional'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsBackfillSkip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checked_at', models.DateTimeField(auto_now=True)),
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_skip', to='SportApp.match')),
+            ],
+        ),
+    ]
@@ -98,6 +98,14 @@ class Match(models.Model):
     class Meta:
         verbose_name_plural = "Matches"
         ordering = ['date']  # Domyślne sortowanie po dacie
+        indexes = [
+            # Indeks "drużyna -> nadchodzące mecze" (przeliczanie analiz po zmianie formy drużyny)
+            models.Index(fields=['home_team', 'status', 'date'], name='match_home_status_date_idx'),
+            models.Index(fields=['away_team', 'status', 'date'], name='match_away_status_date_idx'),
+            # Stronicowanie po kluczu (date, id) - całość i lista sezonu (?season=)
+            models.Index(fields=['date', 'id'], name='match_date_id_idx'),
+            models.Index(fields=['season', 'date', 'id'], name='match_season_date_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.home_team} vs {self.away_team}"
@@ -114,6 +122,18 @@ class MatchAnalytics(models.Model):
     def __str__(self):
         return f"Analiza meczu {self.match}"
 
+
+class AnalyticsBackfillSkip(models.Model):
+    """
+    Mecz przetworzony przez backfill analiz, dla którego nie powstała analiza (któraś drużyna nie miała jeszcze
+    historii) - wznowione uruchomienie go pomija zamiast liczyć od nowa.
+    """
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='analytics_skip')
+    checked_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Bez analizy: {self.match}"
+
 class Standing(models.Model):
     season = models.ForeignKey(Season, on_delete=models.CASCADE)
     team = models.ForeignKey(Team, on_delete=models.CASCADE)
@@ -166,11 +186,236 @@ class TopScorer(models.Model):
 
     class Meta:
         ordering = ['-goals']
+        indexes = [
+            # Stronicowanie po kluczu (goals, id), zwykle w obrębie sezonu
+            models.Index(fields=['season', 'goals', 'id'], name='topscorer_season_goals_id_idx'),
+            models.Index(fields=['goals', 'id'], name='topscorer_goals_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.player_name} ({self.goals})"
 
 
+class SyncCursor(models.Model):
+    """Stan synchronizacji sezonu - pozwala pobierać z API tylko to, co mogło się zmienić."""
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='sync_cursor')
+    last_full_sync = models.DateTimeField(null=True, blank=True)
+    last_delta_sync = models.DateTimeField(null=True, blank=True)
+    # api_id meczów, które nie mają jeszcze statusu końcowego (Finished, Cancelled...)
+    pending_fixtures = models.JSONField(default=list, blank=True)
+
+    @property
+    def last_sync(self):
+        return max(filter(None, [self.last_full_sync, self.last_delta_sync]), default=None)
+
+    def __str__(self):
+        return f"Kursor synchronizacji {self.season}"
+
+
+class StatisticsFetch(models.Model):
+    """
+    Historia nieudanych prób pobrania statystyk meczu - żeby "martwe" mecze nie były odpytywane w kółko.
+    RESULT_PROVISIONAL: statystyki zapisane tuż po meczu (mogą być niepełne) - pobierane ponownie po retry_after.
+    """
+    RESULT_EMPTY = 'empty'
+    RESULT_ERROR = 'error'
+    RESULT_PROVISIONAL = 'provisional'
+    RESULT_CHOICES = [
+        (RESULT_EMPTY, 'Brak statystyk w API'),
+        (RESULT_ERROR, 'Błąd zapytania'),
+        (RESULT_PROVISIONAL, 'Statystyki tuż po meczu'),
+    ]
+
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='statistics_fetch')
+    attempts = models.IntegerField(default=0)
+    last_result = models.CharField(max_length=11, choices=RESULT_CHOICES)
+    last_attempt_at = models.DateTimeField()
+    # Kiedy najwcześniej spróbować ponownie; NULL = nie próbujemy więcej
+    retry_after = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"Statystyki {self.match}: {self.last_result} ({self.attempts})"
+
+
+class TeamForm(models.Model):
+    """
+    Ostatnie zakończone mecze drużyny (od najnowszego) z jej perspektywy: wynik i statystyki używane w analizach.
+    Utrzymywane przyrostowo przy zakończeniu meczu / zapisie statystyk; istnienie wiersza = okno jest kompletne.
+    """
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='form')
+    matches = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def results(self):
+        return ''.join(entry['result'] for entry in self.matches)
+
+    def __str__(self):
+        return f"Forma {self.team}: {self.results}"
+
+
+class TeamSeasonStats(models.Model):
+    """
+    Wyniki i sumy statystyk drużyny w sezonie z podziałem u siebie / na wyjeździe (jeden wiersz zamiast
+    agregowania meczów przy każdym zapytaniu). Statystyki: {"fouls": {"total": 84, "matches": 7}, ...} -
+    "matches" to liczba meczów, w których statystyka była dostępna (mianownik średniej).
+    """
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='team_stats')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='season_stats')
+
+    home_played = models.IntegerField(default=0)
+    home_win = models.IntegerField(default=0)
+    home_draw = models.IntegerField(default=0)
+    home_lose = models.IntegerField(default=0)
+    home_goals_for = models.IntegerField(default=0)
+    home_goals_against = models.IntegerField(default=0)
+    home_stats = models.JSONField(default=dict, blank=True)
+
+    away_played = models.IntegerField(default=0)
+    away_win = models.IntegerField(default=0)
+    away_draw = models.IntegerField(default=0)
+    away_lose = models.IntegerField(default=0)
+    away_goals_for = models.IntegerField(default=0)
+    away_goals_against = models.IntegerField(default=0)
+    away_stats = models.JSONField(default=dict, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('season', 'team')
+        verbose_name_plural = "Team season stats"
+
+    def __str__(self):
+        return f"Statystyki {self.team} ({self.season})"
+
+
+class SeasonSimulation(models.Model):
+    """
+    Wynik symulacji Monte Carlo reszty sezonu - liczony od nowa w kolejce przeliczeń po wynikach meczów sezonu
+    (SeasonRecompute) albo komendą simulate_season.
+    Wyniki: [{"team_id": 1, "expected_points": 71.3, "positions": [0.41, 0.22, ...], ...}, ...]
+    """
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='simulation')
+    simulations = models.IntegerField()
+    remaining_matches = models.IntegerField()
+    seconds = models.FloatField()
+    results = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Symulacja {self.season} ({self.simulations})"
+
+
+class TeamStrengthModel(models.Model):
+    """
+    Parametry modelu goli Dixona-Colesa dla sezonu (dopasowane do zakończonych meczów).
+    Drużyny: {"<team_id>": {"attack": 0.31, "defense": 0.12}, ...} - 0 to przeciętna drużyna.
+    """
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='strength_model')
+    home_advantage = models.FloatField()
+    rho = models.FloatField()
+    teams = models.JSONField(default=dict)
+
+    matches = models.IntegerField(default=0)
+    # Data najnowszego meczu w dopasowaniu (od niej liczony jest zanik wag starszych meczów)
+    fitted_through = models.DateTimeField(null=True, blank=True)
+    iterations = models.IntegerField(default=0)
+    seconds = models.FloatField(default=0)
+    log_likelihood = models.FloatField(default=0)
+    fitted_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Model siły drużyn {self.season} ({self.matches} meczów)"
+
+
+class TeamEloRating(models.Model):
+    """Bieżący ranking Elo drużyny (po wszystkich zakończonych meczach, ze wszystkich lig i sezonów)."""
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='elo')
+    rating = models.FloatField()
+    matches = models.IntegerField(default=0)
+    # Ostatni przetworzony mecz - nowy wynik późniejszy od niego można dopisać bez przeliczania historii
+    last_match = models.ForeignKey(Match, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_match_date = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Elo {self.team}: {self.rating:.0f}"
+
+
+class EloRatingHistory(models.Model):
+    """Ranking drużyny przed i po meczu - po jednym wierszu na drużynę i mecz."""
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='elo_history')
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='elo_history')
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='+')
+    date = models.DateTimeField()
+    rating_before = models.FloatField()
+    rating_after = models.FloatField()
+
+    class Meta:
+        unique_together = ('team', 'match')
+        verbose_name_plural = "Elo rating history"
+        indexes = [
+            # Seria rankingu drużyny w czasie i stan drużyny "sprzed daty" przy przeliczaniu od tej daty
+            models.Index(fields=['team', 'date'], name='elo_history_team_date_idx'),
+            models.Index(fields=['date'], name='elo_history_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.team}: {self.rating_before:.0f} -> {self.rating_after:.0f} ({self.match})"
+
+
+class AnalyticsRecompute(models.Model):
+    """Kolejka meczów do przeliczenia wskaźników - jeden wiersz na mecz, więc seria zmian daje jedno przeliczenie."""
+    REASON_RESULT = 'result'
+    REASON_STATISTICS = 'statistics'
+    REASON_FIXTURE = 'fixture'
+    REASON_ADMIN = 'admin'
+    REASON_CHOICES = [
+        (REASON_RESULT, 'Wynik meczu drużyny'),
+        (REASON_STATISTICS, 'Statystyki meczu drużyny'),
+        (REASON_FIXTURE, 'Nowy lub zmieniony mecz'),
+        (REASON_ADMIN, 'Edycja przez API'),
+    ]
+
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='analytics_recompute')
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    # Ostatnie zgłoszenie - wiersz usuwamy po przeliczeniu tylko, jeśli w międzyczasie nie przyszło nowe
+    requested_at = models.DateTimeField()
+    # Debounce: przeliczamy najwcześniej po tym czasie od pierwszego zgłoszenia
+    not_before = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Przeliczenie {self.match} ({self.reason})"
+
+
+class SeasonRecompute(models.Model):
+    """
+    Kolejka kosztownych przeliczeń sezonu po nowych wynikach (model siły drużyn, symulacja) - wykonywanych
+    poza transakcją synchronizacji; jeden wiersz na sezon, więc seria wyników daje jedno przeliczenie.
+    """
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='recompute')
+    requested_at = models.DateTimeField()
+    not_before = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Przeliczenie sezonu {self.season}"
+
+
+class EloRecompute(models.Model):
+    """
+    Kolejka zmian rankingu Elo - przetwarzana po kolei, poza równoległymi transakcjami synchronizacji lig
+    (historia i rankingi są wspólne dla wszystkich lig). Wiersz to zmieniony mecz albo data usuniętego meczu.
+    """
+    match = models.OneToOneField(Match, null=True, on_delete=models.CASCADE, related_name='elo_recompute')
+    # Usunięty mecz: historia przeliczana od tej daty
+    replay_from = models.DateTimeField(null=True, blank=True)
+    requested_at = models.DateTimeField()
+    not_before = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Przeliczenie Elo {self.match or self.replay_from}"
+
+
 class MatchRating(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='ratings')
@@ -178,4 +423,8 @@ class MatchRating(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('user', 'match')
\ No newline at end of file
+        unique_together = ('user', 'match')
+        indexes = [
+            # Stronicowanie po kluczu (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='rating_created_id_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,153 @@
+# SportApp/pagination.py
+import base64
+import binascii
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Stronicowanie po kluczu (keyset): kolejna strona to WHERE (date, id) < (ostatni wiersz), nie OFFSET.
+    Kolejność = sortowanie queryset (także z ?ordering=) + klucz główny jako rozstrzygnięcie remisów,
+    więc granice stron nie przesuwają się, gdy synchronizacja dopisuje mecze w trakcie przeglądania.
+    Bez COUNT(*) - odpowiedź ma tylko linki next/previous; koszt strony nie rośnie z rozmiarem tabeli.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Nieprawidłowy kursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = [_invert(name) for name in self.ordering] if self.reverse else self.ordering
+        queryset = _load_columns(queryset.order_by(*ordering), [name.lstrip('-') for name in ordering])
+        try:
+            if position is not None:
+                queryset = queryset.filter(_after(ordering, position))
+            # Jeden wiersz ponad stronę mówi, czy jest następna - zamiast liczenia wszystkich
+            rows = list(queryset[:self.page_size + 1])
+        except (DjangoValidationError, ValueError, TypeError):
+            # Wartość w kursorze nie pasuje do typu kolumny (np. zmieniona ręcznie data)
+            raise NotFound(self.invalid_cursor_message)
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except KeyError:
+            return settings.API_PAGE_SIZE
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'Wymagana liczba całkowita.'})
+        return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+    def get_ordering(self, queryset):
+        """Pola sortowania (tylko kolumny NOT NULL modelu) z kluczem głównym na końcu."""
+        model = queryset.model
+        ordering = [str(name) for name in queryset.query.order_by or model._meta.ordering]
+        fields = []
+        for name in ordering:
+            try:
+                field = model._meta.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                field = None
+            if field is None or not field.concrete or field.null:
+                raise ValidationError({'ordering': f"Stronicowanie nie obsługuje sortowania po '{name}'."})
+            fields.append(('-' if name.startswith('-') else '') + field.attname)
+        pk = model._meta.pk.attname
+        if not any(name.lstrip('-') == pk for name in fields):
+            fields.append(('-' if fields and fields[-1].startswith('-') else '') + pk)
+        return fields
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = data['p'], bool(data.get('r'))
+            if len(values) != len(self.ordering) or not all(isinstance(v, (str, int, float)) for v in values):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, row, reverse):
+        encoded = encode_position([_value(row, name.lstrip('-')) for name in self.ordering], reverse)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        return self.encode_cursor(self.page[-1], reverse=False) if self.has_next and self.page else None
+
+    def get_previous_link(self):
+        return self.encode_cursor(self.page[0], reverse=True) if self.has_previous and self.page else None
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        link = {'type': 'string', 'nullable': True, 'format': 'uri'}
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {'next': link, 'previous': link, 'results': schema},
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Kursor strony (z linków next / previous).', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': f'Liczba wyników na stronie (maks. {settings.API_MAX_PAGE_SIZE}).',
+             'schema': {'type': 'integer'}},
+        ]
+
+
+def encode_position(values, reverse=False):
+    """Kursor dla pozycji (wartości kolumn sortowania, np. [data ISO, id]) - strona zaczyna się za nią."""
+    data = {'p': values, 'r': 1} if reverse else {'p': values}
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode('ascii')
+
+
+def _invert(name):
+    return name[1:] if name.startswith('-') else '-' + name
+
+
+def _value(row, attname):
+    """Wartość kolumny w postaci do JSON (daty jako ISO 8601 - pole przywraca typ przy filtrze)."""
+    value = getattr(row, attname)
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _after(ordering, position):
+    """(a, b) > (x, y) w kolejności sortowania: a > x OR (a = x AND b > y); kierunek pola wg '-'."""
+    condition, equal = Q(), Q()
+    for name, value in zip(ordering, position):
+        column = name.lstrip('-')
+        condition |= equal & Q(**{f"{column}__{'lt' if name.startswith('-') else 'gt'}": value})
+        equal &= Q(**{column: value})
+    return condition
+
+
+def _load_columns(queryset, columns):
+    """Kolumny sortowania muszą być wczytane (only() z ?fields=) - inaczej kursor to zapytanie na wiersz."""
+    names, defer = queryset.query.deferred_loading
+    if names and not defer:
+        return queryset.only(*names, *columns)
+    return queryset
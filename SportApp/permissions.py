@@ -1,11 +1,87 @@
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth.models import Group
 from rest_framework.permissions import BasePermission
 
+# Grupy, od których zależą uprawnienia API - tylko one trafiają do tokenu i cache ról
+ROLE_GROUPS = ('User', 'Admin')
+
+
+def load_roles(user_id):
+    """Role użytkownika z bazy (jedno zapytanie)."""
+    return frozenset(Group.objects.filter(user=user_id, name__in=ROLE_GROUPS).values_list('name', flat=True))
+
+
+class RoleCache:
+    """
+    Role użytkowników w pamięci procesu na ROLE_CACHE_TTL sekund (thread-safe, jedna instancja na proces).
+    Zmiana grup usuwa wpisy od razu w tym procesie (sygnały w apps.py); inne procesy widzą ją najpóźniej po TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, user_id):
+        key = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        roles = load_roles(user_id)
+        with self._lock:
+            self._entries[key] = (now + settings.ROLE_CACHE_TTL, roles)
+        return roles
+
+    def invalidate(self, user_ids=None):
+        """Usuwa wpisy wskazanych użytkowników (None = wszystkie)."""
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+            else:
+                for user_id in user_ids:
+                    self._entries.pop(str(user_id), None)
+
+
+role_cache = RoleCache()
+
+
+def user_roles(user):
+    """Role z podpisanego tokenu (RoleTokenUser), a bez nich - z cache procesu / bazy."""
+    roles = getattr(user, 'roles', None)
+    if roles is not None:
+        return roles
+    return role_cache.get(user.pk)
+
+
+def groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """m2m_changed dla User.groups: user.groups.add(...) albo group.user_set.add(...)."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        role_cache.invalidate([instance.pk])
+    else:
+        # group.user_set.clear() nie podaje użytkowników
+        role_cache.invalidate(pk_set)
+
+
+def group_changed(sender, **kwargs):
+    """Zmiana nazwy lub usunięcie grupy - role wszystkich użytkowników mogą być nieaktualne."""
+    role_cache.invalidate()
+
+
+def user_deleted(sender, instance, **kwargs):
+    role_cache.invalidate([instance.pk])
+
+
 class IsAdminGroup(BasePermission):
     def has_permission(self, request, view):
         return bool(
             request.user and
             request.user.is_authenticated and
-            request.user.groups.filter(name='Admin').exists()
+            'Admin' in user_roles(request.user)
         )
 
 class IsUserGroup(BasePermission):
@@ -13,5 +89,5 @@ class IsUserGroup(BasePermission):
         return bool(
             request.user and
             request.user.is_authenticated and
-            request.user.groups.filter(name__in=['User', 'Admin']).exists()
-        )
\ No newline at end of file
+            user_roles(request.user) & {'User', 'Admin'}
+        )
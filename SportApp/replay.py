@@ -0,0 +1,297 @@
+# SportApp/replay.py
+import json
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from django.utils import timezone
+from .api_cache import ResponseCache
+from .ingestion import STAT_FIELD_MAP, parse_match_date
+from .metrics import metrics
+from .services import FootballAPIService, FootballAPIError
+
+
+class DirectoryStore:
+    """
+    Nagrane odpowiedzi API w katalogu: <katalog>/<endpoint>/<sha256(endpoint+params)>.json.
+    Każdy plik zawiera endpoint, parametry i pole `response` dokładnie tak, jak zwróciło je API.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._fixture_index = None
+
+    def _file(self, endpoint, params):
+        return self.path / endpoint.replace('/', '__') / f"{ResponseCache.make_key(endpoint, params)}.json"
+
+    def get(self, endpoint, params):
+        file = self._file(endpoint, params)
+        if not file.exists():
+            return None
+        with open(file, encoding='utf-8') as f:
+            return json.load(f)['response']
+
+    def put(self, endpoint, params, payload):
+        file = self._file(endpoint, params)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        with open(file, 'w', encoding='utf-8') as f:
+            json.dump({'endpoint': endpoint, 'params': params, 'response': payload}, f, ensure_ascii=False, default=str)
+
+    def find_fixtures(self, fixture_ids):
+        if self._fixture_index is None:
+            self._fixture_index = {}
+            for file in sorted((self.path / 'fixtures').glob('*.json')):
+                with open(file, encoding='utf-8') as f:
+                    for item in json.load(f)['response']:
+                        self._fixture_index[item['fixture']['id']] = item
+        return [self._fixture_index[i] for i in fixture_ids if i in self._fixture_index]
+
+
+class SyntheticStore:
+    """
+    Generator realistycznych odpowiedzi API dla N lig x M sezonów (deterministyczny dla danego `seed`).
+    Terminarz to pełna "każdy z każdym" u siebie i na wyjeździe; mecze sprzed teraz mają wynik i statystyki.
+    """
+    TEAMS_PER_LEAGUE = 20
+    GOAL_WEIGHTS = [25, 33, 23, 12, 5, 2]
+
+    def __init__(self, leagues=1, seasons=1, seed=0, now=None):
+        self.now = now or timezone.now()
+        last_year = self.now.year if self.now.month >= 7 else self.now.year - 1
+        self.league_ids = [1000 + i for i in range(leagues)]
+        self.years = list(range(last_year - seasons + 1, last_year + 1))
+        self.seed = seed
+        self._fixtures = {}
+        self._fixture_index = {}
+
+    @property
+    def jobs(self):
+        return [(league_id, year) for league_id in self.league_ids for year in self.years]
+
+    def _team_ids(self, league_id):
+        return [league_id * 100 + i for i in range(1, self.TEAMS_PER_LEAGUE + 1)]
+
+    def _year_from_fixture(self, fixture_id):
+        yy = fixture_id % 100000 // 1000
+        return next((y for y in self.years if y % 100 == yy), None)
+
+    def get(self, endpoint, params):
+        handler = {
+            'leagues': lambda: self._league(int(params['id'])),
+            'teams': lambda: self._teams(int(params['league'])),
+            'fixtures': lambda: self.fixtures(int(params['league']), int(params['season'])),
+            'standings': lambda: self._standings(int(params['league']), int(params['season'])),
+            'players/topscorers': lambda: self._top_scorers(int(params['league']), int(params['season'])),
+            'fixtures/statistics': lambda: self._statistics(int(params['fixture'])),
+        }.get(endpoint)
+        if handler is None or (endpoint == 'fixtures' and not {'league', 'season'} <= params.keys()):
+            return None
+        return handler()
+
+    def find_fixtures(self, fixture_ids):
+        found = []
+        for fixture_id in fixture_ids:
+            league_id, year = fixture_id // 100000, self._year_from_fixture(fixture_id)
+            if league_id in self.league_ids and year is not None:
+                self.fixtures(league_id, year)
+                if fixture_id in self._fixture_index:
+                    found.append(self._fixture_index[fixture_id])
+        return found
+
+    def _league(self, league_id):
+        if league_id not in self.league_ids:
+            return []
+        return [{
+            'league': {'id': league_id, 'name': f"Synthetic League {league_id}", 'logo': None},
+            'country': {'name': 'Synthetic'},
+            'seasons': [{'year': y, 'current': y == self.years[-1]} for y in self.years],
+        }]
+
+    def _teams(self, league_id):
+        return [{
+            'team': {'id': team_id, 'name': f"Team {team_id}", 'logo': None, 'founded': 1900 + team_id % 100},
+            'venue': {'name': f"Stadium {team_id}", 'city': f"City {team_id}", 'capacity': 20000 + team_id % 100 * 500},
+        } for team_id in self._team_ids(league_id)]
+
+    def fixtures(self, league_id, year):
+        key = (league_id, year)
+        if key not in self._fixtures:
+            self._fixtures[key] = self._build_fixtures(league_id, year)
+            self._fixture_index.update((f['fixture']['id'], f) for f in self._fixtures[key])
+        return self._fixtures[key]
+
+    def _build_fixtures(self, league_id, year):
+        teams = self._team_ids(league_id)
+        # Algorytm "kołowy": jedna drużyna stoi w miejscu, pozostałe rotują
+        rotation = teams[1:]
+        rounds = []
+        for _ in range(len(teams) - 1):
+            lineup = [teams[0]] + rotation
+            half = len(lineup) // 2
+            rounds.append(list(zip(lineup[:half], reversed(lineup[half:]))))
+            rotation = rotation[-1:] + rotation[:-1]
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+
+        season_start = datetime(year, 8, 16, 15, 0, tzinfo=dt_timezone.utc)
+        fixtures = []
+        for round_no, pairs in enumerate(rounds):
+            for n, (home, away) in enumerate(pairs):
+                fixture_id = league_id * 100000 + (year % 100) * 1000 + round_no * len(pairs) + n
+                date = season_start + timedelta(days=7 * round_no, hours=2 * (n % 3))
+                finished = date + timedelta(hours=2) < self.now
+                rng = random.Random(self.seed * 1_000_003 + fixture_id)
+                fixtures.append({
+                    'fixture': {
+                        'id': fixture_id,
+                        'date': date.isoformat(),
+                        'referee': f"Referee {rng.randint(1, 25)}",
+                        'venue': {'name': f"Stadium {home}"},
+                        'status': {'short': 'FT' if finished else 'NS'},
+                    },
+                    'league': {'id': league_id, 'season': year, 'round': f"Regular Season - {round_no + 1}"},
+                    'teams': {'home': {'id': home}, 'away': {'id': away}},
+                    'goals': {
+                        'home': rng.choices(range(6), self.GOAL_WEIGHTS)[0] + (rng.random() < 0.15) if finished else None,
+                        'away': rng.choices(range(6), self.GOAL_WEIGHTS)[0] if finished else None,
+                    },
+                })
+        return fixtures
+
+    def _standings(self, league_id, year):
+        table = {team_id: {'all': _empty_record(), 'home': _empty_record(), 'away': _empty_record(), 'form': ''}
+                 for team_id in self._team_ids(league_id)}
+        played = [f for f in self.fixtures(league_id, year) if f['fixture']['status']['short'] == 'FT']
+        for f in sorted(played, key=lambda f: f['fixture']['date']):
+            home, away = f['teams']['home']['id'], f['teams']['away']['id']
+            hg, ag = f['goals']['home'], f['goals']['away']
+            for team_id, side, gf, ga in ((home, 'home', hg, ag), (away, 'away', ag, hg)):
+                outcome = 'W' if gf > ga else 'D' if gf == ga else 'L'
+                for record in (table[team_id]['all'], table[team_id][side]):
+                    _add_result(record, gf, ga, outcome)
+                table[team_id]['form'] = (outcome + table[team_id]['form'])[:5]
+
+        def points(r):
+            return r['win'] * 3 + r['draw']
+
+        ranked = sorted(table.items(), key=lambda kv: (
+            -points(kv[1]['all']),
+            -(kv[1]['all']['goals']['for'] - kv[1]['all']['goals']['against']),
+            -kv[1]['all']['goals']['for'],
+        ))
+        rows = [{
+            'rank': rank,
+            'team': {'id': team_id},
+            'points': points(r['all']),
+            'goalsDiff': r['all']['goals']['for'] - r['all']['goals']['against'],
+            'form': r['form'] or None,
+            'status': 'same',
+            'update': self.now.isoformat(),
+            'all': r['all'], 'home': r['home'], 'away': r['away'],
+        } for rank, (team_id, r) in enumerate(ranked, start=1)]
+        return [{'league': {'id': league_id, 'season': year, 'standings': [rows]}}]
+
+    def _top_scorers(self, league_id, year):
+        rng = random.Random(self.seed * 7919 + league_id * 100 + year)
+        teams = self._team_ids(league_id)
+        goals = sorted((rng.randint(3, 30) for _ in range(20)), reverse=True)
+        return [{
+            'player': {'id': league_id * 1000 + i, 'name': f"Player {league_id}-{i}"},
+            'statistics': [{'team': {'id': rng.choice(teams)}, 'goals': {'total': g, 'assists': rng.randint(0, 12)}}],
+        } for i, g in enumerate(goals)]
+
+    def _statistics(self, fixture_id):
+        fixture = self.find_fixtures([fixture_id])
+        if not fixture or fixture[0]['fixture']['status']['short'] != 'FT':
+            return []
+        rng = random.Random(self.seed * 104729 + fixture_id)
+        home_possession = rng.randint(35, 65)
+        response = []
+        for side, possession in (('home', home_possession), ('away', 100 - home_possession)):
+            on_goal, off_goal, blocked = rng.randint(1, 9), rng.randint(1, 8), rng.randint(0, 6)
+            inside = rng.randint(on_goal, on_goal + off_goal + blocked)
+            passes = rng.randint(250, 700)
+            values = {
+                'Shots on Goal': on_goal,
+                'Shots off Goal': off_goal,
+                'Total Shots': on_goal + off_goal + blocked,
+                'Blocked Shots': blocked,
+                'Shots inside box': inside,
+                'Shots outside box': on_goal + off_goal + blocked - inside,
+                'Fouls': rng.randint(5, 18),
+                'Corner Kicks': rng.randint(0, 12),
+                'Offsides': rng.randint(0, 5),
+                'Ball Possession': f"{possession}%",
+                'Yellow Cards': rng.randint(0, 5),
+                'Red Cards': int(rng.random() < 0.07),
+                'Goalkeeper saves': rng.randint(0, 8),
+                'Total passes': passes,
+                'Passes accurate': int(passes * rng.uniform(0.7, 0.9)),
+            }
+            response.append({
+                'team': {'id': fixture[0]['teams'][side]['id']},
+                'statistics': [{'type': t, 'value': values[t]} for t in STAT_FIELD_MAP],
+            })
+        return response
+
+
+def _empty_record():
+    return {'played': 0, 'win': 0, 'draw': 0, 'lose': 0, 'goals': {'for': 0, 'against': 0}}
+
+
+def _add_result(record, gf, ga, outcome):
+    record['played'] += 1
+    record[{'W': 'win', 'D': 'draw', 'L': 'lose'}[outcome]] += 1
+    record['goals']['for'] += gf
+    record['goals']['against'] += ga
+
+
+class RecordingFootballAPIService(FootballAPIService):
+    """Zwykły klient API, który dodatkowo zapisuje każdą odpowiedź do magazynu nagrań."""
+
+    def __init__(self, store, **kwargs):
+        # Nagrywamy prawdziwe odpowiedzi, nie zawartość lokalnego cache
+        kwargs['use_cache'] = False
+        super().__init__(**kwargs)
+        self.store = store
+
+    def _fetch(self, endpoint, params, conditional_headers=None):
+        payload = super()._fetch(endpoint, params, conditional_headers)
+        self.store.put(endpoint, params, payload)
+        return payload
+
+
+class ReplayFootballAPIService(FootballAPIService):
+    """
+    Odtwarza nagrane (lub syntetyczne) odpowiedzi - bez sieci, bez limitu zapytań i bez opóźnień.
+    Zapytania o okno dat (`from`/`to`) i o listę `ids` są obsługiwane na podstawie nagranego terminarza.
+    """
+
+    def __init__(self, store, **kwargs):
+        kwargs['use_cache'] = False
+        super().__init__(**kwargs)
+        self.store = store
+
+    def _lookup(self, endpoint, params):
+        payload = self.store.get(endpoint, params)
+        if payload is not None or endpoint != 'fixtures':
+            return payload
+
+        if 'ids' in params:
+            return self.store.find_fixtures(int(i) for i in str(params['ids']).split('-'))
+        if 'from' in params:
+            season_fixtures = self.store.get('fixtures', {'league': params['league'], 'season': params['season']})
+            if season_fixtures is None:
+                return None
+            date_from = datetime.fromisoformat(params['from']).date()
+            date_to = datetime.fromisoformat(params['to']).date()
+            return [f for f in season_fixtures
+                    if date_from <= parse_match_date(f['fixture']['date']).date() <= date_to]
+        return None
+
+    def _fetch(self, endpoint, params, conditional_headers=None):
+        payload = self._lookup(endpoint, params)
+        if payload is None:
+            raise FootballAPIError(f"Brak nagranej odpowiedzi dla {endpoint} {params}")
+        metrics.record_request(endpoint, 0.0, status_code=200)
+        if conditional_headers is not None:
+            return payload, {}
+        return payload
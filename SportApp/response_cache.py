@@ -0,0 +1,253 @@
+# SportApp/response_cache.py
+import hashlib
+import json
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from .dynamic_fields import FIELDS_PARAM, EXPAND_PARAM
+from .models import League, Season
+
+CACHE_ALIAS = 'api_responses'
+# Wersja "wszystkiego" - dla list bez filtra sezonu/ligi i szczegółów; podbijana przy każdej zmianie
+ALL_SCOPE = 'all'
+# Zmiany przekrojowe (np. nazwa drużyny widoczna w wielu ligach) - unieważniają cały cache
+EPOCH_SCOPE = 'epoch'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'version:{scope}'
+
+
+def scope_versions(scopes):
+    """
+    Bieżące wersje zakresów (np. 'season:12'). Wersja to znacznik czasu (ns) ostatniej zmiany - wpis usunięty
+    z cache (limit wpisów) dostaje nowy znacznik, więc stare odpowiedzi nigdy nie wracają.
+    """
+    cache = _cache()
+    keys = {_version_key(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        token = time.time_ns()
+        found[key] = token if cache.add(key, token, timeout=None) else cache.get(key, token)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate_responses(season_ids=(), league_ids=(), everything=False):
+    """
+    Podbija wersje zakresów po zapisie: sezonu (i jego ligi), ligi (i wszystkich jej sezonów) oraz ALL_SCOPE
+    (zawsze). W transakcji - dopiero po commicie, inaczej równoległe zapytanie mogłoby zapisać stare dane
+    pod nową wersją.
+    """
+    season_ids, league_ids = set(season_ids), set(league_ids)
+
+    def bump():
+        leagues, seasons = set(league_ids), set(season_ids)
+        if season_ids:
+            leagues |= set(Season.objects.filter(id__in=season_ids).values_list('league_id', flat=True))
+        if league_ids:
+            seasons |= set(Season.objects.filter(league_id__in=league_ids).values_list('id', flat=True))
+        scopes = [ALL_SCOPE] + [f'season:{i}' for i in seasons] + [f'league:{i}' for i in leagues]
+        if everything:
+            scopes.append(EPOCH_SCOPE)
+        token = time.time_ns()
+        _cache().set_many({_version_key(scope): token for scope in scopes}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+class ResponseCacheStats:
+    """Trafienia, chybienia, odpowiedzi 304 i zaoszczędzony czas per widok (thread-safe, jedna instancja na proces)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = timezone.now()
+            self._views = {}
+
+    def _view(self, name):
+        if name not in self._views:
+            self._views[name] = {'hits': 0, 'misses': 0, 'not_modified': 0, 'seconds_saved': 0.0,
+                                 'miss_seconds': 0.0}
+        return self._views[name]
+
+    def record_hit(self, name, saved):
+        with self._lock:
+            stats = self._view(name)
+            stats['hits'] += 1
+            stats['seconds_saved'] += max(saved, 0.0)
+
+    def record_miss(self, name, seconds):
+        with self._lock:
+            stats = self._view(name)
+            stats['misses'] += 1
+            stats['miss_seconds'] += seconds
+
+    def record_not_modified(self, name):
+        with self._lock:
+            self._view(name)['not_modified'] += 1
+
+    def report(self):
+        with self._lock:
+            views = {}
+            for name, stats in sorted(self._views.items()):
+                lookups = stats['hits'] + stats['misses']
+                views[name] = {
+                    **stats,
+                    'hit_ratio': round(stats['hits'] / lookups, 4) if lookups else None,
+                    'seconds_saved': round(stats['seconds_saved'], 4),
+                    'miss_seconds': round(stats['miss_seconds'], 4),
+                }
+            hits = sum(v['hits'] for v in views.values())
+            lookups = hits + sum(v['misses'] for v in views.values())
+            return {
+                'started_at': self.started_at.isoformat(),
+                'generated_at': timezone.now().isoformat(),
+                'backend': settings.CACHES[CACHE_ALIAS]['BACKEND'],
+                'enabled': settings.API_RESPONSE_CACHE_ENABLED,
+                'hits': hits,
+                'lookups': lookups,
+                'hit_ratio': round(hits / lookups, 4) if lookups else None,
+                'not_modified': sum(v['not_modified'] for v in views.values()),
+                'seconds_saved': round(sum(v['seconds_saved'] for v in views.values()), 4),
+                'views': views,
+            }
+
+
+stats = ResponseCacheStats()
+
+
+def _normalized_query(request):
+    """Parametry zapytania niezależnie od kolejności (także pól w ?fields= / ?expand=)."""
+    items = []
+    for name in sorted(request.query_params):
+        for value in sorted(request.query_params.getlist(name)):
+            if name in (FIELDS_PARAM, EXPAND_PARAM):
+                value = ','.join(sorted(part.strip() for part in value.split(',') if part.strip()))
+            items.append((name, value))
+    return items
+
+
+class CachedResponseMixin:
+    """
+    Cache list i szczegółów (odpowiedź JSON po sprawdzeniu uprawnień) w backendzie CACHES['api_responses'].
+    Klucz: host + ścieżka + znormalizowane parametry + wersje zakresów - ?season=X / ?league=X zależą tylko
+    od swojego sezonu / ligi, pozostałe zapytania od ALL_SCOPE. Silny ETag (skrót treści) i Last-Modified
+    (czas ostatniej zmiany zakresu) pozwalają klientowi dostać 304 bez treści.
+    Zapisy przez API podbijają wersje zakresów zmienionego obiektu (invalidate_responses).
+    """
+    # parametr zapytania -> rodzaj zakresu wersji
+    cache_scope_params = {'season': 'season', 'league': 'league'}
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cache_scopes(self, request):
+        scopes = [
+            f'{kind}:{request.query_params[param]}' for param, kind in self.cache_scope_params.items()
+            if request.query_params.get(param, '').isdigit()
+        ]
+        return [EPOCH_SCOPE] + (scopes or [ALL_SCOPE])
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.API_RESPONSE_CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+        started = time.perf_counter()
+        name = f'{self.basename}-{self.action}'
+        versions = scope_versions(self.cache_scopes(request))
+        key = 'response:' + hashlib.sha256(json.dumps([
+            request.get_host(), request.path, _normalized_query(request), sorted(versions.items()),
+        ]).encode()).hexdigest()
+        cache = _cache()
+        entry = cache.get(key)
+
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = JSONRenderer().render(response.data)
+            entry = {
+                'body': body,
+                'etag': '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+                'last_modified': max(versions.values()) // 10 ** 9,
+                'seconds': time.perf_counter() - started,
+            }
+            cache.set(key, entry)
+            stats.record_miss(name, entry['seconds'])
+            state = 'MISS'
+        else:
+            stats.record_hit(name, entry['seconds'] - (time.perf_counter() - started))
+            state = 'HIT'
+
+        if self._not_modified(request, entry):
+            stats.record_not_modified(name)
+            response = HttpResponse(status=304)
+        elif request.accepted_renderer.format == 'json':
+            # Gotowy JSON z cache - bez serializacji i renderowania
+            response = HttpResponse(entry['body'], content_type='application/json')
+        else:
+            # Np. przeglądarkowe API DRF - renderowane z danych
+            response = Response(json.loads(entry['body']))
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        # Przeglądarka może trzymać odpowiedź, ale zawsze pyta o aktualność (If-None-Match -> 304)
+        response['Cache-Control'] = 'private, no-cache'
+        response['X-Cache'] = state
+        return response
+
+    @staticmethod
+    def _not_modified(request, entry):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return entry['etag'] in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return since is not None and entry['last_modified'] <= since
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.invalidate_cache(serializer.instance)
+
+    def perform_update(self, serializer):
+        previous = self.invalidation_scopes(serializer.instance)
+        super().perform_update(serializer)
+        # Obiekt przepięty do innego sezonu / ligi - nieaktualne są oba zakresy
+        season_ids, league_ids = self.invalidation_scopes(serializer.instance)
+        invalidate_responses(season_ids | previous[0], league_ids | previous[1])
+
+    def perform_destroy(self, instance):
+        season_ids, league_ids = self.invalidation_scopes(instance)
+        super().perform_destroy(instance)
+        invalidate_responses(season_ids, league_ids)
+
+    def invalidate_cache(self, instance):
+        invalidate_responses(*self.invalidation_scopes(instance))
+
+    @staticmethod
+    def invalidation_scopes(instance):
+        """(sezony, ligi), do których należy obiekt: Season i League po kluczu, reszta po season_id / league_id."""
+        season_ids, league_ids = set(), set()
+        if isinstance(instance, Season):
+            season_ids.add(instance.pk)
+        elif getattr(instance, 'season_id', None) is not None:
+            season_ids.add(instance.season_id)
+        if isinstance(instance, League):
+            league_ids.add(instance.pk)
+        elif getattr(instance, 'league_id', None) is not None:
+            league_ids.add(instance.league_id)
+        return season_ids, league_ids
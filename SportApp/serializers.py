@@ -1,6 +1,12 @@
+from django.db.models import Avg, Count
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
-from .models import User, League, Season, Team, Match, Standing, TopScorer, MatchRating
+from .dynamic_fields import DynamicFieldsMixin, ExpandableField
+from .models import (
+    User, League, Season, Team, Match, MatchAnalytics, Standing, TopScorer, MatchRating, TeamForm, TeamSeasonStats,
+    SeasonSimulation, TeamStrengthModel, TeamEloRating, EloRatingHistory,
+)
+from .team_stats import averages, combine
 
 # 1. USER
 class UserSerializer(serializers.ModelSerializer):
@@ -11,37 +17,65 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 # 2. LIGA
-class LeagueSerializer(serializers.ModelSerializer):
+class LeagueSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = League
         fields = '__all__'
+        expandable_fields = {
+            'seasons': ExpandableField('SportApp.serializers.SeasonSerializer', source='season_set', many=True),
+            'teams': ExpandableField('SportApp.serializers.MatchTeamSerializer', many=True),
+        }
 
 
 # 3. SEZON
 # serializers.py
 
-class SeasonSerializer(serializers.ModelSerializer):
+class SeasonSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
 
     class Meta:
         model = Season
         fields = ['id', 'name', 'year', 'is_current', 'league']
+        # str(season) zawiera nazwę ligi
+        field_sources = {'name': ['league', 'year']}
+        expandable_fields = {'league': ExpandableField(LeagueSerializer)}
 
     @extend_schema_field(str)
     def get_name(self, obj):
         return str(obj)
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Team
         fields = ['id', 'name', 'logo', 'league', 'venue_city'] # Dodałem 'league'
+        expandable_fields = {'league': ExpandableField(LeagueSerializer)}
 
 # 6. MECZ (Najważniejszy!)
-class MatchSerializer(serializers.ModelSerializer):
+class MatchRatingsSummarySerializer(serializers.Serializer):
+    """Średnia i liczba ocen użytkowników - z adnotacji zapytania (?expand=ratings_summary)."""
+    average = serializers.FloatField(source='ratings_average', allow_null=True)
+    count = serializers.IntegerField(source='ratings_count')
+
+
+MATCH_RATINGS_SUMMARY = ExpandableField(
+    MatchRatingsSummarySerializer, source='*',
+    annotations={'ratings_average': Avg('ratings__rating'), 'ratings_count': Count('ratings')},
+)
+
+
+class MatchSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Match
         fields = '__all__'
+        # ?expand= zamienia ID na obiekty (pobierane tym samym zapytaniem)
+        expandable_fields = {
+            'home_team': ExpandableField('SportApp.serializers.MatchTeamSerializer'),
+            'away_team': ExpandableField('SportApp.serializers.MatchTeamSerializer'),
+            'season': ExpandableField('SportApp.serializers.MatchSeasonSerializer'),
+            'analytics': ExpandableField('SportApp.serializers.MatchAnalyticsSummarySerializer'),
+            'ratings_summary': MATCH_RATINGS_SUMMARY,
+        }
         # Trik dla Reacta: depth = 1
         # Dzięki temu zamiast "home_team": 5, dostaniesz pełny obiekt:
         # "home_team": { "id": 5, "name": "Real Madryt", "logo": "..." }
@@ -53,8 +87,44 @@ class MatchSerializer(serializers.ModelSerializer):
 # to zazwyczaj tworzy się osobny "MatchCreateSerializer" bez depth=1.
 # Ale na start ten powyżej wystarczy (przy zapisie Django DRF jest sprytne i obsłuży ID).
 
+
+# 6a. MECZ NA LIŚCIE - bez ~30 kolumn statystyk, drużyny i sezon osadzone (pełne dane: /api/matches/<id>/)
+class MatchTeamSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Team
+        fields = ['id', 'name', 'logo']
+
+
+class MatchSeasonSerializer(serializers.ModelSerializer):
+    league_name = serializers.CharField(source='league.name', read_only=True)
+
+    class Meta:
+        model = Season
+        fields = ['id', 'year', 'league', 'league_name']
+
+
+class MatchAnalyticsSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MatchAnalytics
+        fields = ['hype_score', 'defense_score', 'tactical_score', 'aggression_score']
+
+
+class MatchListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """JOIN-y drużyn, sezonu z ligą i analytics (bez N+1) dodaje do zapytania DynamicFieldsViewSetMixin."""
+    home_team = MatchTeamSerializer(read_only=True)
+    away_team = MatchTeamSerializer(read_only=True)
+    season = MatchSeasonSerializer(read_only=True)
+    # null, jeśli mecz nie ma jeszcze analizy
+    analytics = MatchAnalyticsSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Match
+        fields = ['id', 'date', 'status', 'round', 'season', 'home_team', 'away_team',
+                  'home_score', 'away_score', 'analytics']
+        expandable_fields = {'ratings_summary': MATCH_RATINGS_SUMMARY}
+
 # 7. TABELA
-class StandingSerializer(serializers.ModelSerializer):
+class StandingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Chcemy widzieć nazwę drużyny w tabeli
     team_name = serializers.CharField(source='team.name', read_only=True)
     team_logo = serializers.URLField(source='team.logo', read_only=True)
@@ -62,10 +132,14 @@ class StandingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Standing
         fields = '__all__'
+        expandable_fields = {
+            'team': ExpandableField(TeamSerializer),
+            'season': ExpandableField(SeasonSerializer),
+        }
 
 
 # 8. KRÓL STRZELCÓW
-class TopScorerSerializer(serializers.ModelSerializer):
+class TopScorerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     player_name = serializers.CharField(source='player.name', read_only=True)
     team_name = serializers.CharField(source='team.name', read_only=True)
 
@@ -75,22 +149,96 @@ class TopScorerSerializer(serializers.ModelSerializer):
 
 
 # 9. OCENY MECZU
-class MatchRatingSerializer(serializers.ModelSerializer):
+class MatchRatingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
 
     class Meta:
         model = MatchRating
         fields = '__all__'
+        expandable_fields = {'match': ExpandableField(MatchListSerializer)}
         # Ważne: User nie powinien sam wpisywać swojego ID.
         # Backend sam to ustawi na podstawie tokena.
         read_only_fields = ['user']
 
 
+# 10. FORMA DRUŻYNY (ostatnie zakończone mecze, od najnowszego)
+class TeamFormSerializer(serializers.ModelSerializer):
+    team_name = serializers.CharField(source='team.name', read_only=True)
+    results = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = TeamForm
+        fields = ['team', 'team_name', 'results', 'matches', 'updated_at']
+
+
+# 11. STATYSTYKI DRUŻYNY W SEZONIE (u siebie / na wyjeździe / łącznie)
+class TeamSeasonStatsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    team_name = serializers.CharField(source='team.name', read_only=True)
+    averages = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TeamSeasonStats
+        fields = '__all__'
+        field_sources = {'averages': ['home_stats', 'away_stats']}
+
+    @extend_schema_field(dict)
+    def get_averages(self, obj):
+        """Średnie na mecz: {"home": {...}, "away": {...}, "all": {...}}."""
+        return {
+            'home': averages(obj.home_stats),
+            'away': averages(obj.away_stats),
+            'all': averages(combine(obj.home_stats, obj.away_stats)),
+        }
+
+
+# 12. SYMULACJA SEZONU (rozkład miejsc w tabeli końcowej)
+class SeasonSimulationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeasonSimulation
+        fields = ['season', 'simulations', 'remaining_matches', 'seconds', 'computed_at', 'results']
+
+
+# 13. MODEL SIŁY DRUŻYN (Dixon-Coles) I PROGNOZA MECZU
+class TeamStrengthModelSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TeamStrengthModel
+        fields = '__all__'
+
+
+class MatchPredictionSerializer(serializers.Serializer):
+    home_team = serializers.IntegerField()
+    away_team = serializers.IntegerField()
+    home_win = serializers.FloatField()
+    draw = serializers.FloatField()
+    away_win = serializers.FloatField()
+    expected_goals = serializers.DictField(child=serializers.FloatField())
+    scorelines = serializers.ListField(child=serializers.DictField())
+
+
+# 14. RANKING ELO (bieżący i historia)
+class TeamEloRatingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    team_name = serializers.CharField(source='team.name', read_only=True)
+
+    class Meta:
+        model = TeamEloRating
+        fields = ['team', 'team_name', 'rating', 'matches', 'last_match', 'last_match_date', 'updated_at']
+
+
+class EloRatingHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EloRatingHistory
+        fields = ['match', 'season', 'date', 'rating_before', 'rating_after']
+
+
 from rest_framework import serializers
 from django.contrib.auth.models import Group
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
+from .authentication import ROLES_CLAIM, RoleRefreshToken
+from .permissions import load_roles
 
 User = get_user_model()
 
@@ -133,8 +281,11 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
 
         # Opcjonalnie: Możesz dodać dane do wnętrza zaszyfrowanego tokena
+        roles = load_roles(user.pk)
         token['username'] = user.username
-        token['is_admin'] = user.groups.filter(name='Admin').exists()
+        token['is_admin'] = 'Admin' in roles
+        # Role podpisane w tokenie - odczyty API sprawdzają uprawnienia bez bazy (RoleClaimsAuthentication)
+        token[ROLES_CLAIM] = sorted(roles)
 
         return token
 
@@ -150,6 +301,21 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+# Odświeżenie tokenu czyta role z bazy - zmiana grup nie czeka na wygaśnięcie refresh tokenu
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RoleRefreshToken
+
+    def validate(self, attrs):
+        # Usunięty lub zablokowany (is_active=False) użytkownik nie dostaje nowego tokenu - 401, nie błąd serwera
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        return super().validate(attrs)
+
+
 # --- WYLOGOWANIE (JWT) ---
 class LogoutSerializer(serializers.Serializer):
     refresh = serializers.CharField()
@@ -1,26 +1,289 @@
+import logging
+import random
 import requests
+import threading
 import time
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .api_cache import get_response_cache
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def statistics_settled_at(played_at):
+    """Od kiedy statystyki meczu uznajemy za ostateczne (wcześniej bywają niepełne)."""
+    return played_at + timedelta(hours=settings.API_FOOTBALL_STATISTICS_SETTLE_HOURS)
+
+
+class RateLimiter:
+    """
+    Token bucket z dwoma limitami: na minutę (uzupełniany płynnie) i na dobę.
+    Jedna instancja jest współdzielona przez wszystkie wątki procesu,
+    a budżet koryguje się na podstawie nagłówków X-RateLimit-* z API.
+    """
+
+    def __init__(self, per_minute, per_day=None):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self._tokens = float(per_minute)
+        self._last_refill = time.monotonic()
+        self._day = self._today()
+        self._day_remaining = per_day
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today():
+        return datetime.now(dt_timezone.utc).date()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(float(self.per_minute), self._tokens + elapsed * self.per_minute / 60.0)
+        self._last_refill = now
+
+        # Limit dzienny API-Football resetuje się o północy UTC
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._day_remaining = self.per_day
+
+    def acquire(self):
+        """Blokuje wątek do momentu, aż w kubełku pojawi się token. Zwraca False, gdy limit dzienny się wyczerpał."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._day_remaining is not None and self._day_remaining <= 0:
+                    return False
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    if self._day_remaining is not None:
+                        self._day_remaining -= 1
+                    return True
+                wait = (1 - self._tokens) * 60.0 / self.per_minute
+            time.sleep(wait)
+
+    def update_from_headers(self, headers):
+        """Dostosowuje budżet do tego, co faktycznie raportuje API."""
+        minute_limit = _int_header(headers, 'X-RateLimit-Limit')
+        minute_remaining = _int_header(headers, 'X-RateLimit-Remaining')
+        day_limit = _int_header(headers, 'x-ratelimit-requests-limit')
+        day_remaining = _int_header(headers, 'x-ratelimit-requests-remaining')
+
+        with self._lock:
+            if minute_limit:
+                self.per_minute = minute_limit
+            if minute_remaining is not None:
+                # Inne procesy mogły zużyć część limitu - nigdy nie ufamy sobie bardziej niż API
+                self._tokens = min(self._tokens, float(minute_remaining))
+            if day_limit:
+                self.per_day = day_limit
+            if day_remaining is not None:
+                self._day_remaining = day_remaining
+
+    @property
+    def day_remaining(self):
+        return self._day_remaining
+
+
+class FootballAPIError(Exception):
+    """
+    Zapytanie do API nie powiodło się (po wyczerpaniu ponowień lub limitu dziennego).
+    Pozwala odróżnić "API nie ma danych" (pusta lista) od "nie udało się ich pobrać".
+    """
+
+
+class QuotaExhaustedError(FootballAPIError):
+    """Wyczerpano dzienny limit zapytań - kolejne próby dziś nie mają sensu."""
+
+
+def _int_header(headers, name):
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _RetryableResponse(Exception):
+    """Opakowanie odpowiedzi 429/5xx, żeby kolejna próba mogła odczytać Retry-After."""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.headers = response.headers
+
+
+# Znacznik odpowiedzi 304 Not Modified (rewalidacja wpisu w cache)
+_NOT_MODIFIED = object()
+
+_shared_rate_limiter = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Zwraca limiter wspólny dla całego procesu (jeden budżet API dla wszystkich komend i wątków)."""
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter(
+                per_minute=settings.API_FOOTBALL_REQUESTS_PER_MINUTE,
+                per_day=settings.API_FOOTBALL_REQUESTS_PER_DAY,
+            )
+        return _shared_rate_limiter
+
 
 class FootballAPIService:
     BASE_URL = "https://v3.football.api-sports.io"
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-    def __init__(self):
+    def __init__(self, rate_limiter=None, max_workers=None, use_cache=True):
         self.headers = {
             "x-rapidapi-key": settings.API_FOOTBALL_KEY,
             "x-rapidapi-host": settings.API_FOOTBALL_HOST
         }
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.max_workers = max_workers or settings.API_FOOTBALL_MAX_WORKERS
+        self.timeout = (settings.API_FOOTBALL_CONNECT_TIMEOUT, settings.API_FOOTBALL_READ_TIMEOUT)
+        self.max_retries = settings.API_FOOTBALL_MAX_RETRIES
+        self.session = self._build_session()
+        self.cache = get_response_cache() if use_cache else None
 
-    def _get(self, endpoint, params):
+    def _build_session(self):
+        """Sesja z pulą połączeń keep-alive - jeden handshake TCP+TLS na połączenie, a nie na zapytanie."""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        pool_size = settings.API_FOOTBALL_POOL_SIZE or self.max_workers
+        # Ponowienia obsługujemy sami (limiter + backoff), więc adapter ich nie robi
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """Wykładniczy backoff z jitterem ("equal jitter"); nagłówek Retry-After ma pierwszeństwo."""
+        if retry_after is not None:
+            return retry_after
+        delay = min(settings.API_FOOTBALL_BACKOFF_MAX, settings.API_FOOTBALL_BACKOFF_BASE * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _get(self, endpoint, params, use_cache=True):
+        """Zwraca pole `response` z API, korzystając z cache tam, gdzie endpoint ma ustawiony TTL."""
+        if not use_cache or self.cache is None or not self.cache.is_cacheable(endpoint):
+            return self._fetch(endpoint, params)
+
+        entry = self.cache.get(endpoint, params)
+        if entry is not None and entry.fresh:
+            metrics.record_cache_hit(endpoint)
+            return entry.payload
+
+        # Rewalidacja warunkowa - przy 304 nie pobieramy treści ponownie
+        conditional_headers = {}
+        if entry is not None:
+            if entry.etag:
+                conditional_headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                conditional_headers['If-Modified-Since'] = entry.last_modified
+
+        result = self._fetch(endpoint, params, conditional_headers)
+        if result is _NOT_MODIFIED:
+            self.cache.touch(endpoint, params)
+            return entry.payload
+
+        payload, response_headers = result
+        # Pustych odpowiedzi nie zapamiętujemy - np. statystyki meczu mogą pojawić się później
+        if payload:
+            self.cache.set(endpoint, params, payload,
+                           etag=response_headers.get('ETag'),
+                           last_modified=response_headers.get('Last-Modified'))
+        return payload
+
+    def _fetch(self, endpoint, params, conditional_headers=None):
+        """
+        Wykonuje zapytanie z ponowieniami. Bez nagłówków warunkowych zwraca listę `response`,
+        z nimi - krotkę (response, nagłówki) albo _NOT_MODIFIED przy odpowiedzi 304.
+        """
         url = f"{self.BASE_URL}/{endpoint}"
-        try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            time.sleep(7)
-            return response.json().get('response', [])
-        except requests.RequestException as e:
-            print(f"Błąd API ({endpoint}): {e}")
-            return []
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                retry_after = _int_header(getattr(last_error, 'headers', None) or {}, 'Retry-After')
+                time.sleep(self._backoff_delay(attempt - 1, retry_after))
+
+            if not self.rate_limiter.acquire():
+                raise QuotaExhaustedError(f"Błąd API ({endpoint}): wyczerpano dzienny limit zapytań")
+
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, headers=conditional_headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.record_request(endpoint, time.monotonic() - started, error=True)
+                last_error = e
+                logger.warning("Błąd połączenia z API (%s), próba %d: %s", endpoint, attempt + 1, e)
+                continue
+
+            metrics.record_request(
+                endpoint, time.monotonic() - started,
+                size=len(response.content),
+                status_code=response.status_code,
+                error=response.status_code >= 400,
+            )
+            self.rate_limiter.update_from_headers(response.headers)
+            metrics.record_quota(
+                day_limit=_int_header(response.headers, 'x-ratelimit-requests-limit'),
+                day_remaining=_int_header(response.headers, 'x-ratelimit-requests-remaining'),
+                minute_limit=_int_header(response.headers, 'X-RateLimit-Limit'),
+                minute_remaining=_int_header(response.headers, 'X-RateLimit-Remaining'),
+            )
+
+            if conditional_headers is not None and response.status_code == 304:
+                return _NOT_MODIFIED
+
+            if response.status_code in self.RETRY_STATUSES:
+                last_error = _RetryableResponse(response)
+                logger.warning("API zwróciło %s (%s), próba %d", response.status_code, endpoint, attempt + 1)
+                continue
+
+            try:
+                response.raise_for_status()
+                payload = response.json()
+            except (requests.RequestException, ValueError) as e:
+                raise FootballAPIError(f"Błąd API ({endpoint}): {e}") from e
+
+            # API-Football zgłasza część błędów (np. rateLimit) kodem 200 i polem "errors"
+            errors = payload.get('errors')
+            if errors:
+                if isinstance(errors, dict) and 'rateLimit' in errors:
+                    last_error = _RetryableResponse(response)
+                    logger.warning("API zgłosiło przekroczenie limitu (%s), próba %d", endpoint, attempt + 1)
+                    continue
+                raise FootballAPIError(f"Błąd API ({endpoint}): {errors}")
+
+            if conditional_headers is not None:
+                return payload.get('response', []), response.headers
+            return payload.get('response', [])
+
+        raise FootballAPIError(f"Błąd API ({endpoint}): brak odpowiedzi po {self.max_retries + 1} próbach ({last_error})")
+
+    def fetch_concurrently(self, func, arguments, return_exceptions=False):
+        """
+        Wywołuje func(*args) dla każdego elementu z `arguments` w puli wątków.
+        Wyniki zwracane są leniwie, w kolejności argumentów. Tempo wyznacza limiter, nie sleep.
+        Z return_exceptions=True błąd FootballAPIError jest zwracany jako wynik zamiast przerywać całość.
+        """
+        def call(args):
+            try:
+                return func(*args)
+            except FootballAPIError as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            yield from pool.map(call, arguments)
 
     def get_league_info(self, league_id):
         return self._get("leagues", {'id': league_id})
@@ -37,5 +300,59 @@ class FootballAPIService:
     def get_top_scorers(self, league_id, season):
         return self._get("players/topscorers", {'league': league_id, 'season': season})
 
-    def get_fixture_statistics(self, fixture_id):
-        return self._get("fixtures/statistics", {'fixture': fixture_id})
\ No newline at end of file
+    def get_fixture_statistics(self, fixture_id, played_at=None):
+        """Statystyki meczu sprzed statistics_settled_at mogą być niepełne - pobierane z pominięciem cache."""
+        settled = played_at is None or statistics_settled_at(played_at) <= datetime.now(dt_timezone.utc)
+        return self._get("fixtures/statistics", {'fixture': fixture_id}, use_cache=settled)
+
+    # --- Zapytania o dane "na żywo" - zawsze z API, z pominięciem cache ---
+
+    def get_fixtures_between(self, league_id, season, date_from, date_to):
+        return self._fetch("fixtures", {
+            'league': league_id,
+            'season': season,
+            'from': date_from.isoformat(),
+            'to': date_to.isoformat(),
+        })
+
+    def get_fixtures_by_ids(self, fixture_ids):
+        """Pobiera konkretne mecze; API przyjmuje maksymalnie 20 identyfikatorów w jednym zapytaniu."""
+        fixture_ids = list(fixture_ids)
+        chunks = [fixture_ids[i:i + 20] for i in range(0, len(fixture_ids), 20)]
+        results = self.fetch_concurrently(
+            lambda ids: self._fetch("fixtures", {'ids': '-'.join(str(i) for i in ids)}),
+            [(chunk,) for chunk in chunks]
+        )
+        return [item for chunk_result in results for item in chunk_result]
+
+    def get_season_data(self, league_id, season):
+        """Pobiera równolegle wszystkie dane potrzebne do pełnej synchronizacji sezonu ligi."""
+        calls = {
+            'league': (self.get_league_info, (league_id,)),
+            'teams': (self.get_teams, (league_id, season)),
+            'fixtures': (self.get_fixtures, (league_id, season)),
+            'standings': (self.get_standings, (league_id, season)),
+            'top_scorers': (self.get_top_scorers, (league_id, season)),
+        }
+        results = self.fetch_concurrently(lambda func, args: func(*args), calls.values())
+        return dict(zip(calls, results))
+
+
+def get_football_service(**kwargs):
+    """
+    Klient API zgodny z API_FOOTBALL_MODE:
+      - live   - zwykłe zapytania do API,
+      - record - zapytania do API z zapisem odpowiedzi w API_FOOTBALL_REPLAY_DIR,
+      - replay - odtwarzanie nagrań z API_FOOTBALL_REPLAY_DIR bez sieci i bez zużywania limitu.
+    """
+    mode = settings.API_FOOTBALL_MODE
+    if mode == 'live':
+        return FootballAPIService(**kwargs)
+
+    from .replay import DirectoryStore, RecordingFootballAPIService, ReplayFootballAPIService
+    store = DirectoryStore(settings.API_FOOTBALL_REPLAY_DIR)
+    if mode == 'record':
+        return RecordingFootballAPIService(store, **kwargs)
+    if mode == 'replay':
+        return ReplayFootballAPIService(store, **kwargs)
+    raise ImproperlyConfigured(f"Nieznany API_FOOTBALL_MODE: {mode!r} (dozwolone: live, record, replay)")
@@ -0,0 +1,135 @@
+# SportApp/simulation.py
+import time
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from .models import Match, Season, Standing, TeamSeasonStats, SeasonSimulation, TeamStrengthModel
+from .montecarlo import SeasonState, simulate
+from .strength import team_parameters
+
+# Mecze do rozegrania: zaplanowane, trwające (tabela liczy tylko zakończone) i przełożone
+REMAINING_STATUSES = ['Scheduled', 'In Play', 'Postponed']
+# Siła drużyny "ściągana" do średniej ligi jak gdyby rozegrała tyle przeciętnych meczów - stabilizuje początek sezonu
+PRIOR_MATCHES = 5
+DEFAULT_HOME_GOALS = 1.5
+DEFAULT_AWAY_GOALS = 1.2
+
+
+def _table(season):
+    """Aktualna tabela: (team_id, nazwa, punkty, różnica bramek, bramki zdobyte), z Standing albo z TeamSeasonStats."""
+    standings = Standing.objects.filter(season=season).select_related('team')
+    if standings.exists():
+        return [(s.team_id, s.team.name, s.points, s.goals_diff, s.goals_for) for s in standings]
+    rows = []
+    for s in TeamSeasonStats.objects.filter(season=season).select_related('team'):
+        points = 3 * (s.home_win + s.away_win) + s.home_draw + s.away_draw
+        goals_for = s.home_goals_for + s.away_goals_for
+        rows.append((s.team_id, s.team.name, points, goals_for - s.home_goals_against - s.away_goals_against, goals_for))
+    return rows
+
+
+def estimate_strengths(season, team_ids):
+    """
+    Siła ataku i obrony (1.0 = średnia ligi) z bramek w zakończonych meczach sezonu oraz średnie gole
+    gospodarzy i gości. Oczekiwane gole gospodarza: home_goals * atak_gospodarza * obrona_gościa.
+    """
+    stats = {s.team_id: s for s in TeamSeasonStats.objects.filter(season=season, team_id__in=team_ids)}
+    played = np.array([(s.home_played + s.away_played) if s else 0 for s in map(stats.get, team_ids)], float)
+    scored = np.array([(s.home_goals_for + s.away_goals_for) if s else 0 for s in map(stats.get, team_ids)], float)
+    conceded = np.array(
+        [(s.home_goals_against + s.away_goals_against) if s else 0 for s in map(stats.get, team_ids)], float
+    )
+
+    home_played = sum(s.home_played for s in stats.values())
+    away_played = sum(s.away_played for s in stats.values())
+    home_goals = sum(s.home_goals_for for s in stats.values()) / home_played if home_played else DEFAULT_HOME_GOALS
+    away_goals = sum(s.away_goals_for for s in stats.values()) / away_played if away_played else DEFAULT_AWAY_GOALS
+    average = (home_goals + away_goals) / 2
+
+    attack = (scored + PRIOR_MATCHES * average) / (played + PRIOR_MATCHES) / average
+    defense = (conceded + PRIOR_MATCHES * average) / (played + PRIOR_MATCHES) / average
+    return attack, defense, home_goals, away_goals
+
+
+def season_state(season):
+    """Tabela i pozostałe mecze sezonu jako tablice dla silnika; zwraca (drużyny, stan)."""
+    table = _table(season)
+    team_ids = [row[0] for row in table]
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    fixtures = [
+        (index[home_id], index[away_id])
+        for home_id, away_id in Match.objects.filter(season=season, status__in=REMAINING_STATUSES).values_list(
+            'home_team_id', 'away_team_id'
+        )
+        if home_id in index and away_id in index
+    ]
+    home_idx = np.array([h for h, _ in fixtures], dtype=np.intp)
+    away_idx = np.array([a for _, a in fixtures], dtype=np.intp)
+
+    # Oczekiwane gole z modelu Dixona-Colesa sezonu, jeśli jest dopasowany; inaczej proste ilorazy bramek
+    model = TeamStrengthModel.objects.filter(season=season).first()
+    if model is not None:
+        attack, defense = team_parameters(model, team_ids)
+        lam_home = np.exp(model.home_advantage + attack[home_idx] - defense[away_idx])
+        lam_away = np.exp(attack[away_idx] - defense[home_idx])
+    else:
+        attack, defense, home_goals, away_goals = estimate_strengths(season, team_ids)
+        lam_home = home_goals * attack[home_idx] * defense[away_idx]
+        lam_away = away_goals * attack[away_idx] * defense[home_idx]
+    state = SeasonState(
+        points=np.array([row[2] for row in table], float),
+        goal_diff=np.array([row[3] for row in table], float),
+        goals_for=np.array([row[4] for row in table], float),
+        home_idx=home_idx,
+        away_idx=away_idx,
+        lam_home=lam_home,
+        lam_away=lam_away,
+    )
+    return table, state
+
+
+def simulate_season(season, simulations=None, workers=None, seed=None):
+    """Symuluje resztę sezonu i zapisuje rozkład miejsc (nadpisuje poprzedni wynik)."""
+    simulations = simulations or settings.SEASON_SIMULATION_RUNS
+    workers = workers or settings.SEASON_SIMULATION_WORKERS or None
+    table, state = season_state(season)
+    started = time.perf_counter()
+    result = simulate(state, simulations, workers=workers, seed=seed) if table else None
+    seconds = time.perf_counter() - started
+
+    results = []
+    if result is not None:
+        probabilities = result.position_probabilities
+        expected_position = probabilities @ np.arange(1, state.teams + 1)
+        for i, (team_id, name, points, _, _) in enumerate(table):
+            results.append({
+                'team_id': team_id,
+                'team_name': name,
+                'points': points,
+                'expected_points': round(float(result.expected_points[i]), 2),
+                'expected_position': round(float(expected_position[i]), 2),
+                # positions[p] = prawdopodobieństwo zajęcia miejsca p + 1
+                'positions': [round(float(p), 5) for p in probabilities[i]],
+            })
+        results.sort(key=lambda r: r['expected_position'])
+
+    simulation, _ = SeasonSimulation.objects.update_or_create(season=season, defaults={
+        'simulations': simulations,
+        'remaining_matches': len(state.home_idx),
+        'seconds': seconds,
+        'results': results,
+    })
+    return simulation
+
+
+def resimulate_seasons(season_ids):
+    """
+    Nowe wyniki w sezonach - symulacje liczone od nowa (kolejka przeliczeń, poza żądaniami HTTP): sezony bieżące
+    i te, które już mają wynik. Zwraca liczbę przeliczonych sezonów.
+    """
+    seasons = Season.objects.filter(Q(is_current=True) | Q(simulation__isnull=False), id__in=set(season_ids))
+    count = 0
+    for season in seasons:
+        simulate_season(season)
+        count += 1
+    return count
@@ -0,0 +1,193 @@
+# SportApp/standings.py
+from collections import defaultdict
+from django.db.models import Q
+from django.utils import timezone
+from .metrics import metrics
+from .models import Match, Season, Standing, TeamForm, TeamSeasonStats
+
+STANDING_FIELDS = [
+    'position', 'points', 'form', 'status', 'last_update',
+    'played', 'win', 'draw', 'lose', 'goals_for', 'goals_against', 'goals_diff',
+    'home_played', 'home_win', 'home_draw', 'home_lose', 'home_goals_for', 'home_goals_against',
+    'away_played', 'away_win', 'away_draw', 'away_lose', 'away_goals_for', 'away_goals_against',
+]
+# Pola porównywane przy weryfikacji z tabelą z API (status i last_update są z natury różne)
+TABLE_FIELDS = [f for f in STANDING_FIELDS if f not in ('status', 'last_update')]
+
+FORM_LENGTH = 5
+
+
+class StandingsEngine:
+    """
+    Tabela ligi liczona lokalnie z zakończonych meczów - bez zapytania do API.
+    Dane wejściowe są już utrzymywane przyrostowo: wyniki u siebie / na wyjeździe z TeamSeasonStats,
+    forma z okien TeamForm. Po zmianie jednego wyniku odświeżane są te dwa wiersze, a tutaj tylko
+    ponowne sortowanie ~20 drużyn i zapis zmienionych pozycji.
+
+    Kolejność jak w Premier League: punkty, różnica bramek, bramki zdobyte, punkty w meczach
+    bezpośrednich, bramki zdobyte na wyjeździe w meczach bezpośrednich (dalej - alfabetycznie,
+    w miejsce baraży). Forma: ostatnie wyniki w sezonie, od najnowszego.
+    """
+
+    def __init__(self, season):
+        self.season = season
+
+    def _team_rows(self):
+        stats = TeamSeasonStats.objects.filter(season=self.season).select_related('team')
+        # Jeśli sezon ma tabelę (z API), liczymy tylko jej drużyny - np. w pucharach mecze grają też inne
+        table_teams = set(Standing.objects.filter(season=self.season).values_list('team_id', flat=True))
+        if table_teams:
+            stats = stats.filter(team_id__in=table_teams)
+        return list(stats)
+
+    def _forms(self, rows):
+        """Forma w sezonie z okien TeamForm; drużyny, których okno nie pokrywa sezonu, dociągamy z meczów."""
+        forms = {}
+        windows = dict(TeamForm.objects.filter(team_id__in=[r.team_id for r in rows]).values_list('team_id', 'matches'))
+        missing = []
+        for row in rows:
+            played = row.home_played + row.away_played
+            window = windows.get(row.team_id)
+            entries = [e for e in window or [] if e.get('season') == self.season.id]
+            if window is not None and len(entries) >= min(FORM_LENGTH, played):
+                forms[row.team_id] = ''.join(e['result'] for e in entries[:FORM_LENGTH])
+            else:
+                missing.append(row.team_id)
+
+        if missing:
+            recent = defaultdict(str)
+            matches = Match.objects.filter(
+                Q(home_team_id__in=missing) | Q(away_team_id__in=missing), season=self.season, status='Finished',
+                home_score__isnull=False, away_score__isnull=False,
+            ).order_by('-date', '-id').values_list('home_team_id', 'away_team_id', 'home_score', 'away_score')
+            for home_id, away_id, home_score, away_score in matches:
+                for team_id, goals_for, goals_against in ((home_id, home_score, away_score), (away_id, away_score, home_score)):
+                    if team_id in missing and len(recent[team_id]) < FORM_LENGTH:
+                        recent[team_id] += 'W' if goals_for > goals_against else 'D' if goals_for == goals_against else 'L'
+            forms.update((team_id, recent[team_id]) for team_id in missing)
+        return forms
+
+    def _head_to_head(self, team_ids):
+        """Punkty i bramki zdobyte na wyjeździe w meczach między podanymi drużynami."""
+        points = defaultdict(int)
+        away_goals = defaultdict(int)
+        matches = Match.objects.filter(
+            season=self.season, status='Finished', home_team_id__in=team_ids, away_team_id__in=team_ids
+        ).values_list('home_team_id', 'away_team_id', 'home_score', 'away_score')
+        for home_id, away_id, home_score, away_score in matches:
+            if home_score is None or away_score is None:
+                continue
+            away_goals[away_id] += away_score
+            if home_score > away_score:
+                points[home_id] += 3
+            elif home_score < away_score:
+                points[away_id] += 3
+            else:
+                points[home_id] += 1
+                points[away_id] += 1
+        return points, away_goals
+
+    def compute(self):
+        """Lista niezapisanych obiektów Standing w kolejności tabeli."""
+        rows = self._team_rows()
+        forms = self._forms(rows)
+        now = timezone.now()
+
+        table = []
+        for row in rows:
+            standing = Standing(season=self.season, team_id=row.team_id, form=forms.get(row.team_id) or None,
+                                status='same', last_update=now)
+            standing.team = row.team
+            for side in ('home', 'away'):
+                for field in ('played', 'win', 'draw', 'lose', 'goals_for', 'goals_against'):
+                    setattr(standing, f'{side}_{field}', getattr(row, f'{side}_{field}'))
+            for field in ('played', 'win', 'draw', 'lose', 'goals_for', 'goals_against'):
+                setattr(standing, field, getattr(standing, f'home_{field}') + getattr(standing, f'away_{field}'))
+            standing.goals_diff = standing.goals_for - standing.goals_against
+            standing.points = standing.win * 3 + standing.draw
+            table.append(standing)
+
+        def primary(s):
+            return -s.points, -s.goals_diff, -s.goals_for
+
+        table.sort(key=primary)
+        ordered = []
+        # Remisy na (punkty, różnica, bramki) rozstrzygają mecze bezpośrednie - zwykle kilka drużyn, rzadko
+        start = 0
+        while start < len(table):
+            end = start
+            while end + 1 < len(table) and primary(table[end + 1]) == primary(table[start]):
+                end += 1
+            group = table[start:end + 1]
+            if len(group) > 1:
+                points, away_goals = self._head_to_head([s.team_id for s in group])
+                group.sort(key=lambda s: (-points[s.team_id], -away_goals[s.team_id], s.team.name))
+            ordered.extend(group)
+            start = end + 1
+
+        for position, standing in enumerate(ordered, start=1):
+            standing.position = position
+        return ordered
+
+    def save(self, table):
+        """Zapisuje tylko zmienione wiersze (bulk upsert); status = ruch względem poprzedniej pozycji."""
+        existing = {
+            row[0]: row[1:]
+            for row in Standing.objects.filter(season=self.season).values_list('team_id', *STANDING_FIELDS)
+        }
+        position_index = STANDING_FIELDS.index('position')
+        status_index = STANDING_FIELDS.index('status')
+        compared = [STANDING_FIELDS.index(f) for f in TABLE_FIELDS]
+
+        to_write = []
+        inserted = 0
+        for standing in table:
+            previous = existing.get(standing.team_id)
+            if previous is None:
+                inserted += 1
+            else:
+                if all(previous[i] == getattr(standing, STANDING_FIELDS[i]) for i in compared):
+                    continue
+                old_position = previous[position_index]
+                if standing.position < old_position:
+                    standing.status = 'up'
+                elif standing.position > old_position:
+                    standing.status = 'down'
+                else:
+                    standing.status = previous[status_index]
+            to_write.append(standing)
+
+        Standing.objects.bulk_create(
+            to_write, update_conflicts=True, unique_fields=['season', 'team'], update_fields=STANDING_FIELDS
+        )
+        metrics.record_rows('standings', inserted=inserted, updated=len(to_write) - inserted,
+                            unchanged=len(table) - len(to_write))
+        return len(to_write)
+
+
+def update_standings(season_ids):
+    """Przelicza i zapisuje lokalne tabele wskazanych sezonów; zwraca liczbę zmienionych wierszy."""
+    written = 0
+    for season in Season.objects.filter(id__in=set(season_ids)):
+        engine = StandingsEngine(season)
+        written += engine.save(engine.compute())
+    return written
+
+
+def api_table(standings_resp):
+    """Tabela z odpowiedzi `standings` API: {team_api_id: {pole: wartość}} w układzie pól Standing."""
+    try:
+        rows = standings_resp[0]['league']['standings'][0]
+    except (IndexError, KeyError):
+        return {}
+    table = {}
+    for row in rows:
+        values = {'position': row['rank'], 'points': row['points'], 'form': row['form'],
+                  'goals_diff': row['goalsDiff']}
+        for side, prefix in (('all', ''), ('home', 'home_'), ('away', 'away_')):
+            for field in ('played', 'win', 'draw', 'lose'):
+                values[f'{prefix}{field}'] = row[side][field]
+            values[f'{prefix}goals_for'] = row[side]['goals']['for']
+            values[f'{prefix}goals_against'] = row[side]['goals']['against']
+        table[row['team']['id']] = values
+    return table
@@ -0,0 +1,199 @@
+# SportApp/strength.py
+import time
+from dataclasses import dataclass
+import numpy as np
+from django.conf import settings
+from scipy.optimize import minimize
+from .models import Match, Season, TeamStrengthModel
+
+# Macierz wyników liczona do MAX_GOALS goli każdej drużyny (resztę rozkładu pomijamy i normalizujemy)
+MAX_GOALS = 10
+# Prior N(0, PRIOR_SD) na siły drużyn - bez niego model jest nieidentyfikowalny (stała do ataku i obrony),
+# a na początku sezonu siły nie "uciekają" po jednym wysokim wyniku
+PRIOR_SD = 0.5
+RHO_BOUNDS = (-0.2, 0.2)
+DEFAULT_HOME_ADVANTAGE = 0.25
+
+_LOG_FACTORIAL = np.cumsum(np.log(np.maximum(np.arange(MAX_GOALS + 1), 1)))
+
+
+@dataclass
+class MatchData:
+    """Zakończone mecze jako tablice: indeksy drużyn, gole i wagi (zanik wykładniczy z wiekiem meczu)."""
+    home_idx: np.ndarray
+    away_idx: np.ndarray
+    home_goals: np.ndarray
+    away_goals: np.ndarray
+    weights: np.ndarray
+
+
+def _negative_log_likelihood(params, data, teams):
+    """
+    Ujemna, ważona log-wiarygodność modelu Dixona-Colesa (bez stałych) i jej gradient.
+    params = [atak (teams), obrona (teams), przewaga własnego boiska, rho];
+    gole gospodarza ~ Poisson(exp(home + atak_g - obrona_go)), gościa ~ Poisson(exp(atak_go - obrona_g)),
+    rho koryguje prawdopodobieństwa wyników 0:0, 1:0, 0:1 i 1:1.
+    """
+    attack, defense = params[:teams], params[teams:2 * teams]
+    home, rho = params[-2], params[-1]
+    h, a, x, y, w = data.home_idx, data.away_idx, data.home_goals, data.away_goals, data.weights
+
+    log_lam = home + attack[h] - defense[a]
+    log_mu = attack[a] - defense[h]
+    lam, mu = np.exp(log_lam), np.exp(log_mu)
+
+    tau = np.ones_like(lam)
+    d_lam = np.zeros_like(lam)   # d log(tau) / d log(lam)
+    d_mu = np.zeros_like(lam)    # d log(tau) / d log(mu)
+    d_rho = np.zeros_like(lam)   # d tau / d rho
+    m00, m01, m10, m11 = (x == 0) & (y == 0), (x == 0) & (y == 1), (x == 1) & (y == 0), (x == 1) & (y == 1)
+    tau[m00] = 1 - lam[m00] * mu[m00] * rho
+    tau[m01] = 1 + lam[m01] * rho
+    tau[m10] = 1 + mu[m10] * rho
+    tau[m11] = 1 - rho
+    tau = np.maximum(tau, 1e-10)
+    d_lam[m00] = d_mu[m00] = -lam[m00] * mu[m00] * rho
+    d_rho[m00] = -lam[m00] * mu[m00]
+    d_lam[m01] = lam[m01] * rho
+    d_rho[m01] = lam[m01]
+    d_mu[m10] = mu[m10] * rho
+    d_rho[m10] = mu[m10]
+    d_rho[m11] = -1
+
+    log_likelihood = w * (np.log(tau) + x * log_lam - lam + y * log_mu - mu)
+    g_lam = w * (x - lam + d_lam / tau)
+    g_mu = w * (y - mu + d_mu / tau)
+
+    gradient = np.empty_like(params)
+    gradient[:teams] = np.bincount(h, g_lam, teams) + np.bincount(a, g_mu, teams)
+    gradient[teams:2 * teams] = -np.bincount(a, g_lam, teams) - np.bincount(h, g_mu, teams)
+    gradient[-2] = g_lam.sum()
+    gradient[-1] = (w * d_rho / tau).sum()
+
+    strengths = params[:2 * teams]
+    value = -log_likelihood.sum() + (strengths ** 2).sum() / (2 * PRIOR_SD ** 2)
+    gradient = -gradient
+    gradient[:2 * teams] += strengths / PRIOR_SD ** 2
+    return value, gradient
+
+
+def fit(data, teams, x0=None):
+    """Dopasowanie L-BFGS-B z gradientem analitycznym; x0 - parametry poprzedniego dopasowania (ciepły start)."""
+    if x0 is None:
+        x0 = np.zeros(2 * teams + 2)
+        x0[-2] = DEFAULT_HOME_ADVANTAGE
+    bounds = [(None, None)] * (2 * teams + 1) + [RHO_BOUNDS]
+    return minimize(
+        _negative_log_likelihood, x0, args=(data, teams), jac=True, method='L-BFGS-B', bounds=bounds
+    )
+
+
+def score_matrix(lam, mu, rho):
+    """P(gospodarz = i, gość = j) dla i, j = 0..MAX_GOALS."""
+    goals = np.arange(MAX_GOALS + 1)
+    home = np.exp(goals * np.log(lam) - lam - _LOG_FACTORIAL)
+    away = np.exp(goals * np.log(mu) - mu - _LOG_FACTORIAL)
+    matrix = np.outer(home, away)
+    matrix[0, 0] *= 1 - lam * mu * rho
+    matrix[0, 1] *= 1 + lam * rho
+    matrix[1, 0] *= 1 + mu * rho
+    matrix[1, 1] *= 1 - rho
+    return matrix / matrix.sum()
+
+
+def team_parameters(model, team_ids):
+    """Tablice (atak, obrona) w kolejności team_ids - np. do oczekiwanych goli w symulacji sezonu."""
+    params = [model.teams.get(str(team_id), {}) for team_id in team_ids]
+    return (np.array([p.get('attack', 0.0) for p in params]),
+            np.array([p.get('defense', 0.0) for p in params]))
+
+
+def predict(model, home_team_id, away_team_id, scorelines=5):
+    """
+    Prognoza meczu z zapisanych parametrów: prawdopodobieństwa 1X2, oczekiwane gole i najbardziej
+    prawdopodobne wyniki. Drużyna bez meczów w sezonie dostaje siły przeciętne (0).
+    """
+    home = model.teams.get(str(home_team_id), {})
+    away = model.teams.get(str(away_team_id), {})
+    lam = np.exp(model.home_advantage + home.get('attack', 0.0) - away.get('defense', 0.0))
+    mu = np.exp(away.get('attack', 0.0) - home.get('defense', 0.0))
+    matrix = score_matrix(lam, mu, model.rho)
+
+    top = np.argsort(matrix, axis=None)[::-1][:scorelines]
+    return {
+        'home_team': home_team_id,
+        'away_team': away_team_id,
+        'home_win': round(float(np.tril(matrix, -1).sum()), 4),
+        'draw': round(float(np.trace(matrix)), 4),
+        'away_win': round(float(np.triu(matrix, 1).sum()), 4),
+        'expected_goals': {'home': round(float(lam), 3), 'away': round(float(mu), 3)},
+        'scorelines': [
+            {'home': int(i), 'away': int(j), 'probability': round(float(matrix[i, j]), 4)}
+            for i, j in zip(*np.unravel_index(top, matrix.shape))
+        ],
+    }
+
+
+def _match_data(season):
+    """Zakończone mecze sezonu; wagi exp(-decay * dni) liczone od najnowszego meczu. Zwraca (drużyny, dane, data)."""
+    rows = list(Match.objects.filter(
+        season=season, status='Finished', home_score__isnull=False, away_score__isnull=False
+    ).values_list('home_team_id', 'away_team_id', 'home_score', 'away_score', 'date'))
+    team_ids = sorted({r[0] for r in rows} | {r[1] for r in rows})
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    latest = max((r[4] for r in rows), default=None)
+    days = np.array([(latest - r[4]).total_seconds() / 86400 for r in rows])
+    data = MatchData(
+        home_idx=np.array([index[r[0]] for r in rows], dtype=np.intp),
+        away_idx=np.array([index[r[1]] for r in rows], dtype=np.intp),
+        home_goals=np.array([r[2] for r in rows], float),
+        away_goals=np.array([r[3] for r in rows], float),
+        weights=np.exp(-settings.STRENGTH_MODEL_DECAY * days),
+    )
+    return team_ids, data, latest
+
+
+def fit_strength_model(season, warm_start=True):
+    """
+    Dopasowuje model sezonu i zapisuje parametry. Przy ciepłym starcie punktem wyjścia są parametry
+    z poprzedniego dopasowania (nowe drużyny startują od 0) - zwykle mniej iteracji niż od zera.
+    """
+    team_ids, data, latest = _match_data(season)
+    teams = len(team_ids)
+    previous = TeamStrengthModel.objects.filter(season=season).first()
+
+    x0 = None
+    if warm_start and previous is not None:
+        x0 = np.zeros(2 * teams + 2)
+        for i, team_id in enumerate(team_ids):
+            params = previous.teams.get(str(team_id), {})
+            x0[i], x0[teams + i] = params.get('attack', 0.0), params.get('defense', 0.0)
+        x0[-2], x0[-1] = previous.home_advantage, previous.rho
+
+    started = time.perf_counter()
+    result = fit(data, teams, x0)
+    seconds = time.perf_counter() - started
+
+    model, _ = TeamStrengthModel.objects.update_or_create(season=season, defaults={
+        'home_advantage': float(result.x[-2]),
+        'rho': float(result.x[-1]),
+        'teams': {
+            str(team_id): {'attack': round(float(result.x[i]), 6), 'defense': round(float(result.x[teams + i]), 6)}
+            for i, team_id in enumerate(team_ids)
+        },
+        'matches': len(data.home_goals),
+        'fitted_through': latest,
+        'iterations': int(result.nit),
+        'seconds': seconds,
+        'log_likelihood': float(-result.fun),
+    })
+    return model
+
+
+def refit_strength_models(season_ids):
+    """
+    Nowe wyniki w sezonach (kolejka przeliczeń): ciepły start od zapisanych parametrów, sezon bez modelu
+    dopasowywany od zera. Widoki API tylko czytają zapisane parametry.
+    """
+    for season in Season.objects.filter(id__in=set(season_ids)):
+        fit_strength_model(season)
@@ -0,0 +1,216 @@
+# SportApp/synthetic_data.py
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.utils import timezone
+from .elo import rebuild_elo_ratings
+from .form import rebuild_team_forms
+from .models import League, Season, Team, Match, MatchRating, User
+from .response_cache import invalidate_responses
+from .standings import update_standings
+from .team_stats import rebuild_team_season_stats
+
+# Zakresy api_id danych syntetycznych - poza identyfikatorami API-Football i SyntheticStore (replay.py)
+LEAGUE_API_BASE = 900_000
+TEAM_API_BASE = 90_000_000
+MATCH_API_BASE = 900_000_000
+USERNAME_PREFIX = 'synthetic_user_'
+BATCH_SIZE = 2000
+
+
+@dataclass
+class GeneratedCounts:
+    leagues: int = 0
+    seasons: int = 0
+    teams: int = 0
+    matches: int = 0
+    finished: int = 0
+    users: int = 0
+    ratings: int = 0
+
+    def __str__(self):
+        return (f"ligi: {self.leagues}, sezony: {self.seasons}, drużyny: {self.teams}, mecze: {self.matches} "
+                f"(zakończone: {self.finished}), użytkownicy: {self.users}, oceny: {self.ratings}")
+
+
+def round_robin(teams):
+    """Kolejki "każdy z każdym" u siebie i na wyjeździe (algorytm kołowy)."""
+    rotation = teams[1:]
+    rounds = []
+    for _ in range(len(teams) - 1):
+        lineup = [teams[0]] + rotation
+        half = len(lineup) // 2
+        rounds.append(list(zip(lineup[:half], reversed(lineup[half:]))))
+        rotation = rotation[-1:] + rotation[:-1]
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+class SyntheticDataGenerator:
+    """
+    Realistyczne dane bezpośrednio w bazie (bulk_create, bez API): ligi po `teams` drużyn, sezony z pełnym
+    terminarzem, wyniki z rozkładu Poissona wg siły drużyn, komplet statystyk zgodnych z wynikiem
+    (np. strzały celne >= gole, obrony bramkarza = celne strzały rywala - gole), użytkownicy i oceny meczów.
+    Mecze sprzed `now` są zakończone, późniejsze - zaplanowane. Deterministyczne dla danego `seed`.
+    """
+
+    def __init__(self, leagues=1, seasons=1, teams=20, users=50, ratings=1000, seed=0, now=None):
+        self.leagues, self.seasons, self.teams = leagues, seasons, teams
+        self.users, self.ratings = users, ratings
+        self.now = now or timezone.now()
+        self.rng = np.random.default_rng(seed)
+        self.random = random.Random(seed)
+        last_year = self.now.year if self.now.month >= 7 else self.now.year - 1
+        self.years = list(range(last_year - seasons + 1, last_year + 1))
+
+    @staticmethod
+    def clear():
+        """Usuwa poprzednio wygenerowane dane (ligi kaskadowo: sezony, drużyny, mecze, oceny; użytkownicy)."""
+        Match.objects.filter(api_id__gte=MATCH_API_BASE).delete()
+        Team.objects.filter(api_id__gte=TEAM_API_BASE).delete()
+        League.objects.filter(api_id__gte=LEAGUE_API_BASE, api_id__lt=TEAM_API_BASE).delete()
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        invalidate_responses(everything=True)
+
+    @transaction.atomic
+    def generate(self, derived=True):
+        counts = GeneratedCounts()
+        offset = League.objects.filter(api_id__gte=LEAGUE_API_BASE, api_id__lt=TEAM_API_BASE).count()
+        season_ids = []
+        for i in range(offset, offset + self.leagues):
+            league = League.objects.create(
+                api_id=LEAGUE_API_BASE + i, name=f"Synthetic League {i + 1}", country=f"Country {i % 30 + 1}"
+            )
+            teams = Team.objects.bulk_create([Team(
+                api_id=TEAM_API_BASE + i * 100 + j, name=f"Synthetic FC {i + 1}-{j + 1}", league=league,
+                founded=1880 + self.random.randint(0, 120), venue_name=f"Stadium {i + 1}-{j + 1}",
+                venue_city=f"City {i + 1}-{j + 1}", venue_capacity=self.random.randint(8, 80) * 1000,
+            ) for j in range(self.teams)])
+            if not teams[0].pk:
+                # Bazy bez RETURNING w bulk_create (np. MySQL) - klucze trzeba doczytać
+                teams = list(Team.objects.filter(league=league).order_by('api_id'))
+            # Siła drużyn zmienia się lekko z sezonu na sezon
+            attack = self.rng.normal(0, 0.25, self.teams)
+            defense = self.rng.normal(0, 0.2, self.teams)
+            for year in self.years:
+                season = Season.objects.create(league=league, year=year, is_current=year == self.years[-1])
+                season_ids.append(season.id)
+                counts.seasons += 1
+                finished = self._matches(season, teams, attack, defense, i, counts)
+                counts.finished += finished
+                attack = 0.7 * attack + self.rng.normal(0, 0.15, self.teams)
+                defense = 0.7 * defense + self.rng.normal(0, 0.12, self.teams)
+            counts.leagues += 1
+            counts.teams += len(teams)
+
+        counts.users = self._users()
+        counts.ratings = self._ratings(season_ids)
+        if derived:
+            # Tabele, statystyki sezonu, okna formy i ranking Elo - tak jak po synchronizacji z API
+            rebuild_team_season_stats(season_ids)
+            update_standings(season_ids)
+            rebuild_team_forms(list(Team.objects.filter(api_id__gte=TEAM_API_BASE).values_list('id', flat=True)))
+            rebuild_elo_ratings()
+        invalidate_responses(season_ids)
+        return counts
+
+    def _matches(self, season, teams, attack, defense, league_no, counts):
+        rounds = round_robin(list(range(len(teams))))
+        home_idx = np.array([h for pairs in rounds for h, _ in pairs])
+        away_idx = np.array([a for pairs in rounds for _, a in pairs])
+        per_round = len(rounds[0])
+        n = len(home_idx)
+        season_start = datetime(season.year, 8, 10, 13, 30, tzinfo=dt_timezone.utc)
+        dates = [
+            season_start + timedelta(days=7 * (k // per_round) + (k % per_round) % 3, hours=2.5 * (k % 4))
+            for k in range(n)
+        ]
+        finished = np.array([date + timedelta(hours=2) < self.now for date in dates])
+
+        stats = self._statistics(attack[home_idx] - defense[away_idx], attack[away_idx] - defense[home_idx], n)
+        rows = []
+        for k in range(n):
+            values = {'status': 'Finished' if finished[k] else 'Scheduled'}
+            if finished[k]:
+                values.update((field, column[k].item() if hasattr(column[k], 'item') else column[k])
+                              for field, column in stats.items())
+            rows.append(Match(
+                api_id=MATCH_API_BASE + season.id * 1000 + k,
+                season=season, home_team=teams[home_idx[k]], away_team=teams[away_idx[k]], date=dates[k],
+                venue_name=teams[home_idx[k]].venue_name, referee=f"Referee {league_no % 40 + 1}-{k % 25 + 1}",
+                round=f"Regular Season - {k // per_round + 1}", **values,
+            ))
+        Match.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        counts.matches += n
+        return int(finished.sum())
+
+    def _statistics(self, home_strength, away_strength, n):
+        """Kolumny statystyk dla n meczów naraz (NumPy) - wynik i statystyki obu stron są ze sobą spójne."""
+        rng = self.rng
+        # Średnio ~1.5 gola gospodarza i ~1.2 gościa na mecz
+        goals = {'home': rng.poisson(1.45 * np.exp(home_strength)), 'away': rng.poisson(1.15 * np.exp(away_strength))}
+        possession_home = np.clip(np.rint(rng.normal(50 + 20 * (home_strength - away_strength), 7)), 28, 72)
+        possession = {'home': possession_home, 'away': 100 - possession_home}
+
+        columns = {}
+        on_goal = {}
+        for side in ('home', 'away'):
+            on_goal[side] = goals[side] + rng.poisson(3, n)
+            off_goal, blocked = rng.poisson(4.5, n), rng.poisson(3, n)
+            total = on_goal[side] + off_goal + blocked
+            inside = on_goal[side] + rng.binomial(off_goal + blocked, 0.45)
+            passes = np.maximum(np.rint(possession[side] * 9 + rng.normal(0, 40, n)), 150).astype(int)
+            columns.update({
+                f'{side}_score': goals[side],
+                f'{side}_shots_on_goal': on_goal[side],
+                f'{side}_shots_off_goal': off_goal,
+                f'{side}_blocked_shots': blocked,
+                f'{side}_total_shots': total,
+                f'{side}_shots_inside_box': inside,
+                f'{side}_shots_outside_box': total - inside,
+                f'{side}_fouls': rng.poisson(11, n),
+                f'{side}_corners': rng.poisson(5, n),
+                f'{side}_offsides': rng.poisson(2, n),
+                f'{side}_possession': [f"{int(p)}%" for p in possession[side]],
+                f'{side}_yellow_cards': rng.poisson(1.8, n),
+                f'{side}_red_cards': rng.binomial(1, 0.06, n),
+                f'{side}_passes_total': passes,
+                f'{side}_passes_accurate': np.rint(passes * rng.uniform(0.68, 0.9, n)).astype(int),
+            })
+        columns['home_goalkeeper_saves'] = on_goal['away'] - goals['away']
+        columns['away_goalkeeper_saves'] = on_goal['home'] - goals['home']
+        return columns
+
+    def _users(self):
+        existing = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        # Jeden hash dla wszystkich - haszowanie hasła to ~100 ms na użytkownika
+        password = make_password('synthetic')
+        users = User.objects.bulk_create([
+            User(username=f"{USERNAME_PREFIX}{existing + i + 1}", email=f"user{existing + i + 1}@example.com",
+                 password=password)
+            for i in range(self.users)
+        ], batch_size=BATCH_SIZE)
+        group, _ = Group.objects.get_or_create(name='User')
+        user_ids = User.objects.filter(username__in=[u.username for u in users]).values_list('id', flat=True)
+        User.groups.through.objects.bulk_create(
+            [User.groups.through(user_id=user_id, group_id=group.id) for user_id in user_ids], batch_size=BATCH_SIZE
+        )
+        return len(users)
+
+    def _ratings(self, season_ids):
+        user_ids = list(User.objects.filter(username__startswith=USERNAME_PREFIX).values_list('id', flat=True))
+        match_ids = list(Match.objects.filter(season_id__in=season_ids, status='Finished').values_list('id', flat=True))
+        if not user_ids or not match_ids:
+            return 0
+        target = min(self.ratings, len(user_ids) * len(match_ids))
+        pairs = set()
+        while len(pairs) < target:
+            pairs.add((self.random.choice(user_ids), self.random.choice(match_ids)))
+        MatchRating.objects.bulk_create([
+            MatchRating(user_id=user_id, match_id=match_id, rating=round(self.random.triangular(1, 10, 7), 1))
+            for user_id, match_id in pairs
+        ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+        return len(pairs)
@@ -0,0 +1,103 @@
+# SportApp/team_stats.py
+from django.db.models import Q
+from .models import Match, TeamSeasonStats
+
+RESULT_FIELDS = ['played', 'win', 'draw', 'lose', 'goals_for', 'goals_against']
+# Statystyki meczu zapisane w parach home_X / away_X (bez wyniku), np. shots_on_goal, possession
+STAT_NAMES = [
+    f.name[len('home_'):] for f in Match._meta.concrete_fields
+    if f.name.startswith('home_') and not f.is_relation and f.name != 'home_score'
+]
+_COLUMNS = ['season_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score'] + [
+    f'{side}_{stat}' for side in ('home', 'away') for stat in STAT_NAMES
+]
+
+
+def _stat_value(value):
+    # Posiadanie piłki API zwraca jako "55%"
+    if isinstance(value, str):
+        value = value.rstrip('%').strip()
+        return int(value) if value.isdigit() else None
+    return value
+
+
+def averages(stats):
+    """{"fouls": {"total": 84, "matches": 7}} -> {"fouls": 12.0}"""
+    return {stat: round(v['total'] / v['matches'], 2) if v['matches'] else None for stat, v in stats.items()}
+
+
+def combine(home_stats, away_stats):
+    """Sumy z obu stron - statystyki całego sezonu."""
+    return {
+        stat: {
+            'total': home_stats.get(stat, {}).get('total', 0) + away_stats.get(stat, {}).get('total', 0),
+            'matches': home_stats.get(stat, {}).get('matches', 0) + away_stats.get(stat, {}).get('matches', 0),
+        }
+        for stat in STAT_NAMES
+    }
+
+
+def _empty_row(team_id, season_id):
+    row = TeamSeasonStats(team_id=team_id, season_id=season_id)
+    for side in ('home', 'away'):
+        setattr(row, f'{side}_stats', {stat: {'total': 0, 'matches': 0} for stat in STAT_NAMES})
+    return row
+
+
+def refresh_team_season_stats(pairs):
+    """
+    Przelicza wiersze TeamSeasonStats dla par (team_id, season_id) z zakończonych meczów:
+    jedno zapytanie o mecze wszystkich par i jeden upsert. Zwraca liczbę zapisanych wierszy.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+
+    rows = {pair: _empty_row(*pair) for pair in pairs}
+    team_ids = {team_id for team_id, _ in pairs}
+    matches = Match.objects.filter(
+        Q(home_team_id__in=team_ids) | Q(away_team_id__in=team_ids),
+        season_id__in={season_id for _, season_id in pairs},
+        status='Finished',
+    ).values_list(*_COLUMNS)
+
+    for values in matches.iterator(chunk_size=2000):
+        match = dict(zip(_COLUMNS, values))
+        for side, opponent in (('home', 'away'), ('away', 'home')):
+            row = rows.get((match[f'{side}_team_id'], match['season_id']))
+            if row is None:
+                continue
+            goals_for, goals_against = match[f'{side}_score'], match[f'{opponent}_score']
+            setattr(row, f'{side}_played', getattr(row, f'{side}_played') + 1)
+            if goals_for is not None and goals_against is not None:
+                outcome = 'win' if goals_for > goals_against else 'draw' if goals_for == goals_against else 'lose'
+                setattr(row, f'{side}_{outcome}', getattr(row, f'{side}_{outcome}') + 1)
+                setattr(row, f'{side}_goals_for', getattr(row, f'{side}_goals_for') + goals_for)
+                setattr(row, f'{side}_goals_against', getattr(row, f'{side}_goals_against') + goals_against)
+            stats = getattr(row, f'{side}_stats')
+            for stat in STAT_NAMES:
+                value = _stat_value(match[f'{side}_{stat}'])
+                if value is not None:
+                    stats[stat]['total'] += value
+                    stats[stat]['matches'] += 1
+
+    TeamSeasonStats.objects.bulk_create(
+        rows.values(),
+        update_conflicts=True,
+        unique_fields=['season', 'team'],
+        update_fields=[f'{side}_{field}' for side in ('home', 'away') for field in RESULT_FIELDS + ['stats']]
+                      + ['updated_at'],
+        batch_size=500,
+    )
+    return len(rows)
+
+
+def rebuild_team_season_stats(season_ids=None):
+    """Przelicza wszystkie pary drużyna/sezon występujące w meczach (wszystkich albo wskazanych sezonów)."""
+    matches = Match.objects.all()
+    if season_ids is not None:
+        matches = matches.filter(season_id__in=season_ids)
+    pairs = set()
+    for season_id, home_id, away_id in matches.values_list('season_id', 'home_team_id', 'away_team_id').distinct():
+        pairs.update(((home_id, season_id), (away_id, season_id)))
+    return refresh_team_season_stats(pairs)
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone as dt_timezone
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from SportApp.models import User
+from SportApp.serializers import MyTokenObtainPairSerializer
+from SportApp.synthetic_data import SyntheticDataGenerator
+
+# "Dziś" danych syntetycznych: połowa sezonu 2025 - część meczów zakończona, reszta zaplanowana
+SYNTHETIC_NOW = datetime(2025, 10, 1, tzinfo=dt_timezone.utc)
+
+
+def generate_synthetic_data(leagues=1, seasons=1, teams=8, users=0, ratings=0, seed=0):
+    """Dane syntetyczne na SYNTHETIC_NOW - z tabelami, oknami formy i rankingiem Elo jak po synchronizacji."""
+    return SyntheticDataGenerator(
+        leagues=leagues, seasons=seasons, teams=teams, users=users, ratings=ratings, seed=seed, now=SYNTHETIC_NOW,
+    ).generate()
+
+
+def user_token(user, group='User'):
+    """Dodaje użytkownika do grupy i zwraca jego access token (jak z /api/auth/login/)."""
+    user.groups.add(Group.objects.get_or_create(name=group)[0])
+    return str(MyTokenObtainPairSerializer.get_token(user).access_token)
+
+
+@override_settings(API_RESPONSE_CACHE_ENABLED=False)
+class APITestCase(TestCase):
+    """
+    Testy endpointów: dane syntetyczne (SYNTHETIC_DATA - argumenty generate_synthetic_data) i klient z prawdziwym
+    tokenem czytelnika - odczyty sprawdzają role z claimu tokenu, bez zapytań o uprawnienia. Bez cache odpowiedzi.
+    """
+    SYNTHETIC_DATA = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(**cls.SYNTHETIC_DATA)
+        cls.user = User.objects.create(username='reader')
+        cls.access = user_token(cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from SportApp.analytics import MatchAnalyzer, SCORE_FIELDS
+from SportApp.analytics_backfill import AnalyticsBackfill
+from SportApp.models import AnalyticsBackfillSkip, Match, Season
+from SportApp.tests import generate_synthetic_data
+
+
+class BatchAnalyticsParityTests(TestCase):
+    """Tryb wsadowy (NumPy) musi dawać dokładnie te same wskaźniki co liczenie mecz po meczu."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Połowa sezonu: część meczów zakończona (historia drużyn), reszta zaplanowana
+        generate_synthetic_data(leagues=2, seasons=2, seed=7)
+
+    def assert_parity(self, matches):
+        analyzer = MatchAnalyzer()
+        expected = {}
+        for match in matches.select_related('home_team', 'away_team'):
+            scores = analyzer.compute_match_scores(match)
+            if scores is not None:
+                expected[match.id] = scores
+        actual = analyzer.compute_batch(matches)
+
+        self.assertTrue(expected)
+        self.assertEqual(expected.keys(), actual.keys())
+        for match_id, scores in expected.items():
+            self.assertEqual(
+                {field: scores[field] for field in SCORE_FIELDS}, actual[match_id], f"mecz {match_id}"
+            )
+
+    def test_scheduled_matches(self):
+        # Okna formy drużyn (TeamForm) są aktualne dla nadchodzących meczów
+        self.assert_parity(Match.objects.filter(status='Scheduled'))
+
+    def test_finished_matches(self):
+        # Mecze starsze niż okno formy - historia prosto z tabeli meczów, także na przełomie sezonów
+        self.assert_parity(Match.objects.filter(status='Finished'))
+
+
+class AnalyticsBackfillTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(teams=6, seed=7)
+        cls.season_ids = list(Season.objects.values_list('id', flat=True))
+
+    def test_resume_skips_matches_without_analytics(self):
+        backfill = AnalyticsBackfill(workers=1, chunk_size=10)
+        progress = backfill.run(self.season_ids)
+        finished = Match.objects.filter(status='Finished').count()
+        self.assertEqual(progress.total, finished)
+        # Pierwsze mecze drużyn nie mają historii - bez analizy, ale oznaczone jako przetworzone
+        self.assertEqual(AnalyticsBackfillSkip.objects.count(), finished - progress.written)
+        self.assertTrue(AnalyticsBackfillSkip.objects.exists())
+
+        self.assertEqual(backfill.run(self.season_ids).total, 0)
+        self.assertEqual(backfill.run(self.season_ids, recompute=True).total, finished)
@@ -0,0 +1,83 @@
+from collections import Counter
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from SportApp.models import Match, MatchRating, Season
+from SportApp.pagination import encode_position
+from SportApp.tests import APITestCase
+
+
+class MatchListQueryTests(APITestCase):
+    """Liczba zapytań listy meczów nie zależy od liczby wierszy na stronie (bez N+1)."""
+    SYNTHETIC_DATA = {'seasons': 2, 'teams': 10, 'users': 5, 'ratings': 200, 'seed': 13}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.season = Season.objects.order_by('-year').first()
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assert_constant_queries(self, url, **params):
+        """Ta sama liczba zapytań dla strony 5 i 50 wierszy."""
+        with CaptureQueriesContext(connection) as small:
+            response = self.get(url, page_size=5, **params)
+        self.assertEqual(len(response.data['results']), 5)
+        with self.assertNumQueries(len(small.captured_queries)):
+            response = self.get(url, page_size=50, **params)
+        self.assertEqual(len(response.data['results']), 50)
+        return len(small.captured_queries)
+
+    def test_match_list(self):
+        self.assertEqual(self.assert_constant_queries('/api/matches/'), 1)
+
+    def test_match_list_filtered_by_season(self):
+        # +1: django-filter sprawdza, czy sezon z filtra istnieje
+        self.assertEqual(self.assert_constant_queries('/api/matches/', season=self.season.id), 2)
+
+    def test_match_list_fields(self):
+        fields = 'id,date,home_team,away_team,home_score,away_score'
+        self.assertEqual(self.assert_constant_queries('/api/matches/', season=self.season.id, fields=fields), 2)
+        row = self.get('/api/matches/', season=self.season.id, fields=fields).data['results'][0]
+        self.assertEqual(set(row), set(fields.split(',')))
+
+    def test_match_list_expand(self):
+        # Podsumowanie ocen z adnotacji tego samego zapytania - bez zapytania na mecz
+        self.assertEqual(
+            self.assert_constant_queries('/api/matches/', season=self.season.id, expand='ratings_summary'), 2
+        )
+        rows = self.get('/api/matches/', expand='ratings_summary', ordering='date', page_size=50).data['results']
+        ratings = MatchRating.objects.filter(match_id__in=[row['id'] for row in rows])
+        counts = Counter(ratings.values_list('match_id', flat=True))
+        self.assertTrue(counts)
+        for row in rows:
+            self.assertEqual(row['ratings_summary']['count'], counts[row['id']], f"mecz {row['id']}")
+
+    def test_deep_cursor_costs_the_same_as_first_page(self):
+        ordered = list(Match.objects.order_by('-date', '-id').values_list('date', 'id'))
+        date, match_id = ordered[len(ordered) // 2]
+        cursor = encode_position([date.isoformat(), match_id])
+
+        with self.assertNumQueries(1):
+            first = self.get('/api/matches/', page_size=10)
+        with self.assertNumQueries(1):
+            deep = self.get('/api/matches/', page_size=10, cursor=cursor)
+        self.assertEqual(len(first.data['results']), 10)
+        # Strona zaczyna się tuż za pozycją z kursora (WHERE (date, id) < ..., nie OFFSET)
+        expected = [match_id for _, match_id in ordered[len(ordered) // 2 + 1:][:10]]
+        self.assertEqual([row['id'] for row in deep.data['results']], expected)
+
+    def test_next_link_continues_without_gaps(self):
+        ordered = list(Match.objects.order_by('-date', '-id').values_list('id', flat=True)[:30])
+        seen = []
+        response = self.get('/api/matches/', page_size=7)
+        while len(seen) < 30:
+            seen.extend(row['id'] for row in response.data['results'])
+            with self.assertNumQueries(1):
+                response = self.client.get(response.data['next'])
+        self.assertEqual(seen[:30], ordered)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/matches/', {'cursor': 'nie-kursor'}).status_code, 404)
@@ -0,0 +1,153 @@
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from SportApp.authentication import ROLES_CLAIM
+from SportApp.models import League, User
+from SportApp.permissions import role_cache
+from SportApp.serializers import MyTokenObtainPairSerializer
+from SportApp.tests import APITestCase, user_token
+
+
+def auth_queries(queries):
+    """Zapytania o użytkownika lub jego grupy (uwierzytelnienie i uprawnienia)."""
+    return [q['sql'] for q in queries if 'auth_group' in q['sql'] or 'sportapp_user' in q['sql'].lower()]
+
+
+class RoleClaimsTests(APITestCase):
+    """Odczyty - role z podpisanego tokenu, bez bazy; zapisy - użytkownik z bazy i role z role_cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.league = League.objects.order_by('id').first()
+        cls.admin = User.objects.create(username='admin')
+        cls.admin_access = user_token(cls.admin, 'Admin')
+
+    def setUp(self):
+        super().setUp()
+        role_cache.invalidate()
+
+    def _as_admin(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.admin_access}')
+
+    def test_read_runs_no_auth_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/leagues/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(auth_queries(queries.captured_queries), [])
+
+    @override_settings(JWT_ROLE_CLAIMS=False)
+    def test_read_without_role_claims_checks_database(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/leagues/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(auth_queries(queries.captured_queries))
+
+    def test_write_uses_database_user_and_role_cache(self):
+        self._as_admin()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/leagues/{self.league.id}/', {'name': 'Nowa'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        sql = auth_queries(queries.captured_queries)
+        self.assertTrue(any('auth_group' in q for q in sql))  # role wczytane do cache
+        self.assertTrue(any('auth_group' not in q for q in sql))  # użytkownik z bazy
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/leagues/{self.league.id}/', {'name': 'Druga'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('auth_group' in q for q in auth_queries(queries.captured_queries)))
+
+    def test_write_ignores_roles_in_token(self):
+        # Token nadal ma rolę Admin, ale zapis sprawdza grupy w bazie
+        self.admin.groups.clear()
+        self._as_admin()
+        response = self.client.patch(f'/api/leagues/{self.league.id}/', {'name': 'Nowa'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        # Odczyt zostaje dozwolony do wygaśnięcia access tokenu (okno opisane przy JWT_ROLE_CLAIMS)
+        self.assertEqual(self.client.get('/api/leagues/').status_code, 200)
+
+    def test_write_rejects_inactive_user(self):
+        User.objects.filter(id=self.admin.id).update(is_active=False)
+        self._as_admin()
+        response = self.client.patch(f'/api/leagues/{self.league.id}/', {'name': 'Nowa'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class TokenRefreshTests(TestCase):
+    """Odświeżenie tokenu czyta role z bazy i odrzuca nieaktywnych / usuniętych użytkowników."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(username='reader')
+        self.user.groups.add(Group.objects.create(name='User'))
+        self.refresh = str(MyTokenObtainPairSerializer.get_token(self.user))
+
+    def _refresh(self):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': self.refresh}, format='json')
+
+    def test_refresh_rereads_roles(self):
+        self.user.groups.add(Group.objects.create(name='Admin'))
+        response = self._refresh()
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access[ROLES_CLAIM], ['Admin', 'User'])
+        self.assertTrue(access['is_admin'])
+
+        # Rotowany refresh token też niesie aktualne role
+        self.user.groups.clear()
+        self.refresh = response.data['refresh']
+        response = self._refresh()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data['access'])[ROLES_CLAIM], [])
+
+    def test_refresh_rejects_inactive_user(self):
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertEqual(self._refresh().status_code, 401)
+
+    def test_refresh_rejects_deleted_user(self):
+        self.user.delete()
+        self.assertEqual(self._refresh().status_code, 401)
+
+
+class RoleCacheInvalidationTests(TestCase):
+    """Sygnały (apps.py) czyszczą role_cache przy każdej zmianie członkostwa, grupy lub użytkownika."""
+
+    def setUp(self):
+        role_cache.invalidate()
+        self.user = User.objects.create(username='reader')
+        self.group = Group.objects.create(name='User')
+        self.user.groups.add(self.group)
+        self.assertEqual(role_cache.get(self.user.id), {'User'})
+
+    def test_user_groups_change(self):
+        admin = Group.objects.create(name='Admin')
+        self.user.groups.add(admin)
+        self.assertEqual(role_cache.get(self.user.id), {'User', 'Admin'})
+        self.user.groups.remove(admin)
+        self.assertEqual(role_cache.get(self.user.id), {'User'})
+
+    def test_group_members_change(self):
+        self.group.user_set.remove(self.user)
+        self.assertEqual(role_cache.get(self.user.id), set())
+        self.group.user_set.add(self.user)
+        self.assertEqual(role_cache.get(self.user.id), {'User'})
+
+    def test_group_members_clear(self):
+        self.group.user_set.clear()
+        self.assertEqual(role_cache.get(self.user.id), set())
+
+    def test_group_renamed(self):
+        self.group.name = 'Admin'
+        self.group.save()
+        self.assertEqual(role_cache.get(self.user.id), {'Admin'})
+
+    def test_group_deleted(self):
+        self.group.delete()
+        self.assertEqual(role_cache.get(self.user.id), set())
+
+    def test_cached_roles_are_served_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(role_cache.get(self.user.id), {'User'})
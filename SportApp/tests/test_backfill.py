@@ -0,0 +1,52 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from SportApp.backfill import StatisticsBackfill
+from SportApp.models import Match, StatisticsFetch
+from SportApp.tests import generate_synthetic_data
+
+
+class StubStatisticsService:
+    """Serwis API zwracający te same statystyki dla każdego meczu (bez sieci)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_fixture_statistics(self, fixture_id, played_at=None):
+        self.calls.append(fixture_id)
+        match = Match.objects.select_related('home_team', 'away_team').get(api_id=fixture_id)
+        return [
+            {'team': {'id': team.api_id}, 'statistics': [{'type': 'Total Shots', 'value': 10}]}
+            for team in (match.home_team, match.away_team)
+        ]
+
+    def fetch_concurrently(self, func, arguments, return_exceptions=False):
+        return [func(*args) for args in arguments]
+
+
+class StatisticsBackfillTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(teams=6, seed=17)
+
+    def test_statistics_fetched_right_after_match_are_fetched_again(self):
+        match = Match.objects.filter(status='Scheduled').first()
+        Match.objects.filter(id=match.id).update(status='Finished', home_score=1, away_score=0,
+                                                  date=timezone.now() - timedelta(hours=2))
+        service = StubStatisticsService()
+        backfill = StatisticsBackfill(service)
+
+        backfill.run(match_ids=[match.id])
+        self.assertEqual(Match.objects.get(id=match.id).home_total_shots, 10)
+        fetch = StatisticsFetch.objects.get(match=match)
+        self.assertEqual(fetch.last_result, StatisticsFetch.RESULT_PROVISIONAL)
+        self.assertEqual(fetch.attempts, 0)
+        self.assertFalse(backfill.pending_matches([match.id]).exists())
+
+        # Minęło API_FOOTBALL_STATISTICS_SETTLE_HOURS - jedno ponowne pobranie i koniec
+        Match.objects.filter(id=match.id).update(date=timezone.now() - timedelta(days=2))
+        StatisticsFetch.objects.filter(match=match).update(retry_after=timezone.now())
+        backfill.run(match_ids=[match.id])
+        self.assertEqual(len(service.calls), 2)
+        self.assertFalse(StatisticsFetch.objects.filter(match=match).exists())
+        self.assertFalse(backfill.pending_matches([match.id]).exists())
@@ -0,0 +1,80 @@
+from django.test import TestCase, override_settings
+from SportApp.changes import matches_changed, match_removed, process_recompute_queue
+from SportApp.models import (
+    Match, SeasonRecompute, SeasonSimulation, TeamStrengthModel, EloRecompute, EloRatingHistory, TeamEloRating,
+)
+from SportApp.strength import fit_strength_model
+from SportApp.tests import generate_synthetic_data
+
+
+@override_settings(SEASON_SIMULATION_RUNS=200, SEASON_SIMULATION_WORKERS=1)
+class RecomputeQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(seed=3)
+        cls.match = Match.objects.filter(status='Scheduled').order_by('date').first()
+        cls.season = cls.match.season
+
+    def finish_match(self):
+        Match.objects.filter(id=self.match.id).update(status='Finished', home_score=2, away_score=0)
+        matches_changed([self.match.id])
+
+    def test_season_models_are_queued_not_refitted_inline(self):
+        model = fit_strength_model(self.season)
+        SeasonSimulation.objects.create(season=self.season, simulations=1, remaining_matches=0, seconds=0, results=[])
+
+        self.finish_match()
+        self.assertTrue(SeasonRecompute.objects.filter(season=self.season).exists())
+        self.assertEqual(TeamStrengthModel.objects.get(season=self.season).matches, model.matches)
+        self.assertEqual(SeasonSimulation.objects.get(season=self.season).simulations, 1)
+
+        process_recompute_queue(flush=True)
+        self.assertFalse(SeasonRecompute.objects.exists())
+        self.assertEqual(TeamStrengthModel.objects.get(season=self.season).matches, model.matches + 1)
+        simulation = SeasonSimulation.objects.get(season=self.season)
+        self.assertEqual(simulation.simulations, 200)
+        self.assertEqual(
+            simulation.remaining_matches, Match.objects.filter(season=self.season, status='Scheduled').count()
+        )
+
+    def test_debounce_keeps_first_deadline(self):
+        self.finish_match()
+        not_before = SeasonRecompute.objects.get(season=self.season).not_before
+        matches_changed([self.match.id])
+        self.assertEqual(SeasonRecompute.objects.get(season=self.season).not_before, not_before)
+        # Termin jeszcze nie minął - bez flush nic się nie dzieje
+        process_recompute_queue()
+        self.assertTrue(SeasonRecompute.objects.filter(season=self.season).exists())
+
+    def test_elo_is_queued_not_applied_inline(self):
+        self.finish_match()
+        self.assertTrue(EloRecompute.objects.filter(match=self.match).exists())
+        self.assertFalse(EloRatingHistory.objects.filter(match=self.match).exists())
+
+        process_recompute_queue(flush=True)
+        self.assertFalse(EloRecompute.objects.exists())
+        history = EloRatingHistory.objects.filter(match=self.match)
+        self.assertEqual(history.count(), 2)
+        home = TeamEloRating.objects.get(team=self.match.home_team)
+        self.assertEqual(home.last_match_id, self.match.id)
+        self.assertEqual(home.rating, history.get(team=self.match.home_team).rating_after)
+
+    def test_removed_match_replays_elo_from_queue(self):
+        played = Match.objects.filter(season=self.season, status='Finished').order_by('date').first()
+        teams = {played.home_team_id, played.away_team_id}
+        played_at = played.date
+        played.delete()
+        self.assertFalse(EloRatingHistory.objects.filter(match_id=played.id).exists())
+        matches = TeamEloRating.objects.get(team_id=played.home_team_id).matches
+
+        match_removed(teams, self.season.id, was_finished=True, played_at=played_at)
+        self.assertTrue(EloRecompute.objects.filter(replay_from=played_at).exists())
+        process_recompute_queue(flush=True)
+        self.assertFalse(EloRecompute.objects.exists())
+        self.assertEqual(TeamEloRating.objects.get(team_id=played.home_team_id).matches, matches - 1)
+
+    def test_first_strength_fit_happens_in_queue(self):
+        self.finish_match()
+        self.assertFalse(TeamStrengthModel.objects.exists())
+        process_recompute_queue(flush=True)
+        self.assertTrue(TeamStrengthModel.objects.filter(season=self.season).exists())
@@ -0,0 +1,95 @@
+from django.core.cache import caches
+from django.test import override_settings
+from SportApp.changes import matches_changed
+from SportApp.models import Match, Season, Standing, User
+from SportApp.response_cache import CACHE_ALIAS
+from SportApp.tests import APITestCase, user_token
+
+RESPONSE_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-api-responses'},
+}
+
+
+@override_settings(API_RESPONSE_CACHE_ENABLED=True, CACHES=RESPONSE_CACHE)
+class StandingsResponseCacheTests(APITestCase):
+    """Tabela z cache odpowiedzi: trafienie bez zapytań, 304 po ETagu i unieważnienie po zmianie meczu."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.season = Season.objects.get()
+        cls.match = Match.objects.filter(season=cls.season, status='Finished').order_by('date', 'id').first()
+
+    def setUp(self):
+        super().setUp()
+        caches[CACHE_ALIAS].clear()
+        self.url = '/api/standings/'
+        self.params = {'season': self.season.id}
+
+    def _points(self, response):
+        return {row['team']: row['points'] for row in response.json()}
+
+    def _flip_result(self):
+        """Zwycięzca meczu staje się przegranym - zmieniają się punkty obu drużyn w tabeli."""
+        return {'home_score': self.match.away_score, 'away_score': self.match.home_score + 1} \
+            if self.match.home_score >= self.match.away_score \
+            else {'home_score': self.match.away_score + 1, 'away_score': self.match.home_score}
+
+    def test_second_request_is_a_hit_without_queries(self):
+        first = self.client.get(self.url, self.params)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, self.params)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH='"inny"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_matches_changed_bumps_season_version(self):
+        before = self.client.get(self.url, self.params)
+        etag = before['ETag']
+        Match.objects.filter(id=self.match.id).update(**self._flip_result())
+        with self.captureOnCommitCallbacks(execute=True):
+            matches_changed([self.match.id])
+
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(self._points(response), self._points(before))
+        self.assertEqual(self._points(response), dict(
+            Standing.objects.filter(season=self.season).values_list('team_id', 'points')
+        ))
+
+    def test_admin_match_update_bumps_season_version(self):
+        before = self.client.get(self.url, self.params)
+        admin = User.objects.create(username='admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {user_token(admin, "Admin")}')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/matches/{self.match.id}/', self._flip_result(), format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(self._points(response), self._points(before))
+        self.assertEqual(self._points(response), dict(
+            Standing.objects.filter(season=self.season).values_list('team_id', 'points')
+        ))
+
+    def test_write_without_commit_keeps_cached_response(self):
+        # Wersje podbija dopiero commit transakcji zapisu - bez niego tabela zostaje w cache
+        self.client.get(self.url, self.params)
+        Match.objects.filter(id=self.match.id).update(**self._flip_result())
+        with self.captureOnCommitCallbacks(execute=False):
+            matches_changed([self.match.id])
+        self.assertEqual(self.client.get(self.url, self.params)['X-Cache'], 'HIT')
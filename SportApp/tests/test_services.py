@@ -0,0 +1,129 @@
+import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.test import SimpleTestCase, override_settings
+from SportApp.api_cache import ResponseCache
+from SportApp.services import FootballAPIService, FootballAPIError, QuotaExhaustedError, RateLimiter
+
+
+class StubAPIServer(ThreadingHTTPServer):
+    """Lokalny serwer HTTP/1.1 (keep-alive) odpowiadający kolejno zaplanowanymi odpowiedziami."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        # (status, nagłówki, treść JSON); po wyczerpaniu listy - zawsze ostatnia
+        self.responses = [(200, {}, {'response': []})]
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+            responses = self.server.responses
+            status, headers, payload = responses.pop(0) if len(responses) > 1 else responses[0]
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(API_FOOTBALL_BACKOFF_BASE=0, API_FOOTBALL_MAX_RETRIES=2, API_FOOTBALL_MAX_WORKERS=1)
+class FootballAPIServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.server = StubAPIServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def service(self, rate_limiter=None):
+        service = FootballAPIService(rate_limiter=rate_limiter or RateLimiter(per_minute=1000), use_cache=False)
+        self.addCleanup(service.session.close)
+        service.BASE_URL = self.server.url
+        return service
+
+    def test_keep_alive_reuses_connection(self):
+        service = self.service()
+        for league_id in range(5):
+            self.assertEqual(service.get_league_info(league_id), [])
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_retries_on_429_and_5xx(self):
+        self.server.responses = [
+            (429, {}, {}),
+            (503, {}, {}),
+            (200, {}, {'response': [{'league': {'id': 39}}]}),
+        ]
+        with self.assertLogs('SportApp.services', 'WARNING'):
+            result = self.service().get_league_info(39)
+        self.assertEqual(result, [{'league': {'id': 39}}])
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_retries_stop_at_configured_limit(self):
+        self.server.responses = [(500, {}, {})]
+        with self.assertRaises(FootballAPIError), self.assertLogs('SportApp.services', 'WARNING'):
+            self.service().get_league_info(39)
+        # Pierwsza próba + API_FOOTBALL_MAX_RETRIES ponowień
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_client_error_is_not_retried(self):
+        self.server.responses = [(404, {}, {})]
+        with self.assertRaises(FootballAPIError):
+            self.service().get_league_info(39)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_quota_exhausted_from_response_headers(self):
+        self.server.responses = [(200, {'x-ratelimit-requests-remaining': '0'}, {'response': []})]
+        service = self.service()
+        self.assertEqual(service.get_league_info(39), [])
+        with self.assertRaises(QuotaExhaustedError):
+            service.get_league_info(39)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_quota_exhausted_during_retries(self):
+        self.server.responses = [(503, {}, {})]
+        with self.assertRaises(QuotaExhaustedError), self.assertLogs('SportApp.services', 'WARNING'):
+            self.service(RateLimiter(per_minute=1000, per_day=2)).get_league_info(39)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_recent_statistics_are_not_cached(self):
+        self.server.responses = [(200, {}, {'response': [{'team': {'id': 1}, 'statistics': []}]})]
+        service = self.service()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        service.cache = ResponseCache(f'{directory.name}/cache.sqlite3', {'fixtures/statistics': 3600}, 100, 10 ** 6)
+        now = datetime.now(dt_timezone.utc)
+
+        # Tuż po meczu statystyki mogą być niepełne - za każdym razem z API
+        for _ in range(2):
+            service.get_fixture_statistics(1, played_at=now - timedelta(hours=2))
+        self.assertEqual(len(self.server.requests), 2)
+        # Po API_FOOTBALL_STATISTICS_SETTLE_HOURS - z cache
+        for _ in range(2):
+            service.get_fixture_statistics(2, played_at=now - timedelta(days=3))
+        self.assertEqual(len(self.server.requests), 3)
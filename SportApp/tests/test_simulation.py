@@ -0,0 +1,31 @@
+from unittest import mock
+from SportApp.models import Season, SeasonSimulation
+from SportApp.tests import APITestCase
+
+
+class SeasonSimulationViewTests(APITestCase):
+    """Widok zwraca zapisany wynik - symulacje liczy kolejka przeliczeń albo komenda, nie żądanie HTTP."""
+    SYNTHETIC_DATA = {'seed': 5}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.season = Season.objects.get()
+
+    def setUp(self):
+        super().setUp()
+        self.url = f'/api/seasons/{self.season.id}/simulation/'
+
+    def test_missing_simulation_is_not_computed_in_request(self):
+        with mock.patch('SportApp.simulation.simulate') as simulate:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        simulate.assert_not_called()
+        self.assertFalse(SeasonSimulation.objects.exists())
+
+    def test_serves_stored_simulation(self):
+        SeasonSimulation.objects.create(season=self.season, simulations=1, remaining_matches=3, seconds=0, results=[])
+        response = self.client.get(self.url, {'simulations': 50000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['simulations'], 1)
+        self.assertEqual(SeasonSimulation.objects.get().simulations, 1)
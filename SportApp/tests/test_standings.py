@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.test import TestCase
+from SportApp.form import rebuild_team_forms
+from SportApp.models import League, Match, Season, Standing, Team
+from SportApp.standings import StandingsEngine, TABLE_FIELDS, api_table, update_standings
+from SportApp.team_stats import rebuild_team_season_stats
+
+# Kopia bazy: Premier League 2025 - mecze oraz tabela pobrana z API (endpoint standings)
+BACKUP = settings.BASE_DIR / 'backup_full.json'
+
+
+class StandingsOrderTests(TestCase):
+    """Kolejność tabeli jak w Premier League; nazwy drużyn dobrane tak, by alfabet dawał inną kolejność."""
+
+    def setUp(self):
+        league = League.objects.create(api_id=39, name='Premier League', country='England')
+        self.season = Season.objects.create(league=league, year=2025, is_current=True)
+        self.teams = {}
+        self.start = datetime(2025, 8, 16, tzinfo=dt_timezone.utc)
+
+    def team(self, name):
+        if name not in self.teams:
+            self.teams[name] = Team.objects.create(api_id=len(self.teams) + 1, name=name)
+        return self.teams[name]
+
+    def play(self, home, away, home_score, away_score, status='Finished'):
+        number = Match.objects.count() + 1
+        Match.objects.create(
+            api_id=number, season=self.season, home_team=self.team(home), away_team=self.team(away),
+            date=self.start + timedelta(days=number), status=status, home_score=home_score, away_score=away_score,
+        )
+
+    def table(self):
+        rebuild_team_season_stats([self.season.id])
+        return [standing.team.name for standing in StandingsEngine(self.season).compute()]
+
+    def test_points_first(self):
+        self.play('Zeta', 'Alpha', 1, 0)
+        self.assertEqual(self.table(), ['Zeta', 'Alpha'])
+
+    def test_goal_difference_before_goals_scored(self):
+        self.play('Zeta', 'Delta', 3, 0)
+        self.play('Alpha', 'Gamma', 4, 2)
+        self.play('Delta', 'Gamma', 0, 0)
+        # Zeta i Alpha po 3 pkt: różnica +3 przed +2 (mimo mniejszej liczby bramek)
+        self.assertEqual(self.table()[:2], ['Zeta', 'Alpha'])
+
+    def test_goals_scored_before_head_to_head(self):
+        self.play('Zeta', 'Delta', 3, 2)
+        self.play('Alpha', 'Gamma', 1, 0)
+        self.play('Delta', 'Gamma', 0, 0)
+        # Zeta i Alpha: 3 pkt, różnica +1 - rozstrzygają bramki zdobyte; Delta (-1, 2 bramki) przed Gamma (-1, 0)
+        self.assertEqual(self.table(), ['Zeta', 'Alpha', 'Delta', 'Gamma'])
+
+    def test_head_to_head_breaks_remaining_ties(self):
+        self.play('Zeta', 'Alpha', 1, 0)
+        self.play('Zeta', 'Gamma', 0, 1)
+        self.play('Alpha', 'Delta', 1, 0)
+        # Zeta i Alpha: 3 pkt, różnica 0, 1 bramka - wyżej zwycięzca meczu bezpośredniego
+        self.assertEqual(self.table(), ['Gamma', 'Zeta', 'Alpha', 'Delta'])
+
+    def test_finished_match_without_score(self):
+        self.play('Zeta', 'Alpha', 2, 1)
+        self.play('Alpha', 'Zeta', None, None)
+        rebuild_team_season_stats([self.season.id])
+        update_standings([self.season.id])
+
+        standings = {s.team.name: s for s in Standing.objects.filter(season=self.season).select_related('team')}
+        self.assertEqual(standings['Zeta'].position, 1)
+        self.assertEqual(standings['Zeta'].form, 'W')
+        self.assertEqual(standings['Alpha'].form, 'L')
+
+
+def standings_payload(backup):
+    """Odpowiedź `standings` API odtworzona z wierszy Standing kopii (zapisanych z tej odpowiedzi)."""
+    team_api_ids = {row['pk']: row['fields']['api_id'] for row in backup if row['model'] == 'SportApp.team'}
+    table = []
+    for row in backup:
+        if row['model'] != 'SportApp.standing':
+            continue
+        fields = row['fields']
+        sides = {}
+        for side, prefix in (('all', ''), ('home', 'home_'), ('away', 'away_')):
+            sides[side] = {field: fields[f'{prefix}{field}'] for field in ('played', 'win', 'draw', 'lose')}
+            sides[side]['goals'] = {'for': fields[f'{prefix}goals_for'], 'against': fields[f'{prefix}goals_against']}
+        table.append({
+            'rank': fields['position'], 'team': {'id': team_api_ids[fields['team']]}, 'points': fields['points'],
+            'goalsDiff': fields['goals_diff'], 'form': fields['form'], **sides,
+        })
+    return [{'league': {'standings': [sorted(table, key=lambda r: r['rank'])]}}]
+
+
+class StandingsApiParityTests(TestCase):
+    """Tabela liczona lokalnie z meczów kopii musi być identyczna z tabelą z API."""
+    fixtures = [str(BACKUP)]
+
+    def test_engine_matches_api_table(self):
+        with open(BACKUP) as f:
+            expected = api_table(standings_payload(json.load(f)))
+        season = Season.objects.get()
+        rebuild_team_season_stats([season.id])
+        rebuild_team_forms(list(Team.objects.values_list('id', flat=True)))
+
+        local = {s.team.api_id: s for s in StandingsEngine(season).compute()}
+        self.assertEqual(local.keys(), expected.keys())
+        for team_api_id, row in expected.items():
+            for field in TABLE_FIELDS:
+                self.assertEqual(
+                    getattr(local[team_api_id], field), row[field], f"{local[team_api_id].team.name}: {field}"
+                )
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+import numpy as np
+from django.test import TestCase
+from SportApp import strength
+from SportApp.models import League, Match, Season, Team, TeamStrengthModel
+from SportApp.strength import fit_strength_model, predict
+
+
+class StrengthModelTests(TestCase):
+    """Model goli na małej lidze: jedna drużyna wygrywa wszystko, reszta remisuje między sobą."""
+
+    @classmethod
+    def setUpTestData(cls):
+        league = League.objects.create(api_id=1, name='Liga testowa', country='Polska')
+        cls.season = Season.objects.create(league=league, year=2025, is_current=True)
+        cls.strong, *cls.others = [Team.objects.create(api_id=i, name=f'Drużyna {i}') for i in range(1, 7)]
+        start = datetime(2025, 8, 1, tzinfo=dt_timezone.utc)
+        teams = [cls.strong] + cls.others
+        day = 0
+        for home in teams:
+            for away in teams:
+                if home == away:
+                    continue
+                day += 1
+                score = (3, 0) if home == cls.strong else (0, 2) if away == cls.strong else (1, 1)
+                Match.objects.create(api_id=day, season=cls.season, home_team=home, away_team=away,
+                                     date=start + timedelta(days=day), status='Finished',
+                                     home_score=score[0], away_score=score[1])
+
+    def test_probabilities_sum_to_one(self):
+        model = fit_strength_model(self.season)
+        for home, away in ((self.strong, self.others[0]), (self.others[0], self.strong), self.others[:2]):
+            prediction = predict(model, home.id, away.id)
+            self.assertAlmostEqual(prediction['home_win'] + prediction['draw'] + prediction['away_win'], 1, places=3)
+
+    def test_stronger_team_is_favourite(self):
+        model = fit_strength_model(self.season)
+        strong_home = predict(model, self.strong.id, self.others[0].id)
+        weak_home = predict(model, self.others[0].id, self.strong.id)
+        self.assertGreater(strong_home['home_win'], weak_home['home_win'])
+        self.assertGreater(strong_home['home_win'], 0.5)
+        self.assertGreater(weak_home['away_win'], weak_home['home_win'])
+
+    def test_warm_start_refit_after_new_result(self):
+        previous = fit_strength_model(self.season)
+        Match.objects.create(api_id=1000, season=self.season, home_team=self.others[0], away_team=self.others[1],
+                             date=datetime(2025, 12, 1, tzinfo=dt_timezone.utc), status='Finished',
+                             home_score=2, away_score=0)
+
+        with mock.patch.object(strength, 'fit', wraps=strength.fit) as fit:
+            warm = fit_strength_model(self.season)
+        # Punkt startowy = zapisane parametry poprzedniego dopasowania
+        x0 = fit.call_args.args[2]
+        team_ids = sorted(int(team_id) for team_id in previous.teams)
+        teams = len(team_ids)
+        for i, team_id in enumerate(team_ids):
+            self.assertEqual(x0[i], previous.teams[str(team_id)]['attack'])
+            self.assertEqual(x0[teams + i], previous.teams[str(team_id)]['defense'])
+        self.assertEqual((x0[-2], x0[-1]), (previous.home_advantage, previous.rho))
+        self.assertEqual(warm.matches, previous.matches + 1)
+
+        warm_params = dict(warm.teams)
+        cold = fit_strength_model(self.season, warm_start=False)
+        for team_id, params in cold.teams.items():
+            np.testing.assert_allclose(
+                [warm_params[team_id]['attack'], warm_params[team_id]['defense']],
+                [params['attack'], params['defense']], atol=1e-3,
+            )
+        self.assertAlmostEqual(warm.home_advantage, cold.home_advantage, places=3)
+        self.assertEqual(TeamStrengthModel.objects.count(), 1)
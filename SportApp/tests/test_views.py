@@ -0,0 +1,61 @@
+from SportApp.models import Match, Season, Team, TeamStrengthModel
+from SportApp.strength import fit_strength_model
+from SportApp.tests import APITestCase
+
+
+class TeamEloViewTests(APITestCase):
+    SYNTHETIC_DATA = {'teams': 6, 'seed': 11}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.team = Team.objects.order_by('id').first()
+        cls.season = Season.objects.get()
+
+    def setUp(self):
+        super().setUp()
+        self.url = f'/api/teams/{self.team.id}/elo/'
+
+    def test_season_filter(self):
+        response = self.client.get(self.url, {'season': self.season.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['history'])
+        self.assertEqual({entry['season'] for entry in response.data['history']}, {self.season.id})
+
+    def test_invalid_season_is_bad_request(self):
+        response = self.client.get(self.url, {'season': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('season', response.data)
+
+
+class StrengthViewTests(APITestCase):
+    """Model goli liczy kolejka przeliczeń albo komenda - widoki tylko czytają zapisane parametry."""
+    SYNTHETIC_DATA = {'leagues': 2, 'teams': 6, 'seed': 11}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.season, cls.other_season = Season.objects.order_by('id')
+        cls.match = Match.objects.filter(season=cls.season).first()
+        cls.outsider = Match.objects.filter(season=cls.other_season).first().home_team_id
+
+    def prediction(self, home, away):
+        return self.client.get(f'/api/seasons/{self.season.id}/prediction/', {'home': home, 'away': away})
+
+    def test_missing_model_is_not_fitted_in_request(self):
+        for url in (f'/api/seasons/{self.season.id}/strength/', f'/api/matches/{self.match.id}/prediction/'):
+            self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.prediction(self.match.home_team_id, self.match.away_team_id).status_code, 404)
+        self.assertFalse(TeamStrengthModel.objects.exists())
+
+    def test_prediction_from_stored_model(self):
+        fit_strength_model(self.season)
+        response = self.prediction(self.match.home_team_id, self.match.away_team_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(f'/api/matches/{self.match.id}/prediction/').status_code, 200)
+
+    def test_prediction_rejects_teams_outside_season(self):
+        fit_strength_model(self.season)
+        for home, away in ((self.match.home_team_id, 999999), (self.outsider, self.match.away_team_id),
+                           (self.match.home_team_id, self.match.home_team_id)):
+            self.assertEqual(self.prediction(home, away).status_code, 400, (home, away))
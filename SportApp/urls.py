@@ -1,16 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView  # Ważne dla JWT
 
 # Importujemy Twoje widoki (ViewSets i Auth Views)
 from .views import (
     # ViewSety (Dane)
     UserViewSet, LeagueViewSet, SeasonViewSet, TeamViewSet,
-    MatchViewSet, StandingViewSet, TopScorerViewSet, MatchRatingViewSet,
+    MatchViewSet, StandingViewSet, TopScorerViewSet, MatchRatingViewSet, TeamSeasonStatsViewSet,
+    TeamEloRatingViewSet,
 
     # Auth Views (Logowanie/Rejestracja)
-    RegisterView, MyTokenObtainPairView, LogoutView,
-    ChangePasswordView, CurrentUserView
+    RegisterView, MyTokenObtainPairView, MyTokenRefreshView, LogoutView,
+    ChangePasswordView, CurrentUserView,
+
+    # Metryki
+    IngestionMetricsView, ResponseCacheMetricsView
 )
 
 # 1. KONFIGURACJA ROUTERA (To obsługuje /api/matches, /api/teams itp.)
@@ -21,6 +24,8 @@ router.register(r'seasons', SeasonViewSet)
 router.register(r'teams', TeamViewSet)
 router.register(r'matches', MatchViewSet)
 router.register(r'standings', StandingViewSet)
+router.register(r'team-stats', TeamSeasonStatsViewSet)
+router.register(r'elo', TeamEloRatingViewSet)
 router.register(r'top-scorers', TopScorerViewSet)
 router.register(r'ratings', MatchRatingViewSet)
 
@@ -31,8 +36,11 @@ urlpatterns = [
 
     path('auth/register/', RegisterView.as_view(), name='auth_register'),
     path('auth/login/', MyTokenObtainPairView.as_view(), name='auth_login'),
-    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),  # Standardowy widok JWT
+    path('auth/token/refresh/', MyTokenRefreshView.as_view(), name='token_refresh'),  # Odświeża też role w tokenie
     path('auth/logout/', LogoutView.as_view(), name='auth_logout'),
     path('auth/change-password/', ChangePasswordView.as_view(), name='auth_change_password'),
     path('auth/me/', CurrentUserView.as_view(), name='auth_me'),
+
+    path('metrics/ingestion/', IngestionMetricsView.as_view(), name='metrics_ingestion'),
+    path('metrics/cache/', ResponseCacheMetricsView.as_view(), name='metrics_cache'),
 ]
\ No newline at end of file
@@ -1,12 +1,39 @@
 from rest_framework import viewsets, permissions, filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import User, League, Season, Team, Match, Standing, TopScorer, MatchRating
+from django.db.models import Q
+from .changes import matches_changed, match_removed, enqueue_recompute
+from .dynamic_fields import DynamicFieldsViewSetMixin
+from .pagination import KeysetPagination
+from .response_cache import CachedResponseMixin
+from .form import rebuild_team_forms
+from .strength import predict
+from .models import (
+    User, League, Season, Team, Match, Standing, TopScorer, MatchRating,
+    TeamForm, TeamSeasonStats, AnalyticsRecompute, TeamEloRating, EloRatingHistory, SeasonSimulation,
+    TeamStrengthModel,
+)
 from .serializers import (
     UserSerializer, LeagueSerializer, SeasonSerializer, TeamSerializer,
-    MatchSerializer, StandingSerializer, TopScorerSerializer, MatchRatingSerializer
+    MatchSerializer, MatchListSerializer, StandingSerializer, TopScorerSerializer, MatchRatingSerializer,
+    TeamFormSerializer,
+    TeamSeasonStatsSerializer, SeasonSimulationSerializer, TeamStrengthModelSerializer, MatchPredictionSerializer,
+    TeamEloRatingSerializer, EloRatingHistorySerializer,
 )
 # 1. IMPORTUJEMY TWOJE CUSTOMOWE UPRAWNIENIA
 from .permissions import IsUserGroup, IsAdminGroup
+from .authentication import RoleClaimsViewSetMixin
+
+
+def stored_strength_model(season):
+    """Zapisane parametry modelu goli - dopasowuje je kolejka przeliczeń albo komenda fit_strength_models."""
+    model = TeamStrengthModel.objects.filter(season=season).first()
+    if model is None:
+        raise NotFound('Brak modelu goli dla tego sezonu - zostanie dopasowany po kolejnym wyniku '
+                       'albo komendą fit_strength_models.')
+    return model
 
 
 # --- 1. USER VIEW ---
@@ -19,8 +46,13 @@ class UserViewSet(viewsets.ModelViewSet):
 
 # --- 2. KATALOGI (Ligi, Sezony, Drużyny) ---
 # Tutaj stosujemy logikę: USER czyta (GET), ADMIN zmienia (POST/PUT/DELETE)
+# Listy i szczegóły obsługują ?fields=a,b (tylko te pola/kolumny) i ?expand=x (obiekty zamiast ID) - JOIN-y
+# i prefetch wynikają z pól serializera (DynamicFieldsViewSetMixin)
+# Ligi, sezony, drużyny, tabele i strzelcy zmieniają się tylko przy synchronizacji - odpowiedzi są w cache
+# (CachedResponseMixin, unieważniany wersjami sezonów/lig)
+# Odczyty uwierzytelnia sam token z rolami (RoleClaimsViewSetMixin) - IsUserGroup bez zapytań do bazy
 
-class LeagueViewSet(viewsets.ModelViewSet):
+class LeagueViewSet(RoleClaimsViewSetMixin, CachedResponseMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = League.objects.all()
     serializer_class = LeagueSerializer
 
@@ -30,19 +62,51 @@ class LeagueViewSet(viewsets.ModelViewSet):
         return [IsAdminGroup()]  # Tylko Admin może dodawać/edytować
 
 
-class SeasonViewSet(viewsets.ModelViewSet):
+class SeasonViewSet(RoleClaimsViewSetMixin, CachedResponseMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Season.objects.all().order_by('-year')
     serializer_class = SeasonSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['league', 'is_current']
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'simulation', 'strength', 'prediction']:
             return [IsUserGroup()]
         return [IsAdminGroup()]
 
-
-class TeamViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def simulation(self, request, pk=None):
+        """
+        Rozkład miejsc w tabeli końcowej (Monte Carlo reszty sezonu) - zapisany wynik. Symulacje liczy kolejka
+        przeliczeń po nowych wynikach (sezony bieżące) albo komenda simulate_season, nigdy żądanie HTTP.
+        """
+        simulation = SeasonSimulation.objects.filter(season=self.get_object()).first()
+        if simulation is None:
+            raise NotFound('Brak symulacji dla tego sezonu - zostanie policzona po kolejnym wyniku '
+                           'albo komendą simulate_season.')
+        return Response(SeasonSimulationSerializer(simulation).data)
+
+    @action(detail=True, methods=['get'])
+    def strength(self, request, pk=None):
+        """Parametry modelu goli sezonu (atak/obrona drużyn, przewaga własnego boiska, rho)."""
+        return Response(TeamStrengthModelSerializer(stored_strength_model(self.get_object())).data)
+
+    @action(detail=True, methods=['get'])
+    def prediction(self, request, pk=None):
+        """Prognoza dowolnej pary drużyn z parametrów sezonu: ?home=<team_id>&away=<team_id>."""
+        season = self.get_object()
+        try:
+            home_id, away_id = int(request.query_params['home']), int(request.query_params['away'])
+        except (KeyError, ValueError):
+            raise ValidationError({'home': 'Wymagane ID drużyn: ?home=<id>&away=<id>.'})
+        if home_id == away_id:
+            raise ValidationError({'away': 'Drużyna nie może grać sama ze sobą.'})
+        for param, team_id in (('home', home_id), ('away', away_id)):
+            if not Match.objects.filter(Q(home_team_id=team_id) | Q(away_team_id=team_id), season=season).exists():
+                raise ValidationError({param: f'Drużyna {team_id} nie gra w tym sezonie.'})
+        return Response(MatchPredictionSerializer(predict(stored_strength_model(season), home_id, away_id)).data)
+
+
+class TeamViewSet(RoleClaimsViewSetMixin, CachedResponseMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Team.objects.all().order_by('name')
     serializer_class = TeamSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -50,28 +114,121 @@ class TeamViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'city']
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'form', 'elo']:
             return [IsUserGroup()]
         return [IsAdminGroup()]
 
+    @action(detail=True, methods=['get'])
+    def form(self, request, pk=None):
+        """Forma drużyny: ostatnie zakończone mecze z wynikiem i statystykami (utrzymywane przyrostowo)."""
+        team = self.get_object()
+        team_form = TeamForm.objects.filter(team=team).select_related('team').first()
+        if team_form is None:
+            # Okno jeszcze nie istnieje (np. drużyna bez synchronizacji od wdrożenia) - budujemy je raz
+            rebuild_team_forms([team.id])
+            team_form = TeamForm.objects.select_related('team').get(team=team)
+        return Response(TeamFormSerializer(team_form).data)
+
+    @action(detail=True, methods=['get'])
+    def elo(self, request, pk=None):
+        """Ranking Elo drużyny i jego przebieg mecz po meczu (z zapisanej historii), opcjonalnie ?season=<id>."""
+        team = self.get_object()
+        history = EloRatingHistory.objects.filter(team=team).order_by('date', 'match_id')
+        if request.query_params.get('season'):
+            try:
+                history = history.filter(season_id=int(request.query_params['season']))
+            except ValueError:
+                raise ValidationError({'season': 'Wymagana liczba całkowita (id sezonu).'})
+        rating = TeamEloRating.objects.filter(team=team).select_related('team').first()
+        return Response({
+            'rating': TeamEloRatingSerializer(rating).data if rating else None,
+            'history': EloRatingHistorySerializer(history, many=True).data,
+        })
+
 
 # --- 3. CORE (Mecze) ---
-class MatchViewSet(viewsets.ModelViewSet):
+class MatchViewSet(RoleClaimsViewSetMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Match.objects.all().order_by('-date')
     serializer_class = MatchSerializer
+    # Strony po (date, id) - indeksy match_date_id_idx / match_season_date_id_idx
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['season', 'home_team', 'away_team', 'date']
 
+    def get_serializer_class(self):
+        # Lista: lekka reprezentacja; pełne statystyki tylko w szczegółach meczu
+        if self.action == 'list':
+            return MatchListSerializer
+        return MatchSerializer
+
     def get_permissions(self):
         # 1. Lista meczów i szczegóły -> Dla Userów (i Adminów)
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'prediction']:
             return [IsUserGroup()]
         # 2. Dodawanie, edycja, usuwanie meczów -> Tylko Admin
         return [IsAdminGroup()]
 
+    # Edycje przez API przechodzą przez tę samą warstwę zmian co synchronizacja z API-Football
+    def perform_create(self, serializer):
+        match = serializer.save()
+        self._match_saved(match, was_finished=False)
+
+    def perform_update(self, serializer):
+        previous_teams = {serializer.instance.home_team_id, serializer.instance.away_team_id}
+        previous_season_id = serializer.instance.season_id
+        was_finished = serializer.instance.status == 'Finished'
+        match = serializer.save()
+        self._match_saved(match, was_finished)
+        # Zakończony mecz przepięty na inne drużyny lub sezon - znika z okien formy i statystyk poprzednich
+        if previous_season_id != match.season_id:
+            match_removed(previous_teams, previous_season_id, was_finished)
+        else:
+            match_removed(previous_teams - {match.home_team_id, match.away_team_id}, previous_season_id, was_finished)
+
+    def perform_destroy(self, instance):
+        teams = {instance.home_team_id, instance.away_team_id}
+        season_id = instance.season_id
+        was_finished = instance.status == 'Finished'
+        played_at = instance.date
+        instance.delete()
+        match_removed(teams, season_id, was_finished, played_at)
+
+    @action(detail=True, methods=['get'])
+    def prediction(self, request, pk=None):
+        """Prawdopodobieństwa 1X2 i najbardziej prawdopodobne wyniki (model goli sezonu meczu)."""
+        match = self.get_object()
+        return Response(MatchPredictionSerializer(
+            predict(stored_strength_model(match.season), match.home_team_id, match.away_team_id)
+        ).data)
+
+    @staticmethod
+    def _match_saved(match, was_finished):
+        if match.status == 'Finished' or was_finished:
+            matches_changed([match.id], AnalyticsRecompute.REASON_ADMIN)
+        if match.status == 'Scheduled':
+            enqueue_recompute([match.id], AnalyticsRecompute.REASON_ADMIN)
+
+
+class TeamSeasonStatsViewSet(RoleClaimsViewSetMixin, DynamicFieldsViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """Zagregowane statystyki drużyn w sezonie (u siebie / na wyjeździe), np. /api/team-stats/?season=1&team=5"""
+    queryset = TeamSeasonStats.objects.select_related('team').order_by('team__name')
+    serializer_class = TeamSeasonStatsSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['season', 'team']
+    permission_classes = [IsUserGroup]
+
+
+class TeamEloRatingViewSet(RoleClaimsViewSetMixin, DynamicFieldsViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """Bieżący ranking Elo drużyn, od najwyższego, np. /api/elo/?team__league=1"""
+    queryset = TeamEloRating.objects.select_related('team').order_by('-rating')
+    serializer_class = TeamEloRatingSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['team', 'team__league']
+    permission_classes = [IsUserGroup]
+
 
 # --- 4. TABELE I STRZELCY ---
-class StandingViewSet(viewsets.ModelViewSet):
+class StandingViewSet(RoleClaimsViewSetMixin, CachedResponseMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Standing.objects.all().order_by('position')
     serializer_class = StandingSerializer
     filter_backends = [DjangoFilterBackend]
@@ -87,9 +244,10 @@ class StandingViewSet(viewsets.ModelViewSet):
 # --- 5. OCENY (Wyjątek!) ---
 # Tutaj User MUSI mieć prawo zapisu (POST), żeby dodać ocenę.
 
-class MatchRatingViewSet(viewsets.ModelViewSet):
+class MatchRatingViewSet(RoleClaimsViewSetMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = MatchRating.objects.all().order_by('-created_at')
     serializer_class = MatchRatingSerializer
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         # Akcja create (dodanie oceny) -> Dostępna dla Usera
@@ -109,10 +267,11 @@ class MatchRatingViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class TopScorerViewSet(viewsets.ModelViewSet):
+class TopScorerViewSet(RoleClaimsViewSetMixin, CachedResponseMixin, DynamicFieldsViewSetMixin, viewsets.ModelViewSet):
     # Sortujemy od największej liczby goli
     queryset = TopScorer.objects.all().order_by('-goals')
     serializer_class = TopScorerSerializer
+    pagination_class = KeysetPagination
 
     # Filtrowanie jest kluczowe - chcemy zobaczyć strzelców dla konkretnego sezonu
     # np. /api/top-scorers/?season=1
@@ -130,9 +289,11 @@ class TopScorerViewSet(viewsets.ModelViewSet):
 
 from rest_framework import generics, status, views, permissions
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .metrics import load_last_report
+from .response_cache import stats as response_cache_stats
 from .serializers import (
-    RegisterSerializer, MyTokenObtainPairSerializer,
+    RegisterSerializer, MyTokenObtainPairSerializer, MyTokenRefreshSerializer,
     LogoutSerializer, ChangePasswordSerializer, UserSerializer
 )
 
@@ -146,6 +307,9 @@ class RegisterView(generics.CreateAPIView):
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
+class MyTokenRefreshView(TokenRefreshView):
+    serializer_class = MyTokenRefreshSerializer
+
 # 3. WYLOGOWANIE (JWT - Blacklist)
 class LogoutView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -178,4 +342,23 @@ class CurrentUserView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
\ No newline at end of file
+        return self.request.user
+
+# 6. METRYKI SYNCHRONIZACJI (tylko Admin)
+class IngestionMetricsView(views.APIView):
+    permission_classes = [IsAdminGroup]
+
+    def get(self, request):
+        report = load_last_report()
+        if report is None:
+            return Response({"detail": "Brak raportu - synchronizacja nie była jeszcze uruchamiana."},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response(report)
+
+
+# 7. CACHE ODPOWIEDZI API (tylko Admin) - trafienia, 304, zaoszczędzony czas per widok w tym procesie
+class ResponseCacheMetricsView(views.APIView):
+    permission_classes = [IsAdminGroup]
+
+    def get(self, request):
+        return Response(response_cache_stats.report())
@@ -99,6 +99,15 @@ SIMPLE_JWT = {
     'SIGNING_KEY': SECRET_KEY,  # Używa twojego klucza z .env
 }
 
+# Role (grupy User/Admin) w podpisanym claimie 'roles': odczyty API sprawdzają uprawnienia bez zapytań do bazy.
+# Okno po stronie odczytów: odebranie grupy, zablokowanie (is_active=False) lub usunięcie użytkownika działa
+# w odczytach dopiero po wygaśnięciu wydanego access tokenu - najpóźniej po ACCESS_TOKEN_LIFETIME. Odświeżenie
+# tokenu czyta role z bazy i odrzuca nieaktywnych / usuniętych użytkowników (MyTokenRefreshSerializer).
+# Zapisy zawsze sprawdzają użytkownika w bazie, a jego role - w cache procesu (ROLE_CACHE_TTL sekund, czyszczony
+# od razu przy zmianie grup w tym procesie). JWT_ROLE_CLAIMS=0 - odczyty sprawdzane tak samo jak zapisy
+JWT_ROLE_CLAIMS = os.getenv('JWT_ROLE_CLAIMS', '1') == '1'
+ROLE_CACHE_TTL = int(os.getenv('ROLE_CACHE_TTL', 60))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -150,4 +159,88 @@ REST_FRAMEWORK = {
 }
 
 API_FOOTBALL_KEY = os.getenv('API_KEY')
-API_FOOTBALL_HOST = 'v3.football.api-sports.io'
\ No newline at end of file
+API_FOOTBALL_HOST = 'v3.football.api-sports.io'
+
+# Budżet zapytań do API-Football (plan darmowy: 10/min, 100/dzień)
+API_FOOTBALL_REQUESTS_PER_MINUTE = int(os.getenv('API_FOOTBALL_REQUESTS_PER_MINUTE', 10))
+API_FOOTBALL_REQUESTS_PER_DAY = int(os.getenv('API_FOOTBALL_REQUESTS_PER_DAY', 100))
+# Liczba równoległych zapytań (wątków) - tempo i tak wyznacza limiter
+API_FOOTBALL_MAX_WORKERS = int(os.getenv('API_FOOTBALL_MAX_WORKERS', 4))
+
+# Pula połączeń HTTP i polityka ponowień (429/5xx/błędy połączenia)
+API_FOOTBALL_POOL_SIZE = int(os.getenv('API_FOOTBALL_POOL_SIZE', 0))  # 0 = tyle co MAX_WORKERS
+API_FOOTBALL_CONNECT_TIMEOUT = float(os.getenv('API_FOOTBALL_CONNECT_TIMEOUT', 5))
+API_FOOTBALL_READ_TIMEOUT = float(os.getenv('API_FOOTBALL_READ_TIMEOUT', 30))
+API_FOOTBALL_MAX_RETRIES = int(os.getenv('API_FOOTBALL_MAX_RETRIES', 4))
+API_FOOTBALL_BACKOFF_BASE = float(os.getenv('API_FOOTBALL_BACKOFF_BASE', 1))
+API_FOOTBALL_BACKOFF_MAX = float(os.getenv('API_FOOTBALL_BACKOFF_MAX', 60))
+
+# Trwały cache odpowiedzi API (SQLite). TTL w sekundach per endpoint, 0 = bez cache
+API_FOOTBALL_CACHE_ENABLED = os.getenv('API_FOOTBALL_CACHE_ENABLED', '1') == '1'
+API_FOOTBALL_CACHE_PATH = os.getenv('API_FOOTBALL_CACHE_PATH', BASE_DIR / 'api_cache.sqlite3')
+API_FOOTBALL_CACHE_TTLS = {
+    'leagues': 7 * 24 * 3600,  # Dane ligi praktycznie się nie zmieniają
+    'teams': 3 * 24 * 3600,  # Skład ligi stały w trakcie sezonu
+    'standings': 3600,
+    'players/topscorers': 6 * 3600,
+    'fixtures': 10 * 60,  # W dni meczowe wyniki zmieniają się co chwilę
+    'fixtures/statistics': 30 * 24 * 3600,  # Ustalone statystyki meczu są niezmienne
+}
+# Statystyki tuż po meczu bywają niepełne: przez tyle godzin od rozpoczęcia meczu nie trafiają do cache,
+# a zapisane w tym czasie statystyki backfill pobiera ponownie po jego upływie
+API_FOOTBALL_STATISTICS_SETTLE_HOURS = int(os.getenv('API_FOOTBALL_STATISTICS_SETTLE_HOURS', 24))
+API_FOOTBALL_CACHE_MAX_ENTRIES = int(os.getenv('API_FOOTBALL_CACHE_MAX_ENTRIES', 20000))
+API_FOOTBALL_CACHE_MAX_BYTES = int(os.getenv('API_FOOTBALL_CACHE_MAX_BYTES', 500 * 1024 * 1024))
+
+# Domyślny zakres synchronizacji (nadpisywany przez --league / --season)
+SYNC_LEAGUES = [int(x) for x in os.getenv('SYNC_LEAGUES', '39').split(',')]
+SYNC_SEASONS = [int(x) for x in os.getenv('SYNC_SEASONS', '2025').split(',')]
+# Ile lig synchronizować równocześnie (wszystkie dzielą jeden budżet zapytań API)
+SYNC_LEAGUE_WORKERS = int(os.getenv('SYNC_LEAGUE_WORKERS', 3))
+
+# Ostatni raport metryk synchronizacji (czytany przez /api/metrics/ingestion/); pusty = nie zapisuj
+INGESTION_METRICS_PATH = os.getenv('INGESTION_METRICS_PATH', BASE_DIR / 'ingestion_metrics.json')
+
+# Tryb klienta API: live / record (nagrywa odpowiedzi) / replay (odtwarza nagrania bez sieci)
+API_FOOTBALL_MODE = os.getenv('API_FOOTBALL_MODE', 'live')
+API_FOOTBALL_REPLAY_DIR = os.getenv('API_FOOTBALL_REPLAY_DIR', BASE_DIR / 'api_recordings')
+
+# Po ilu sekundach od pierwszej zmiany (wynik/statystyki) przeliczać wskaźniki nadchodzących meczów
+ANALYTICS_RECOMPUTE_DEBOUNCE = int(os.getenv('ANALYTICS_RECOMPUTE_DEBOUNCE', 120))
+
+# Cache odpowiedzi naszego API (ligi, sezony, drużyny, tabele, strzelcy) - unieważniany licznikami wersji
+# sezonów / lig podbijanymi przez synchronizację i zapisy. Backend: file (domyślny, wspólny dla procesów
+# serwera i komend synchronizacji na jednym hoście), redis (API_RESPONSE_CACHE_LOCATION=redis://...),
+# locmem (tylko jeden proces - np. testy; komendy w osobnym procesie nie unieważnią wpisów serwera)
+API_RESPONSE_CACHE_ENABLED = os.getenv('API_RESPONSE_CACHE_ENABLED', '1') == '1'
+API_RESPONSE_CACHE_TIMEOUT = int(os.getenv('API_RESPONSE_CACHE_TIMEOUT', 24 * 3600))
+_API_RESPONSE_CACHE_BACKENDS = {
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+API_RESPONSE_CACHE_BACKEND = os.getenv('API_RESPONSE_CACHE_BACKEND', 'file')
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'api_responses': {
+        'BACKEND': _API_RESPONSE_CACHE_BACKENDS[API_RESPONSE_CACHE_BACKEND],
+        'LOCATION': os.getenv('API_RESPONSE_CACHE_LOCATION', BASE_DIR / 'api_response_cache'),
+        'TIMEOUT': API_RESPONSE_CACHE_TIMEOUT,
+    },
+}
+if API_RESPONSE_CACHE_BACKEND != 'redis':
+    # Redis usuwa wpisy sam (maxmemory-policy); file / locmem - limit liczby wpisów
+    CACHES['api_responses']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('API_RESPONSE_CACHE_MAX_ENTRIES', 5000))}
+
+# Stronicowanie list (mecze, oceny, strzelcy): domyślna i maksymalna (?page_size=) liczba wyników na stronie
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 500))
+
+# Symulacja Monte Carlo reszty sezonu (kolejka przeliczeń, komenda simulate_season): domyślna liczba symulacji,
+# liczba symulacji w benchmarku (simulate_season --benchmark), liczba procesów (0 = wszystkie rdzenie)
+SEASON_SIMULATION_RUNS = int(os.getenv('SEASON_SIMULATION_RUNS', 20000))
+SEASON_SIMULATION_MAX_RUNS = int(os.getenv('SEASON_SIMULATION_MAX_RUNS', 100000))
+SEASON_SIMULATION_WORKERS = int(os.getenv('SEASON_SIMULATION_WORKERS', 0))
+
+# Model goli (Dixon-Coles): zanik wagi meczu na dzień (0.0019 - waga spada o połowę po ~1 roku)
+STRENGTH_MODEL_DECAY = float(os.getenv('STRENGTH_MODEL_DECAY', 0.0019))